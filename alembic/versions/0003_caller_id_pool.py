@@ -0,0 +1,36 @@
+"""Outbound caller-ID pools
+
+Revision ID: 0003_caller_id_pool
+Revises: 0002_jobs
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_caller_id_pool'
+down_revision = '0002_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('agents', sa.Column('outbound_phone_pool', sa.JSON(), nullable=True))
+    op.add_column('agents', sa.Column('caller_id_strategy', sa.String(length=20), nullable=True))
+    op.create_check_constraint(
+        'check_agent_caller_id_strategy', 'agents',
+        "caller_id_strategy IN ('lru', 'local_presence')"
+    )
+    op.add_column('interaction_attempts', sa.Column('from_number', sa.String(length=50), nullable=True))
+    op.create_index('ix_interaction_attempts_in_progress_from_number', 'interaction_attempts', ['from_number'],
+                    unique=False, postgresql_where=sa.text("status = 'in_progress'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interaction_attempts_in_progress_from_number', table_name='interaction_attempts')
+    op.drop_column('interaction_attempts', 'from_number')
+    op.drop_constraint('check_agent_caller_id_strategy', 'agents', type_='check')
+    op.drop_column('agents', 'caller_id_strategy')
+    op.drop_column('agents', 'outbound_phone_pool')
@@ -0,0 +1,26 @@
+"""Predictive pacing mode per agent
+
+Revision ID: 0004_agent_pacing
+Revises: 0003_caller_id_pool
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_agent_pacing'
+down_revision = '0003_caller_id_pool'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('agents', sa.Column('pacing_mode', sa.String(length=20), nullable=True))
+    op.create_check_constraint('check_agent_pacing_mode', 'agents', "pacing_mode IN ('off', 'predictive')")
+
+
+def downgrade() -> None:
+    op.drop_constraint('check_agent_pacing_mode', 'agents', type_='check')
+    op.drop_column('agents', 'pacing_mode')
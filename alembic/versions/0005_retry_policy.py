@@ -0,0 +1,51 @@
+"""Per-outcome retry policies
+
+Revision ID: 0005_retry_policy
+Revises: 0004_agent_pacing
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_retry_policy'
+down_revision = '0004_agent_pacing'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('agents', sa.Column('retry_policy', sa.JSON(), nullable=True))
+
+    op.drop_constraint('check_attempt_outcome', 'interaction_attempts', type_='check')
+    op.create_check_constraint(
+        'check_attempt_outcome', 'interaction_attempts',
+        "outcome IN ('answered', 'no_answer', 'busy', 'voicemail', 'failed')"
+    )
+
+    # The dispatcher no longer checks for a recent attempt; carry the old
+    # retry delay over into schedule_at for leads still being worked
+    op.execute("""
+        UPDATE leads SET schedule_at = last.retry_at
+        FROM (
+            SELECT a.lead_id, MAX(a.created_at) + ag.retry_delay_minutes * interval '1 minute' AS retry_at
+            FROM interaction_attempts a
+            JOIN agents ag ON ag.id = a.agent_id
+            GROUP BY a.lead_id, ag.retry_delay_minutes
+        ) AS last
+        WHERE leads.id = last.lead_id
+          AND leads.status IN ('new', 'in_progress')
+          AND leads.schedule_at < last.retry_at
+    """)
+
+
+def downgrade() -> None:
+    op.execute("UPDATE interaction_attempts SET outcome = 'no_answer' WHERE outcome IN ('busy', 'voicemail')")
+    op.drop_constraint('check_attempt_outcome', 'interaction_attempts', type_='check')
+    op.create_check_constraint(
+        'check_attempt_outcome', 'interaction_attempts',
+        "outcome IN ('answered', 'no_answer', 'failed')"
+    )
+    op.drop_column('agents', 'retry_policy')
@@ -0,0 +1,25 @@
+"""Index in_progress attempts by age for the call reconciler
+
+Revision ID: 0006_stale_attempt_index
+Revises: 0005_retry_policy
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_stale_attempt_index'
+down_revision = '0005_retry_policy'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_interaction_attempts_in_progress_created_at', 'interaction_attempts', ['created_at'],
+                    unique=False, postgresql_where=sa.text("status = 'in_progress'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interaction_attempts_in_progress_created_at', table_name='interaction_attempts')
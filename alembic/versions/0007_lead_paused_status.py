@@ -0,0 +1,26 @@
+"""Paused lead status for bulk pause/resume
+
+Revision ID: 0007_lead_paused_status
+Revises: 0006_stale_attempt_index
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_lead_paused_status'
+down_revision = '0006_stale_attempt_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('check_lead_status', 'leads', type_='check')
+    op.create_check_constraint('check_lead_status', 'leads', "status IN ('new', 'in_progress', 'paused', 'done')")
+
+
+def downgrade() -> None:
+    op.execute("UPDATE leads SET status = 'new' WHERE status = 'paused'")
+    op.drop_constraint('check_lead_status', 'leads', type_='check')
+    op.create_check_constraint('check_lead_status', 'leads', "status IN ('new', 'in_progress', 'done')")
@@ -0,0 +1,34 @@
+"""Store lead custom_fields as JSONB with a GIN index; agent lead filters
+
+Revision ID: 0008_custom_fields_jsonb
+Revises: 0007_lead_paused_status
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_custom_fields_jsonb'
+down_revision = '0007_lead_paused_status'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('leads', 'custom_fields', type_=postgresql.JSONB(), existing_type=sa.JSON(),
+                    postgresql_using='custom_fields::jsonb')
+    # Default jsonb_ops (not jsonb_path_ops) so key-exists (?) is index-backed too
+    op.create_index('ix_leads_custom_fields', 'leads', ['custom_fields'], unique=False, postgresql_using='gin')
+
+    op.add_column('agents', sa.Column('lead_filter', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('agents', 'lead_filter')
+
+    op.drop_index('ix_leads_custom_fields', table_name='leads')
+    op.alter_column('leads', 'custom_fields', type_=sa.JSON(), existing_type=postgresql.JSONB(),
+                    postgresql_using='custom_fields::json')
@@ -0,0 +1,71 @@
+"""Partial composite indexes that leave out soft-deleted rows
+
+Revision ID: 0009_live_row_indexes
+Revises: 0008_custom_fields_jsonb
+Create Date: 2026-10-19 20:00:00.000000
+
+Indexes are built and dropped CONCURRENTLY (outside the migration's
+transaction) so leads and interaction_attempts keep taking writes while this
+runs; the replacement indexes are in place before the old ones are dropped.
+A build that fails midway leaves an INVALID index behind; IF NOT EXISTS /
+IF EXISTS let a re-run pick up where it stopped once that index is dropped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_live_row_indexes'
+down_revision = '0008_custom_fields_jsonb'
+branch_labels = None
+depends_on = None
+
+LIVE = sa.text('is_deleted = false')
+
+
+def _create_index(name, table, columns, **kw) -> None:
+    op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True, **kw)
+
+
+def _drop_index(name, table) -> None:
+    op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_index('ix_companies_admin_user_id_live', 'companies', ['admin_user_id'], postgresql_where=LIVE)
+        _create_index('ix_agents_company_id_status_live', 'agents', ['company_id', 'status'], postgresql_where=LIVE)
+        _create_index('ix_phone_providers_company_id_live', 'phone_providers', ['company_id'], postgresql_where=LIVE)
+
+        # Replace the single-column status/schedule_at indexes, which also carried done and deleted leads
+        _create_index('ix_leads_due', 'leads', ['schedule_at', 'agent_id'],
+                      postgresql_where=sa.text("is_deleted = false AND status IN ('new', 'in_progress')"))
+        _create_index('ix_leads_agent_id_status_live', 'leads', ['agent_id', 'status'], postgresql_where=LIVE)
+        _create_index('ix_leads_agent_id_created_at_live', 'leads', ['agent_id', 'created_at'], postgresql_where=LIVE)
+        _drop_index('ix_leads_status', 'leads')
+        _drop_index('ix_leads_schedule_at', 'leads')
+
+        # agent_id alone is a prefix of the composite
+        _create_index('ix_interaction_attempts_agent_id_created_at', 'interaction_attempts', ['agent_id', 'created_at'])
+        _drop_index('ix_interaction_attempts_agent_id', 'interaction_attempts')
+
+        # Webhook and reconciler lookups by Retell call; pending attempts have none yet
+        _create_index('ix_interaction_attempts_retell_call_id', 'interaction_attempts', ['retell_call_id'],
+                      postgresql_where=sa.text('retell_call_id IS NOT NULL'))
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _drop_index('ix_interaction_attempts_retell_call_id', 'interaction_attempts')
+        _create_index('ix_interaction_attempts_agent_id', 'interaction_attempts', ['agent_id'])
+        _drop_index('ix_interaction_attempts_agent_id_created_at', 'interaction_attempts')
+
+        _create_index('ix_leads_schedule_at', 'leads', ['schedule_at'])
+        _create_index('ix_leads_status', 'leads', ['status'])
+        _drop_index('ix_leads_agent_id_created_at_live', 'leads')
+        _drop_index('ix_leads_agent_id_status_live', 'leads')
+        _drop_index('ix_leads_due', 'leads')
+
+        _drop_index('ix_phone_providers_company_id_live', 'phone_providers')
+        _drop_index('ix_agents_company_id_status_live', 'agents')
+        _drop_index('ix_companies_admin_user_id_live', 'companies')
@@ -0,0 +1,120 @@
+"""Partition interaction_attempts by month on created_at
+
+Revision ID: 0010_partition_attempts
+Revises: 0009_live_row_indexes
+Create Date: 2026-10-19 21:00:00.000000
+
+The table is rebuilt: the old one is renamed, a RANGE-partitioned table takes
+its name, monthly partitions are created for the existing data plus the
+months ahead, rows are copied over and the old table is dropped. Later
+partitions are created by the maintain_attempt_partitions job
+(app.services.attempt_partitions).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_partition_attempts'
+down_revision = '0009_live_row_indexes'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "id, created_at, updated_at, is_deleted, lead_id, agent_id, attempt_number, status, outcome, summary, "
+    "duration_seconds, transcript_url, raw_webhook_data, retell_call_id, from_number"
+)
+# Index names are schema-wide, so the outgoing table's are renamed out of the way
+INDEXES = (
+    'ix_interaction_attempts_lead_id',
+    'ix_interaction_attempts_agent_id_created_at',
+    'ix_interaction_attempts_in_progress_from_number',
+    'ix_interaction_attempts_in_progress_created_at',
+    'ix_interaction_attempts_retell_call_id',
+)
+MONTHS_AHEAD = 3  # Matches the ATTEMPT_PARTITIONS_AHEAD default
+
+
+def _create_table(name: str, partitioned: bool) -> None:
+    op.create_table(name,
+    sa.Column('lead_id', sa.UUID(), nullable=False),
+    sa.Column('agent_id', sa.UUID(), nullable=False),
+    sa.Column('attempt_number', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('outcome', sa.String(length=20), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.Column('transcript_url', sa.String(length=500), nullable=True),
+    sa.Column('raw_webhook_data', sa.JSON(), nullable=True),
+    sa.Column('retell_call_id', sa.String(length=255), nullable=True),
+    sa.Column('from_number', sa.String(length=50), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False),
+    sa.CheckConstraint("outcome IN ('answered', 'no_answer', 'busy', 'voicemail', 'failed')", name='check_attempt_outcome'),
+    sa.CheckConstraint("status IN ('pending', 'in_progress', 'completed', 'failed')", name='check_attempt_status'),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ),
+    # A partitioned table's primary key must include the partition key
+    sa.PrimaryKeyConstraint('id', 'created_at') if partitioned else sa.PrimaryKeyConstraint('id'),
+    **({'postgresql_partition_by': 'RANGE (created_at)'} if partitioned else {})
+    )
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_interaction_attempts_lead_id', 'interaction_attempts', ['lead_id'], unique=False)
+    op.create_index('ix_interaction_attempts_agent_id_created_at', 'interaction_attempts', ['agent_id', 'created_at'],
+                    unique=False)
+    op.create_index('ix_interaction_attempts_in_progress_from_number', 'interaction_attempts', ['from_number'],
+                    unique=False, postgresql_where=sa.text("status = 'in_progress'"))
+    op.create_index('ix_interaction_attempts_in_progress_created_at', 'interaction_attempts', ['created_at'],
+                    unique=False, postgresql_where=sa.text("status = 'in_progress'"))
+    op.create_index('ix_interaction_attempts_retell_call_id', 'interaction_attempts', ['retell_call_id'],
+                    unique=False, postgresql_where=sa.text('retell_call_id IS NOT NULL'))
+
+
+def _set_aside(suffix: str) -> str:
+    old = f'interaction_attempts_{suffix}'
+    op.rename_table('interaction_attempts', old)
+    op.execute(f"ALTER INDEX interaction_attempts_pkey RENAME TO {old}_pkey")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_{suffix}")
+    return old
+
+
+def upgrade() -> None:
+    old = _set_aside('unpartitioned')
+    _create_table('interaction_attempts', partitioned=True)
+
+    # One partition per month from the oldest attempt through MONTHS_AHEAD ahead, plus a
+    # default partition so an insert outside them never fails a dial
+    op.execute(f"""
+        DO $$
+        DECLARE
+            bound date := date_trunc('month', COALESCE((SELECT MIN(created_at) FROM {old}), now()));
+            until_month date := date_trunc('month', now()) + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            WHILE bound <= until_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE interaction_attempts_%s PARTITION OF interaction_attempts FOR VALUES FROM (%L) TO (%L)',
+                    to_char(bound, '"y"YYYY"m"MM'), bound, bound + interval '1 month'
+                );
+                bound := bound + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE interaction_attempts_default PARTITION OF interaction_attempts DEFAULT")
+
+    op.execute(f"INSERT INTO interaction_attempts ({COLUMNS}) SELECT {COLUMNS} FROM {old}")
+    op.drop_table(old)
+    _create_indexes()
+
+
+def downgrade() -> None:
+    old = _set_aside('partitioned')
+    _create_table('interaction_attempts', partitioned=False)
+    # Archived (detached) partitions are not brought back
+    op.execute(f"INSERT INTO interaction_attempts ({COLUMNS}) SELECT {COLUMNS} FROM {old}")
+    op.execute(f"DROP TABLE {old} CASCADE")
+    _create_indexes()
@@ -0,0 +1,76 @@
+"""Move attempt summaries and raw webhook payloads to interaction_attempt_payloads
+
+Revision ID: 0011_attempt_payloads
+Revises: 0010_partition_attempts
+Create Date: 2026-10-19 22:00:00.000000
+
+The side table is partitioned like interaction_attempts and gets one
+partition per attempts partition (same bounds, DEFAULT included), so
+retention can detach both together. Dropping the columns from
+interaction_attempts is a catalog change; the space comes back as rows are
+updated and vacuumed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_attempt_payloads'
+down_revision = '0010_partition_attempts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('interaction_attempt_payloads',
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('raw_webhook_data', sa.JSON(), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+
+    # Mirror every attached attempts partition, bounds included
+    op.execute("""
+        DO $$
+        DECLARE
+            part record;
+        BEGIN
+            FOR part IN
+                SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) AS bound
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = 'interaction_attempts'::regclass
+                AND child.relkind = 'r'
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF interaction_attempt_payloads %s',
+                    replace(part.relname, 'interaction_attempts', 'interaction_attempt_payloads'), part.bound
+                );
+            END LOOP;
+        END $$
+    """)
+
+    op.execute("""
+        INSERT INTO interaction_attempt_payloads (id, created_at, updated_at, is_deleted, summary, raw_webhook_data)
+        SELECT id, created_at, updated_at, is_deleted, summary, raw_webhook_data
+        FROM interaction_attempts
+        WHERE summary IS NOT NULL OR raw_webhook_data IS NOT NULL
+    """)
+    op.drop_column('interaction_attempts', 'raw_webhook_data')
+    op.drop_column('interaction_attempts', 'summary')
+
+
+def downgrade() -> None:
+    op.add_column('interaction_attempts', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('interaction_attempts', sa.Column('raw_webhook_data', sa.JSON(), nullable=True))
+    op.execute("""
+        UPDATE interaction_attempts
+        SET summary = payloads.summary, raw_webhook_data = payloads.raw_webhook_data
+        FROM interaction_attempt_payloads payloads
+        WHERE payloads.id = interaction_attempts.id AND payloads.created_at = interaction_attempts.created_at
+    """)
+    op.drop_table('interaction_attempt_payloads')
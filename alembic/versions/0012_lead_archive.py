@@ -0,0 +1,79 @@
+"""Archive tables for done leads and their attempts
+
+Revision ID: 0012_lead_archive
+Revises: 0011_attempt_payloads
+Create Date: 2026-10-19 23:00:00.000000
+
+Leads are moved in by the archive_done_leads job (app.services.lead_archive).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0012_lead_archive'
+down_revision = '0011_attempt_payloads'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('archived_leads',
+    sa.Column('agent_id', sa.UUID(), nullable=False),
+    sa.Column('first_name', sa.String(length=255), nullable=False),
+    sa.Column('phone_e164', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('custom_fields', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('schedule_at', sa.DateTime(), nullable=False),
+    sa.Column('attempts_count', sa.Integer(), nullable=True),
+    sa.Column('disposition', sa.String(length=50), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=True),
+    sa.Column('updated_by', sa.UUID(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_leads_agent_id_phone_e164', 'archived_leads', ['agent_id', 'phone_e164'], unique=False)
+    op.create_index('ix_archived_leads_agent_id_archived_at', 'archived_leads', ['agent_id', 'archived_at'],
+                    unique=False)
+
+    op.create_table('archived_interaction_attempts',
+    sa.Column('lead_id', sa.UUID(), nullable=False),
+    sa.Column('agent_id', sa.UUID(), nullable=False),
+    sa.Column('attempt_number', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('outcome', sa.String(length=20), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.Column('transcript_url', sa.String(length=500), nullable=True),
+    sa.Column('retell_call_id', sa.String(length=255), nullable=True),
+    sa.Column('from_number', sa.String(length=50), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('raw_webhook_data', sa.JSON(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_interaction_attempts_lead_id'), 'archived_interaction_attempts', ['lead_id'],
+                    unique=False)
+
+    # Lets the archiver find due leads without scanning the live ones
+    op.create_index('ix_leads_done_updated_at', 'leads', ['updated_at'], unique=False,
+                    postgresql_where=sa.text("status = 'done'"))
+
+
+def downgrade() -> None:
+    # Archived rows are not moved back
+    op.drop_index('ix_leads_done_updated_at', table_name='leads')
+    op.drop_index(op.f('ix_archived_interaction_attempts_lead_id'), table_name='archived_interaction_attempts')
+    op.drop_table('archived_interaction_attempts')
+    op.drop_index('ix_archived_leads_agent_id_archived_at', table_name='archived_leads')
+    op.drop_index('ix_archived_leads_agent_id_phone_e164', table_name='archived_leads')
+    op.drop_table('archived_leads')
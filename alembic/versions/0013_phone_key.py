@@ -0,0 +1,50 @@
+"""BIGINT phone_key on leads and archived_leads for phone equality lookups
+
+Revision ID: 0013_phone_key
+Revises: 0012_lead_archive
+Create Date: 2026-10-20 00:00:00.000000
+
+phone_key is the E.164 number's digits as an integer (see
+PhoneService.phone_key). The agent + phone uniqueness moves to it, and the
+varchar index on phone_e164 is replaced by one on phone_key.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013_phone_key'
+down_revision = '0012_lead_archive'
+branch_labels = None
+depends_on = None
+
+# Stored numbers are already normalized E.164; the key is their digits
+BACKFILL = "CAST(regexp_replace(phone_e164, '[^0-9]', '', 'g') AS BIGINT)"
+
+
+def upgrade() -> None:
+    op.add_column('leads', sa.Column('phone_key', sa.BigInteger(), nullable=True))
+    op.execute(f"UPDATE leads SET phone_key = {BACKFILL}")
+    op.alter_column('leads', 'phone_key', nullable=False)
+    op.create_unique_constraint('uq_agent_phone_key', 'leads', ['agent_id', 'phone_key'])
+    op.create_index('ix_leads_phone_key', 'leads', ['phone_key'], unique=False)
+    op.drop_constraint('uq_agent_phone', 'leads', type_='unique')
+    op.drop_index('ix_leads_phone_e164', table_name='leads')
+
+    op.add_column('archived_leads', sa.Column('phone_key', sa.BigInteger(), nullable=True))
+    op.execute(f"UPDATE archived_leads SET phone_key = {BACKFILL}")
+    op.alter_column('archived_leads', 'phone_key', nullable=False)
+    op.create_index('ix_archived_leads_agent_id_phone_key', 'archived_leads', ['agent_id', 'phone_key'], unique=False)
+    op.drop_index('ix_archived_leads_agent_id_phone_e164', table_name='archived_leads')
+
+
+def downgrade() -> None:
+    op.create_index('ix_archived_leads_agent_id_phone_e164', 'archived_leads', ['agent_id', 'phone_e164'], unique=False)
+    op.drop_index('ix_archived_leads_agent_id_phone_key', table_name='archived_leads')
+    op.drop_column('archived_leads', 'phone_key')
+
+    op.create_index('ix_leads_phone_e164', 'leads', ['phone_e164'], unique=False)
+    op.create_unique_constraint('uq_agent_phone', 'leads', ['agent_id', 'phone_e164'])
+    op.drop_index('ix_leads_phone_key', table_name='leads')
+    op.drop_constraint('uq_agent_phone_key', 'leads', type_='unique')
+    op.drop_column('leads', 'phone_key')
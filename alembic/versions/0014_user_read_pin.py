@@ -0,0 +1,26 @@
+"""users.reads_primary_until for per-user read-your-writes
+
+Revision ID: 0014_user_read_pin
+Revises: 0013_phone_key
+Create Date: 2026-10-20 06:00:00.000000
+
+Replaces the db_primary_until cookie, which Bearer-token clients never sent
+back. Nullable with no default, so adding it doesn't rewrite the table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014_user_read_pin'
+down_revision = '0013_phone_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('reads_primary_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'reads_primary_until')
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.deps import get_db, get_current_user, get_user_company
+from app.db.deps import get_db, get_read_db, get_current_user, get_user_company
 from app.schemas.agent import AgentCreate, AgentUpdate, AgentResponse, AgentListResponse, VoiceResponse
 from app.models.user import User
 from app.models.company import Company
 from app.models.agent import Agent
 from app.models.voice import Voice
+from app.models.phone_provider import PhoneProvider
+from app.services.phone_service import phone_service
 from app.services.retell_service import retell_service
 import uuid
 import logging
@@ -30,6 +32,44 @@ def get_user_company(db: Session, user: User) -> Company:
     return company
 
 
+def validate_outbound_phone_pool(db: Session, company: Company, numbers: List[str]) -> List[str]:
+    """
+    Normalize pool numbers and check the company owns each one; raises 400
+    otherwise, or 502 when a provider's number listing fails
+    """
+    normalized = []
+    for number in numbers:
+        e164 = phone_service.normalize_phone(number)
+        if not e164:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid phone number in outbound_phone_pool: {number}"
+            )
+        if e164 not in normalized:
+            normalized.append(e164)
+    if not normalized:
+        return []
+    
+    providers = db.query(PhoneProvider).filter(
+        PhoneProvider.company_id == company.id,
+        PhoneProvider.is_deleted == False
+    ).all()
+    try:
+        owned = {number["phone_number"] for number in phone_service.list_owned_numbers(providers, raise_errors=True)}
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Couldn't list the company's numbers from its phone provider; try again shortly"
+        )
+    not_owned = [number for number in normalized if number not in owned]
+    if not_owned:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Numbers not owned by the company's Twilio/Plivo accounts: {', '.join(not_owned)}"
+        )
+    return normalized
+
+
 @router.post("/", response_model=AgentResponse)
 async def create_agent(
     agent_data: AgentCreate,
@@ -59,6 +99,10 @@ async def create_agent(
         "voice_id": agent_data.voice_id
     }
     
+    outbound_phone_pool = []
+    if agent_data.outbound_phone_pool:
+        outbound_phone_pool = validate_outbound_phone_pool(db, company, agent_data.outbound_phone_pool)
+    
     retell_agent_id = retell_service.create_agent(retell_data)
     # Note: This now returns master template agent ID, not individual agent ID
     
@@ -74,8 +118,13 @@ async def create_agent(
             functions=agent_data.functions or [],
             inbound_phone=agent_data.inbound_phone,
             outbound_phone=agent_data.outbound_phone,
+            outbound_phone_pool=outbound_phone_pool,
+            caller_id_strategy=agent_data.caller_id_strategy,
+            pacing_mode=agent_data.pacing_mode,
             max_attempts=agent_data.max_attempts,
             retry_delay_minutes=agent_data.retry_delay_minutes,
+            retry_policy=agent_data.retry_policy.model_dump(exclude_none=True) if agent_data.retry_policy else None,
+            lead_filter=agent_data.lead_filter or None,
             business_hours_start=agent_data.business_hours_start,
             business_hours_end=agent_data.business_hours_end,
             timezone=agent_data.timezone,
@@ -116,7 +165,7 @@ async def list_agents(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
     status_filter: Optional[str] = Query(None, pattern="^(active|inactive)$"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     company = get_user_company(db, current_user)
@@ -164,7 +213,7 @@ async def list_agents(
 @router.get("/{agent_id}", response_model=AgentResponse)
 async def get_agent(
     agent_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     company = get_user_company(db, current_user)
@@ -207,6 +256,10 @@ async def update_agent(
     
     # Update fields that are provided
     update_data = agent_data.dict(exclude_unset=True)
+    if update_data.get("outbound_phone_pool") is not None:
+        update_data["outbound_phone_pool"] = validate_outbound_phone_pool(db, company, update_data["outbound_phone_pool"])
+    if agent_data.retry_policy is not None:
+        update_data["retry_policy"] = agent_data.retry_policy.model_dump(exclude_none=True)
     for field, value in update_data.items():
         setattr(agent, field, value)
     
@@ -285,7 +338,7 @@ async def delete_agent(
 
 @router.get("/voices/", response_model=List[VoiceResponse])
 async def list_voices(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     voices = db.query(Voice).filter(Voice.is_active == True).all()
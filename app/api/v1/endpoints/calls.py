@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, func, desc, select, true
 from typing import List, Optional
 from datetime import datetime, date, timedelta
-from app.db.deps import get_db, get_current_user
+from app.core.config import settings
+from app.db.deps import get_db, get_read_db, get_current_user
 from app.schemas.call import (
-    InteractionAttemptResponse, CallHistoryResponse, CallMetrics,
+    InteractionAttemptResponse, CallDetailResponse, CallHistoryResponse, CallMetrics,
     CallScheduleRequest, WebhookPayload
 )
 from app.models.user import User
@@ -13,7 +15,14 @@ from app.models.company import Company
 from app.models.agent import Agent
 from app.models.lead import Lead
 from app.models.interaction_attempt import InteractionAttempt
+from app.models.interaction_attempt_payload import InteractionAttemptPayload
 from app.services.call_scheduler import call_scheduler
+from app.services.call_results import apply_call_result
+from app.services.data_export import data_exporter
+from app.utils.ids import uuid7_time
+from app.core.metrics import webhook_processing_lag, webhooks_processed
+import time
+import uuid
 
 router = APIRouter()
 
@@ -33,23 +42,71 @@ def get_user_company(db: Session, user: User) -> Company:
     return company
 
 
+def call_history_filters(
+    company_id,
+    agent_id: Optional[str] = None,
+    outcome: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None
+) -> list:
+    """WHERE clauses for call history (attempts joined to their lead and agent)"""
+    clauses = [
+        Agent.company_id == company_id,
+        Agent.is_deleted == False,
+        Lead.is_deleted == False
+    ]
+    
+    if agent_id:
+        clauses.append(InteractionAttempt.agent_id == agent_id)
+    
+    if outcome:
+        clauses.append(InteractionAttempt.outcome == outcome)
+    
+    if start_date:
+        clauses.append(InteractionAttempt.created_at >= start_date)
+    
+    if end_date:
+        clauses.append(InteractionAttempt.created_at < end_date + timedelta(days=1))
+    
+    if search:
+        clauses.append(
+            or_(
+                Lead.first_name.ilike(f"%{search}%"),
+                Lead.phone_e164.ilike(f"%{search}%"),
+                Agent.name.ilike(f"%{search}%")
+            )
+        )
+    return clauses
+
+
 @router.get("/history", response_model=CallHistoryResponse)
 async def get_call_history(
     agent_id: Optional[str] = Query(None),
-    outcome: Optional[str] = Query(None, pattern="^(answered|no_answer|failed)$"),
+    outcome: Optional[str] = Query(None, pattern="^(answered|no_answer|busy|voicemail|failed)$"),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     search: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     company = get_user_company(db, current_user)
     
-    # Base query with joins
+    # Explicit columns: list pages never load payloads (see GET /calls/{call_id})
     query = db.query(
-        InteractionAttempt,
+        InteractionAttempt.id,
+        InteractionAttempt.lead_id,
+        InteractionAttempt.agent_id,
+        InteractionAttempt.attempt_number,
+        InteractionAttempt.status,
+        InteractionAttempt.outcome,
+        InteractionAttempt.duration_seconds,
+        InteractionAttempt.transcript_url,
+        InteractionAttempt.retell_call_id,
+        InteractionAttempt.created_at,
+        InteractionAttempt.updated_at,
         Lead.first_name.label("lead_name"),
         Lead.phone_e164.label("lead_phone"),
         Agent.name.label("agent_name")
@@ -58,33 +115,9 @@ async def get_call_history(
     ).join(
         Agent, InteractionAttempt.agent_id == Agent.id
     ).filter(
-        Agent.company_id == company.id,
-        Agent.is_deleted == False,
-        Lead.is_deleted == False
+        *call_history_filters(company.id, agent_id, outcome, start_date, end_date, search)
     )
     
-    # Apply filters
-    if agent_id:
-        query = query.filter(InteractionAttempt.agent_id == agent_id)
-    
-    if outcome:
-        query = query.filter(InteractionAttempt.outcome == outcome)
-    
-    if start_date:
-        query = query.filter(InteractionAttempt.created_at >= start_date)
-    
-    if end_date:
-        query = query.filter(InteractionAttempt.created_at < end_date + timedelta(days=1))
-    
-    if search:
-        query = query.filter(
-            or_(
-                Lead.first_name.ilike(f"%{search}%"),
-                Lead.phone_e164.ilike(f"%{search}%"),
-                Agent.name.ilike(f"%{search}%")
-            )
-        )
-    
     # Order by creation date (newest first)
     query = query.order_by(desc(InteractionAttempt.created_at))
     
@@ -92,15 +125,7 @@ async def get_call_history(
     results = query.offset((page - 1) * per_page).limit(per_page).all()
     
     # Format response
-    calls = []
-    for attempt, lead_name, lead_phone, agent_name in results:
-        call_data = InteractionAttemptResponse(
-            **attempt.__dict__,
-            lead_name=lead_name,
-            lead_phone=lead_phone,
-            agent_name=agent_name
-        )
-        calls.append(call_data)
+    calls = [InteractionAttemptResponse(**row._mapping) for row in results]
     
     return CallHistoryResponse(
         calls=calls,
@@ -110,12 +135,77 @@ async def get_call_history(
     )
 
 
+CALL_EXPORT_COLUMNS = [
+    ("id", "str"), ("lead_id", "str"), ("lead_name", "str"), ("lead_phone", "str"),
+    ("agent_id", "str"), ("agent_name", "str"), ("attempt_number", "int"), ("status", "str"),
+    ("outcome", "str"), ("duration_seconds", "int"), ("summary", "str"), ("transcript_url", "str"),
+    ("retell_call_id", "str"), ("from_number", "str"), ("created_at", "datetime")
+]
+
+
+@router.get("/export")
+async def export_call_history(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson|parquet)$"),
+    gzip: bool = Query(False),
+    agent_id: Optional[str] = Query(None),
+    outcome: Optional[str] = Query(None, pattern="^(answered|no_answer|busy|voicemail|failed)$"),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    search: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the whole filtered call history, newest first, as CSV, NDJSON or Parquet"""
+    company = get_user_company(db, current_user)
+    if export_format == "parquet" and not data_exporter.parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export is not available on this server"
+        )
+    
+    statement = select(
+        InteractionAttempt.id,
+        InteractionAttempt.lead_id,
+        Lead.first_name,
+        Lead.phone_e164,
+        InteractionAttempt.agent_id,
+        Agent.name,
+        InteractionAttempt.attempt_number,
+        InteractionAttempt.status,
+        InteractionAttempt.outcome,
+        InteractionAttempt.duration_seconds,
+        InteractionAttemptPayload.summary,
+        InteractionAttempt.transcript_url,
+        InteractionAttempt.retell_call_id,
+        InteractionAttempt.from_number,
+        InteractionAttempt.created_at
+    ).join(
+        Lead, InteractionAttempt.lead_id == Lead.id
+    ).join(
+        Agent, InteractionAttempt.agent_id == Agent.id
+    ).outerjoin(
+        InteractionAttemptPayload, and_(
+            InteractionAttemptPayload.id == InteractionAttempt.id,
+            InteractionAttemptPayload.created_at == InteractionAttempt.created_at
+        )
+    ).where(
+        *call_history_filters(company.id, agent_id, outcome, start_date, end_date, search)
+    ).order_by(desc(InteractionAttempt.created_at))
+    
+    filename = data_exporter.filename("calls", export_format, gzip)
+    return StreamingResponse(
+        data_exporter.stream(db.get_bind(), statement, CALL_EXPORT_COLUMNS, export_format, gzip),
+        media_type=data_exporter.media_type(export_format, gzip),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/metrics", response_model=CallMetrics)
 async def get_call_metrics(
     agent_id: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     company = get_user_company(db, current_user)
@@ -201,7 +291,7 @@ async def schedule_call(
         )
     
     # Schedule the lead
-    success = call_scheduler.schedule_lead_now(request.lead_id)
+    success = call_scheduler.schedule_lead_now(db, request.lead_id)
     
     if success:
         return {"message": "Lead scheduled successfully"}
@@ -213,8 +303,18 @@ async def schedule_call(
 
 
 @router.post("/run-scheduler")
-async def run_scheduler():
-    """Endpoint for Cloud Scheduler to trigger call scheduling"""
+def run_scheduler():
+    """
+    Endpoint for Cloud Scheduler to trigger call scheduling.
+    Deployments running the dispatcher worker (python -m app.worker) disable it
+    with RUN_SCHEDULER_ENDPOINT_ENABLED=false.
+    """
+    if not settings.RUN_SCHEDULER_ENDPOINT_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scheduler runs in the dispatcher worker"
+        )
+    
     try:
         stats = call_scheduler.run_schedule_cycle()
         return {
@@ -246,41 +346,117 @@ async def retell_webhook(
         # Parse webhook data
         webhook_data = await request.json()
         
-        # Find the interaction attempt
+        # Find the interaction attempt, locked: the reconciler (or a redelivery) may be
+        # completing it right now, and apply_call_result must see the status it committed
         call_id = webhook_data.get("call_id")
         attempt = db.query(InteractionAttempt).filter(
             InteractionAttempt.retell_call_id == call_id
-        ).first()
+        ).with_for_update().first()
         
         if not attempt:
             # Log unknown call but don't fail
+            webhooks_processed.inc("ignored")
             return {"status": "ignored", "reason": "Unknown call ID"}
         
-        # Update attempt with webhook data
-        attempt.status = "completed"
-        attempt.outcome = webhook_data.get("outcome", "unknown")
-        attempt.duration_seconds = webhook_data.get("duration_seconds")
-        attempt.transcript_url = webhook_data.get("recording_url")
-        attempt.summary = webhook_data.get("summary")
-        attempt.raw_webhook_data = webhook_data
-        
-        # Update lead status based on outcome
-        lead = db.query(Lead).filter(Lead.id == attempt.lead_id).first()
-        if lead:
-            if attempt.outcome == "answered":
-                lead.status = "done"
-                lead.disposition = "completed"
-            elif lead.attempts_count >= lead.agent.max_attempts:
-                lead.status = "done"
-                lead.disposition = attempt.outcome
+        # Complete the attempt and precompute the lead's next dial time from its retry policy
+        apply_call_result(db, attempt, webhook_data)
         
         db.commit()
         
+        webhooks_processed.inc("processed")
+        _observe_webhook_lag(webhook_data)
         return {"status": "processed"}
         
     except Exception as e:
         db.rollback()
+        webhooks_processed.inc("error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Webhook processing failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+# The id is generated just before created_at is set; allow for that and small clock steps
+CALL_ID_TIME_SLACK = timedelta(minutes=5)
+
+
+@router.get("/{call_id}", response_model=CallDetailResponse)
+async def get_call(
+    call_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """One call with its summary and raw webhook payload"""
+    company = get_user_company(db, current_user)
+    
+    # A UUIDv7 id carries its creation time: bound created_at so only that month's partition is read
+    try:
+        created_around = uuid7_time(uuid.UUID(call_id)).replace(tzinfo=None)
+        created_bound = InteractionAttempt.created_at.between(
+            created_around - CALL_ID_TIME_SLACK, created_around + CALL_ID_TIME_SLACK
+        )
+    except ValueError:
+        # Older v4 ids (or not a UUID): no bound
+        created_bound = true()
+    
+    result = db.query(
+        InteractionAttempt,
+        Lead.first_name,
+        Lead.phone_e164,
+        Agent.name
+    ).join(
+        Lead, InteractionAttempt.lead_id == Lead.id
+    ).join(
+        Agent, InteractionAttempt.agent_id == Agent.id
+    ).options(
+        joinedload(InteractionAttempt.payload)
+    ).filter(
+        InteractionAttempt.id == call_id,
+        created_bound,
+        Agent.company_id == company.id,
+        Agent.is_deleted == False
+    ).first()
+    
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Call not found"
+        )
+    
+    attempt, lead_name, lead_phone, agent_name = result
+    payload = attempt.payload
+    return CallDetailResponse(
+        id=attempt.id,
+        lead_id=attempt.lead_id,
+        agent_id=attempt.agent_id,
+        attempt_number=attempt.attempt_number,
+        status=attempt.status,
+        outcome=attempt.outcome,
+        duration_seconds=attempt.duration_seconds,
+        transcript_url=attempt.transcript_url,
+        retell_call_id=attempt.retell_call_id,
+        from_number=attempt.from_number,
+        created_at=attempt.created_at,
+        updated_at=attempt.updated_at,
+        lead_name=lead_name,
+        lead_phone=lead_phone,
+        agent_name=agent_name,
+        summary=payload.summary if payload else None,
+        raw_webhook_data=payload.raw_webhook_data if payload else None
+    )
+
+
+def _observe_webhook_lag(webhook_data: dict) -> None:
+    """Record how long after the call ended the webhook was processed"""
+    call = webhook_data.get("call") if isinstance(webhook_data.get("call"), dict) else {}
+    end_timestamp = webhook_data.get("end_timestamp") or call.get("end_timestamp")
+    if not end_timestamp:
+        return
+    
+    try:
+        # Retell timestamps are epoch milliseconds
+        lag = time.time() - float(end_timestamp) / 1000
+    except (TypeError, ValueError):
+        return
+    
+    webhook_processing_lag.observe(max(lag, 0.0))
\ No newline at end of file
@@ -1,19 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
+from collections import Counter
 import csv
 import io
-from app.db.deps import get_db, get_current_user
+import json
+from app.core.config import settings
+from app.db.deps import get_db, get_read_db, get_current_user
 from app.schemas.lead import (
     LeadCreate, LeadUpdate, LeadResponse, LeadListResponse, 
-    CSVImportRequest, CSVImportResponse
+    CSVImportRequest, CSVImportResponse, LeadBatchItemResult, LeadBatchResponse,
+    LeadBulkRequest, LeadBulkResponse, ArchivedLeadListResponse, ArchivedLeadDetailResponse
 )
 from app.models.user import User
 from app.models.company import Company
 from app.models.agent import Agent
 from app.models.lead import Lead
+from app.models.archived_lead import ArchivedLead
+from app.models.archived_interaction_attempt import ArchivedInteractionAttempt
+from app.models.job import Job
+from app.services.custom_field_filter import parse_custom_field_filter
+from app.services.data_export import data_exporter
+from app.services.lead_bulk import lead_bulk_service, lead_filter_clauses
+from app.services.lead_ingest import lead_ingest_service
 from app.services.phone_service import phone_service
 import uuid
 
@@ -51,6 +63,21 @@ def get_agent_by_id(db: Session, agent_id: str, company_id: str) -> Agent:
     return agent
 
 
+def parse_custom_fields_query(raw: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode the JSON custom_fields query parameter into a validated filter, or raise 400"""
+    if not raw:
+        return None
+    try:
+        spec = json.loads(raw)
+        parse_custom_field_filter(spec)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid custom_fields filter: {e}"
+        )
+    return spec
+
+
 @router.post("/", response_model=LeadResponse)
 async def create_lead(
     lead_data: LeadCreate,
@@ -69,9 +96,10 @@ async def create_lead(
         )
     
     # Check for duplicates
+    phone_key = phone_service.phone_key(normalized_phone)
     existing_lead = db.query(Lead).filter(
         Lead.agent_id == agent.id,
-        Lead.phone_e164 == normalized_phone,
+        Lead.phone_key == phone_key,
         Lead.is_deleted == False
     ).first()
     
@@ -86,6 +114,7 @@ async def create_lead(
         agent_id=uuid.UUID(lead_data.agent_id),
         first_name=lead_data.first_name,
         phone_e164=normalized_phone,
+        phone_key=phone_key,
         custom_fields=lead_data.custom_fields or {},
         schedule_at=lead_data.schedule_at or datetime.utcnow(),
         created_by=current_user.id,
@@ -99,14 +128,86 @@ async def create_lead(
     return lead
 
 
+async def _request_body(request: Request) -> bytes:
+    """Raw body, read on the event loop so the endpoint itself can be sync"""
+    return await request.body()
+
+
+@router.post("/batch", response_model=LeadBatchResponse)
+def create_leads_batch(
+    request: Request,
+    body: bytes = Depends(_request_body),
+    agent_id: Optional[str] = Query(None, description="Agent for items that don't name one"),
+    on_conflict: str = Query("update", pattern="^(update|skip)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create or update up to LEAD_BATCH_MAX_ITEMS leads in one request.
+    
+    The body is a JSON array of leads, or NDJSON (one lead per line) with
+    Content-Type application/x-ndjson. Leads are matched on agent and
+    normalized phone; results are returned per item, in input order.
+    Validation, normalization and the upserts are blocking work, so this is
+    a sync endpoint run in the threadpool.
+    """
+    company = get_user_company(db, current_user)
+    
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = []
+        for line_number, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(LeadBatchItemResult(
+                    index=len(items), status="error", error=f"Line {line_number}: invalid JSON ({e})"
+                ))
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be a JSON array of leads or NDJSON"
+            )
+        if isinstance(items, dict):
+            items = items.get("leads")
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be a JSON array of leads or NDJSON"
+            )
+    
+    if len(items) > settings.LEAD_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.LEAD_BATCH_MAX_ITEMS} leads per batch"
+        )
+    
+    results = lead_ingest_service.upsert(db, company.id, current_user.id, items, agent_id, on_conflict)
+    db.commit()
+    
+    counts = Counter(result.status for result in results)
+    return LeadBatchResponse(
+        inserted=counts["inserted"],
+        updated=counts["updated"],
+        skipped=counts["skipped"],
+        error_count=counts["error"] + counts["duplicate"],
+        results=results
+    )
+
+
 @router.get("/", response_model=LeadListResponse)
 async def list_leads(
     agent_id: Optional[str] = Query(None),
-    status_filter: Optional[str] = Query(None, pattern="^(new|in_progress|done)$"),
+    status_filter: Optional[str] = Query(None, pattern="^(new|in_progress|paused|done)$"),
     search: Optional[str] = Query(None),
+    custom_fields: Optional[str] = Query(None, description='JSON filter, e.g. {"city": "Austin", "budget": {"gte": 1000}}'),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     company = get_user_company(db, current_user)
@@ -118,25 +219,196 @@ async def list_leads(
         Lead.is_deleted == False
     )
     
-    # Apply filters
-    if agent_id:
-        query = query.filter(Lead.agent_id == agent_id)
+    # Apply filters (shared with the bulk operations)
+    query = query.filter(*lead_filter_clauses(
+        agent_id=agent_id, status=status_filter, search=search,
+        custom_fields=parse_custom_fields_query(custom_fields)
+    ))
     
-    if status_filter:
-        query = query.filter(Lead.status == status_filter)
+    total = query.count()
+    leads = query.offset((page - 1) * per_page).limit(per_page).all()
+    
+    return LeadListResponse(
+        leads=leads,
+        total=total,
+        page=page,
+        per_page=per_page
+    )
+
+
+LEAD_EXPORT_COLUMNS = [
+    ("id", "str"), ("agent_id", "str"), ("agent_name", "str"), ("first_name", "str"),
+    ("phone_e164", "str"), ("status", "str"), ("disposition", "str"), ("attempts_count", "int"),
+    ("schedule_at", "datetime"), ("custom_fields", "json"), ("created_at", "datetime"), ("updated_at", "datetime")
+]
+
+
+@router.get("/export")
+async def export_leads(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson|parquet)$"),
+    gzip: bool = Query(False),
+    agent_id: Optional[str] = Query(None),
+    status_filter: Optional[str] = Query(None, pattern="^(new|in_progress|paused|done)$"),
+    search: Optional[str] = Query(None),
+    custom_fields: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every lead matching the list filters as CSV, NDJSON or Parquet"""
+    company = get_user_company(db, current_user)
+    custom_field_filter = parse_custom_fields_query(custom_fields)
+    if export_format == "parquet" and not data_exporter.parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export is not available on this server"
+        )
+    
+    statement = select(
+        Lead.id,
+        Lead.agent_id,
+        Agent.name,
+        Lead.first_name,
+        Lead.phone_e164,
+        Lead.status,
+        Lead.disposition,
+        Lead.attempts_count,
+        Lead.schedule_at,
+        Lead.custom_fields,
+        Lead.created_at,
+        Lead.updated_at
+    ).join(Agent, Lead.agent_id == Agent.id).where(
+        Agent.company_id == company.id,
+        Agent.is_deleted == False,
+        Lead.is_deleted == False,
+        *lead_filter_clauses(agent_id=agent_id, status=status_filter, search=search,
+                             custom_fields=custom_field_filter)
+    ).order_by(Lead.created_at)
+    
+    filename = data_exporter.filename("leads", export_format, gzip)
+    return StreamingResponse(
+        data_exporter.stream(db.get_bind(), statement, LEAD_EXPORT_COLUMNS, export_format, gzip),
+        media_type=data_exporter.media_type(export_format, gzip),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/bulk", response_model=LeadBulkResponse)
+def bulk_update_leads(
+    bulk_data: LeadBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Pause, resume, reschedule, reassign or delete every lead matching the
+    filters (or listed in filters.lead_ids) with one UPDATE. With run_async
+    the operation is queued and GET /leads/bulk/{job_id} reports the result.
+    Sync endpoint: the inline UPDATE can touch every lead of the company and
+    runs in the threadpool, not on the event loop.
+    """
+    company = get_user_company(db, current_user)
+    filters = bulk_data.filters.model_dump(exclude_none=True)
+    if not filters and not bulk_data.match_all:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give at least one filter, or set match_all to act on every lead"
+        )
+    if filters.get("agent_id"):
+        get_agent_by_id(db, filters["agent_id"], str(company.id))
     
+    params = {}
+    if bulk_data.action == "reschedule":
+        if not bulk_data.schedule_at:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="schedule_at is required to reschedule"
+            )
+        params["schedule_at"] = bulk_data.schedule_at
+    elif bulk_data.action == "reassign":
+        if not bulk_data.target_agent_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="target_agent_id is required to reassign"
+            )
+        params["agent_id"] = str(get_agent_by_id(db, bulk_data.target_agent_id, str(company.id)).id)
+    
+    if bulk_data.run_async:
+        job = lead_bulk_service.enqueue(db, company.id, current_user.id, bulk_data.action, filters, params)
+        db.commit()
+        return LeadBulkResponse(action=bulk_data.action, status="queued", job_id=str(job.id))
+    
+    affected = lead_bulk_service.apply(db, company.id, current_user.id, bulk_data.action, filters, params)
+    db.commit()
+    
+    return LeadBulkResponse(action=bulk_data.action, status="completed", affected=affected)
+
+
+@router.get("/bulk/{job_id}", response_model=LeadBulkResponse)
+async def get_bulk_job(
+    job_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    company = get_user_company(db, current_user)
+    
+    job = db.query(Job).filter(
+        Job.id == job_id,
+        Job.company_id == company.id,
+        Job.job_type == "bulk_lead_update"
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bulk job not found"
+        )
+    
+    return LeadBulkResponse(
+        action=job.payload.get("action"),
+        status=job.status,
+        affected=(job.payload.get("result") or {}).get("affected"),
+        job_id=str(job.id),
+        error=job.last_error
+    )
+
+
+@router.get("/archive", response_model=ArchivedLeadListResponse)
+async def list_archived_leads(
+    agent_id: Optional[str] = Query(None),
+    phone: Optional[str] = Query(None, description="Exact number, normalized like on import"),
+    search: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search leads moved to the archive tier (app.services.lead_archive); slower than GET /leads"""
+    company = get_user_company(db, current_user)
+    
+    query = db.query(ArchivedLead).join(Agent, ArchivedLead.agent_id == Agent.id).filter(
+        Agent.company_id == company.id,
+        Agent.is_deleted == False,
+        ArchivedLead.is_deleted == False
+    )
+    
+    if agent_id:
+        query = query.filter(ArchivedLead.agent_id == agent_id)
+    if phone:
+        normalized_phone = phone_service.normalize_phone(phone)
+        if not normalized_phone:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid phone number format"
+            )
+        query = query.filter(ArchivedLead.phone_key == phone_service.phone_key(normalized_phone))
     if search:
         query = query.filter(
-            or_(
-                Lead.first_name.ilike(f"%{search}%"),
-                Lead.phone_e164.ilike(f"%{search}%")
-            )
+            ArchivedLead.first_name.ilike(f"%{search}%") | ArchivedLead.phone_e164.ilike(f"%{search}%")
         )
     
     total = query.count()
-    leads = query.offset((page - 1) * per_page).limit(per_page).all()
+    leads = query.order_by(ArchivedLead.archived_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
     
-    return LeadListResponse(
+    return ArchivedLeadListResponse(
         leads=leads,
         total=total,
         page=page,
@@ -144,10 +416,42 @@ async def list_leads(
     )
 
 
+@router.get("/archive/{lead_id}", response_model=ArchivedLeadDetailResponse)
+async def get_archived_lead(
+    lead_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """An archived lead with its call attempts, oldest first"""
+    company = get_user_company(db, current_user)
+    
+    lead = db.query(ArchivedLead).join(Agent, ArchivedLead.agent_id == Agent.id).filter(
+        ArchivedLead.id == lead_id,
+        Agent.company_id == company.id,
+        Agent.is_deleted == False,
+        ArchivedLead.is_deleted == False
+    ).first()
+    
+    if not lead:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived lead not found"
+        )
+    
+    attempts = db.query(ArchivedInteractionAttempt).filter(
+        ArchivedInteractionAttempt.lead_id == lead.id
+    ).order_by(ArchivedInteractionAttempt.created_at).all()
+    
+    return ArchivedLeadDetailResponse.model_validate({
+        **{column.name: getattr(lead, column.name) for column in ArchivedLead.__table__.columns},
+        "attempts": attempts
+    })
+
+
 @router.get("/{lead_id}", response_model=LeadResponse)
 async def get_lead(
     lead_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     company = get_user_company(db, current_user)
@@ -202,6 +506,7 @@ async def update_lead(
                 detail="Invalid phone number format"
             )
         update_data['phone_e164'] = normalized_phone
+        update_data['phone_key'] = phone_service.phone_key(normalized_phone)
     
     for field, value in update_data.items():
         setattr(lead, field, value)
@@ -296,9 +601,10 @@ async def import_leads_csv(
                     continue
                 
                 # Check for duplicates
+                phone_key = phone_service.phone_key(normalized_phone)
                 existing_lead = db.query(Lead).filter(
                     Lead.agent_id == agent.id,
-                    Lead.phone_e164 == normalized_phone,
+                    Lead.phone_key == phone_key,
                     Lead.is_deleted == False
                 ).first()
                 
@@ -329,6 +635,7 @@ async def import_leads_csv(
                     agent_id=agent.id,
                     first_name=first_name,
                     phone_e164=normalized_phone,
+                    phone_key=phone_key,
                     custom_fields=custom_fields,
                     schedule_at=schedule_at,
                     created_by=current_user.id,
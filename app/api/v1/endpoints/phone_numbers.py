@@ -244,27 +244,7 @@ async def list_owned_phone_numbers(
     if provider:
         providers = [p for p in providers if p.provider == provider]
     
-    all_numbers = []
-    
-    for provider_record in providers:
-        try:
-            if provider_record.provider == "twilio":
-                numbers = twilio_service.list_owned_numbers(provider_record.credentials)
-            elif provider_record.provider == "plivo":
-                numbers = plivo_service.list_owned_numbers(provider_record.credentials)
-            else:
-                continue
-            
-            # Add provider info to each number
-            for number in numbers:
-                number["provider"] = provider_record.provider
-            
-            all_numbers.extend(numbers)
-            
-        except Exception as e:
-            logger.error(f"Error fetching owned numbers from {provider_record.provider}: {e}")
-            # Continue with other providers if one fails
-            continue
+    all_numbers = phone_service.list_owned_numbers(providers)
     
     return PhoneNumberListResponse(
         numbers=all_numbers,
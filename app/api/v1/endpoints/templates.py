@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.deps import get_db, get_current_user
+from app.db.deps import get_read_db, get_current_user
 from app.schemas.template import TemplateResponse, TemplateListResponse, IndustryResponse
 from app.models.user import User
 from app.models.template import Template
@@ -13,7 +13,7 @@ router = APIRouter()
 async def list_templates(
     industry: Optional[str] = Query(None),
     use_case: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     query = db.query(Template)
@@ -34,7 +34,7 @@ async def list_templates(
 
 @router.get("/industries", response_model=List[IndustryResponse])
 async def list_templates_by_industry(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     # Get all templates grouped by industry
@@ -61,7 +61,7 @@ async def list_templates_by_industry(
 @router.get("/{template_id}", response_model=TemplateResponse)
 async def get_template(
     template_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     template = db.query(Template).filter(Template.id == template_id).first()
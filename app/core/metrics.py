@@ -0,0 +1,299 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Kept dependency-free and cheap on the hot path: recording a value is a dict
+lookup plus a few integer updates under a lock. Values are per process: each
+gunicorn worker has its own registry and a scrape of /metrics is answered by
+whichever worker gets the request. Every series therefore carries a
+worker="<pid>" label, so the workers' series never overwrite each other (a
+counter dropping when another worker answers would read as a reset).
+Aggregate across workers in queries, e.g. sum without (worker) (rate(...)).
+A worker recycled by GUNICORN_MAX_REQUESTS starts new series under its new pid.
+"""
+import bisect
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], *extra: str) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+
+    def render(self, const_labels: Sequence[str] = ()) -> List[str]:
+        raise NotImplementedError
+
+
+class _ValueMetric(_Metric):
+    """Single value per label set, set directly or read from a callback at scrape time"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Iterable[Tuple[LabelValues, float]]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def render(self, const_labels: Sequence[str] = ()) -> List[str]:
+        if self._callback:
+            items = list(self._callback())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        lines = self._header()
+        for labelvalues, value in items:
+            labels = _format_labels(self.labelnames, labelvalues, *const_labels)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_ValueMetric):
+    metric_type = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(_ValueMetric):
+    metric_type = "gauge"
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0]
+                self._values[labelvalues] = entry
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self, const_labels: Sequence[str] = ()) -> List[str]:
+        with self._lock:
+            items = [(labelvalues, list(counts), total) for labelvalues, (counts, total) in self._values.items()]
+        lines = self._header()
+        for labelvalues, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, *const_labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues, *const_labels)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback=None) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, callback))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        # Read at scrape time: gunicorn forks the workers after this module is imported
+        const_labels = (f'worker="{os.getpid()}"',)
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render(const_labels))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def scrape_denied(authorization: Optional[str], token: str, open_without_token: bool) -> Optional[int]:
+    """
+    HTTP status refusing a /metrics scrape, or None to serve it. Without a
+    token configured the endpoint is only open where open_without_token
+    (development); elsewhere it answers 404 rather than publish tenant metrics.
+    """
+    if not token:
+        return None if open_without_token else 404
+    return None if authorization == f"Bearer {token}" else 401
+
+
+# HTTP
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ("method", "route", "status")
+)
+
+# Scheduler
+scheduler_cycle_duration = registry.histogram(
+    "scheduler_cycle_duration_seconds",
+    "Duration of a full scheduling cycle",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+scheduler_stage_duration = registry.histogram(
+    "scheduler_stage_duration_seconds",
+    "Duration of each scheduling cycle stage",
+    ("stage",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+scheduler_leads = registry.counter(
+    "scheduler_leads_total",
+    "Leads handled by the scheduler by result",
+    ("result",)
+)
+scheduler_company_dispatches = registry.counter(
+    "scheduler_company_dispatches_total",
+    "Calls initiated by the scheduler per company, for checking dispatch fairness",
+    ("company_id",)
+)
+scheduler_last_cycle = registry.gauge(
+    "scheduler_last_cycle_timestamp_seconds",
+    "Unix time the dispatcher worker last finished a cycle, by result (ok/error)",
+    ("result",)
+)
+caller_id_selections = registry.counter(
+    "caller_id_selections_total",
+    "Caller-ID pool picks by result (lru/local/nonlocal, or exhausted when every number is capped)",
+    ("result",)
+)
+pacing_target_cpm = registry.gauge(
+    "pacing_target_calls_per_minute",
+    "Predictive pacing dial-rate target per agent",
+    ("agent_id",)
+)
+pacing_answer_rate = registry.gauge(
+    "pacing_answer_rate",
+    "Smoothed rolling answer rate used for pacing, per agent",
+    ("agent_id",)
+)
+retry_decisions = registry.counter(
+    "retry_decisions_total",
+    "Call results by outcome and retry decision (retry/done)",
+    ("outcome", "decision")
+)
+calls_reconciled = registry.counter(
+    "calls_reconciled_total",
+    "Stale in_progress attempts checked against Retell, by result (completed/active/lookup_failed/abandoned)",
+    ("result",)
+)
+dispatch_wheel_leads = registry.gauge(
+    "dispatch_wheel_leads",
+    "Leads waiting in the dispatcher's timing wheel"
+)
+dispatch_wheel_delay = registry.histogram(
+    "dispatch_wheel_delay_seconds",
+    "Time between a lead's schedule_at and the dispatcher firing it from the wheel",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+)
+
+# Background jobs
+jobs_processed = registry.counter(
+    "jobs_processed_total",
+    "Background jobs run by type and result (succeeded/retried/dead)",
+    ("job_type", "result")
+)
+job_duration = registry.histogram(
+    "job_duration_seconds",
+    "Background job handler run time by type",
+    ("job_type",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0)
+)
+job_queue_lag = registry.histogram(
+    "job_queue_lag_seconds",
+    "Time between a job becoming runnable and being claimed",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+)
+
+# Retell
+retell_call_create_duration = registry.histogram(
+    "retell_call_create_duration_seconds",
+    "Latency of Retell call creation requests",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+)
+retell_call_create_errors = registry.counter(
+    "retell_call_create_errors_total",
+    "Failed Retell call creation requests"
+)
+
+# Webhooks
+webhook_processing_lag = registry.histogram(
+    "webhook_processing_lag_seconds",
+    "Time between a call ending and its webhook being processed",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+)
+webhooks_processed = registry.counter(
+    "webhooks_processed_total",
+    "Retell webhooks by processing result",
+    ("result",)
+)
+
+# Caches
+cache_requests = registry.counter(
+    "cache_requests_total",
+    "In-process cache lookups by cache and result (hit/miss)",
+    ("cache", "result")
+)
+
+
+def record_cache_lookup(cache: str, hit: bool, count: int = 1) -> None:
+    if count:
+        cache_requests.inc(cache, "hit" if hit else "miss", amount=count)
@@ -0,0 +1,34 @@
+import time
+from typing import Dict
+
+from app.core.metrics import registry
+
+startup_phase_duration = registry.gauge(
+    "app_startup_phase_seconds",
+    "Time spent in each application startup phase",
+    ["phase"]
+)
+
+
+class StartupTimer:
+    """Records how long each boot phase takes, measured from when this module is imported"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last_mark = self.started
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        """Close the phase that ran since the previous mark"""
+        now = time.perf_counter()
+        self.phases[phase] = now - self.last_mark
+        startup_phase_duration.set(now - self.last_mark, phase)
+        self.last_mark = now
+
+    def report(self) -> str:
+        parts = [f"{phase}={seconds * 1000:.0f}ms" for phase, seconds in self.phases.items()]
+        total = (self.last_mark - self.started) * 1000
+        return f"Startup timing: {', '.join(parts)} (total {total:.0f}ms)"
+
+
+startup_timer = StartupTimer()
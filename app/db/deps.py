@@ -1,11 +1,12 @@
 from typing import Generator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, ReadSessionLocal, engine, read_engine
 from app.core.security import verify_token
 from app.models.user import User
 from app.models.company import Company
+from app.middleware.read_your_writes import WRITE_METHODS, pin_to_primary, requires_primary
 
 security = HTTPBearer()
 
@@ -19,6 +20,7 @@ def get_db() -> Generator:
 
 
 def get_current_user(
+    request: Request,
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> User:
@@ -30,6 +32,10 @@ def get_current_user(
             detail="Could not validate credentials",
         )
     
+    # Writes keep the user's next reads off the replica (see get_read_db)
+    if read_engine is not engine and request.method in WRITE_METHODS:
+        pin_to_primary(db, user_id)
+    
     user = db.query(User).filter(User.id == user_id, User.is_deleted == False).first()
     if not user:
         raise HTTPException(
@@ -40,6 +46,28 @@ def get_current_user(
     return user
 
 
+def get_read_db(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Generator:
+    """
+    Session for read-only endpoints - routed to the read replica unless the
+    user wrote recently (read-your-writes) or asked for primary consistency.
+
+    On the primary it reuses the request's get_db session (already open for
+    get_current_user) instead of checking out a second connection.
+    """
+    if read_engine is engine or requires_primary(request, current_user):
+        yield db
+        return
+    try:
+        read_db = ReadSessionLocal()
+        yield read_db
+    finally:
+        read_db.close()
+
+
 def get_user_company(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
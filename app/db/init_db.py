@@ -1,25 +1,59 @@
+import argparse
+import logging
+from pathlib import Path
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal, engine, Base
+from app.db.session import SessionLocal, engine
 from app.models import *
 
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+BASELINE_REVISION = "0001_initial_schema"
+
+
+def run_migrations() -> None:
+    """Upgrade the schema to the latest Alembic revision"""
+    from alembic import command
+    from alembic.config import Config
+    
+    # No ini file, so alembic's env.py leaves the caller's logging config alone
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    
+    tables = inspect(engine).get_table_names()
+    if "alembic_version" not in tables and "users" in tables:
+        # Created by the old create_all-on-boot, which matches the baseline
+        logger.info(f"Existing schema without migration history - stamping {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    
+    command.upgrade(config, "head")
+
+
+def seed_db() -> None:
+    """Insert default voices and templates (no-op when already present)"""
+    db = SessionLocal()
+    try:
+        init_voices(db)
+        init_templates(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 
 def init_db() -> None:
+    """Migrate and seed - run as a deploy step (`python -m app.db.init_db`), not on boot"""
     try:
-        # Create tables
-        Base.metadata.create_all(bind=engine)
+        run_migrations()
         
-        # Initialize seed data
-        db = SessionLocal()
         try:
-            init_voices(db)
-            init_templates(db)
-            db.commit()
+            seed_db()
             print("✅ Database initialized successfully")
         except Exception as e:
-            db.rollback()
             print(f"⚠️ Error initializing database seed data: {e}")
-        finally:
-            db.close()
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         print("🔄 Server will start without database - API will return errors until DB is connected")
@@ -144,4 +178,16 @@ def init_templates(db: Session) -> None:
     ]
     
     for template in templates:
-        db.add(template)
\ No newline at end of file
+        db.add(template)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database migrations and seed data")
+    parser.add_argument("--skip-seed", action="store_true", help="Only run migrations")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    run_migrations()
+    if not args.skip_seed:
+        seed_db()
+    print("✅ Database initialized successfully")
\ No newline at end of file
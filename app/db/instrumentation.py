@@ -0,0 +1,164 @@
+"""
+Per-request / per-cycle SQL instrumentation.
+
+Engine event hooks time every statement and attribute it to the QueryStats
+collector active in the current context (set by track_queries). Identical
+statements executed many times within one unit of work are reported as
+likely N+1 patterns.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """Queries executed within one request or scheduler cycle"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.query_count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+        self.slowest: List[Tuple[float, str]] = []
+
+    def record(self, statement: str, duration: float) -> None:
+        self.query_count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+
+        # Keep only the N slowest statements
+        self.slowest.append((duration, statement))
+        if len(self.slowest) > settings.SQL_SLOW_STATEMENTS:
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            self.slowest.pop()
+
+    @property
+    def total_time_ms(self) -> float:
+        return self.total_time * 1000
+
+    def repeated_statements(self) -> List[Tuple[str, int]]:
+        """Statements executed at least SQL_REPEAT_WARN_THRESHOLD times"""
+        threshold = settings.SQL_REPEAT_WARN_THRESHOLD
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+class QueryStatsRegistry:
+    """Process-wide aggregates per label, exported as metrics in production"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def add(self, stats: QueryStats) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(stats.label, {
+                "units": 0,
+                "queries": 0,
+                "db_time_seconds": 0.0,
+                "repeated_statement_warnings": 0
+            })
+            totals["units"] += 1
+            totals["queries"] += stats.query_count
+            totals["db_time_seconds"] += stats.total_time
+            totals["repeated_statement_warnings"] += len(stats.repeated_statements())
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {label: dict(totals) for label, totals in self._totals.items()}
+
+
+query_stats_registry = QueryStatsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+
+    stats.record(statement, time.perf_counter() - start_times.pop())
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time so
+    # entries don't pile up on the pooled connection (which outlives the request)
+    conn = context.connection
+    if conn is None or context.execution_context is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    if start_times:
+        start_times.pop()
+
+
+def install_query_instrumentation(engine: Engine) -> None:
+    """Attach the timing hooks to an engine (idempotent)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def get_current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(label: str) -> Iterator[QueryStats]:
+    """Collect statistics for all queries issued within the block"""
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        report_query_stats(stats)
+
+
+def report_query_stats(stats: QueryStats) -> None:
+    """Record the unit of work and warn about likely N+1 patterns"""
+    query_stats_registry.add(stats)
+
+    for statement, count in stats.repeated_statements():
+        logger.warning(
+            f"Possible N+1 in {stats.label}: statement executed {count} times: "
+            f"{_compact(statement, 300)}"
+        )
+
+    if stats.slowest:
+        slowest = "; ".join(
+            f"{duration * 1000:.1f}ms {_compact(statement, 120)}"
+            for duration, statement in sorted(stats.slowest, reverse=True)
+        )
+        logger.debug(
+            f"{stats.label}: {stats.query_count} queries in {stats.total_time_ms:.1f}ms, "
+            f"slowest: {slowest}"
+        )
+
+
+def _compact(statement: str, limit: int) -> str:
+    return " ".join(statement.split())[:limit]
@@ -0,0 +1,65 @@
+"""Scrape-time database metrics: connection pool state and per-unit SQL totals"""
+from typing import Iterable, Tuple
+from sqlalchemy.pool import QueuePool
+from app.core.metrics import registry
+from app.db.instrumentation import query_stats_registry
+from app.db.session import engine, read_engine
+
+
+def _queue_pools():
+    # Only QueuePool exposes these counters (NullPool/StaticPool/SingletonThreadPool don't)
+    pools = [("primary", engine.pool)]
+    if read_engine is not engine:
+        pools.append(("replica", read_engine.pool))
+    return [(name, pool) for name, pool in pools if isinstance(pool, QueuePool)]
+
+
+def _pool_connections() -> Iterable[Tuple[Tuple[str, ...], float]]:
+    for name, pool in _queue_pools():
+        yield (name, "checkedout"), pool.checkedout()
+        yield (name, "checkedin"), pool.checkedin()
+        yield (name, "overflow"), pool.overflow()
+
+
+def _pool_size() -> Iterable[Tuple[Tuple[str, ...], float]]:
+    for name, pool in _queue_pools():
+        yield (name,), pool.size()
+
+
+def _query_totals(field: str):
+    def collect() -> Iterable[Tuple[Tuple[str, ...], float]]:
+        for unit, totals in query_stats_registry.snapshot().items():
+            yield (unit,), totals[field]
+    return collect
+
+
+registry.gauge(
+    "db_pool_connections",
+    "Database pool connections by state",
+    ("engine", "state"),
+    callback=_pool_connections
+)
+registry.gauge(
+    "db_pool_size",
+    "Configured database pool size",
+    ("engine",),
+    callback=_pool_size
+)
+registry.counter(
+    "db_queries_total",
+    "SQL statements executed per route/scheduler unit",
+    ("unit",),
+    callback=_query_totals("queries")
+)
+registry.counter(
+    "db_query_time_seconds_total",
+    "Time spent in SQL per route/scheduler unit",
+    ("unit",),
+    callback=_query_totals("db_time_seconds")
+)
+registry.counter(
+    "db_repeated_statement_warnings_total",
+    "Likely N+1 patterns (repeated identical statements) per route/scheduler unit",
+    ("unit",),
+    callback=_query_totals("repeated_statement_warnings")
+)
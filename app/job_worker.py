@@ -0,0 +1,174 @@
+"""
+Background job worker: claims jobs from the Postgres queue and runs them.
+
+    python -m app.job_worker
+    python -m app.job_worker --concurrency 8 --queue default --health-port 8082
+
+Jobs run on a thread pool, each in its own database session; the worker only
+claims as many jobs as it has free threads. /health and /metrics are served
+like the dispatcher worker's. SIGTERM/SIGINT stop claiming and let running
+jobs finish - anything cut off is re-claimed after its visibility timeout.
+"""
+import argparse
+import importlib
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.services.job_queue import job_queue
+from app.worker import start_health_server
+
+logger = logging.getLogger(__name__)
+
+# Modules whose @job_queue.handler registrations the worker needs
+JOB_HANDLER_MODULES = (
+    "app.services.attempt_partitions",
+    "app.services.call_reconciler",
+    "app.services.lead_archive",
+    "app.services.lead_bulk",
+)
+
+# System jobs kept scheduled by the workers: (job_type, seconds between runs)
+PERIODIC_JOBS = (
+    ("reconcile_calls", settings.RECONCILE_INTERVAL_SECONDS),
+    ("maintain_attempt_partitions", settings.ATTEMPT_PARTITION_MAINTENANCE_SECONDS),
+    ("archive_done_leads", settings.LEAD_ARCHIVE_INTERVAL_SECONDS),
+)
+
+MAINTENANCE_INTERVAL_SECONDS = 60.0
+
+
+class JobWorker:
+    def __init__(self, concurrency: int, queue: str = "default", poll_seconds: float = 1.0):
+        self.concurrency = concurrency
+        self.queue = queue
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        # Unhealthy when claims have been failing (database unreachable) for this long
+        self.stale_after = max(60.0, poll_seconds * 10)
+        self.stopping = threading.Event()
+        self.started_at = time.time()
+        self.last_claim_at: Optional[float] = None
+        self.consecutive_errors = 0
+        self.results: Dict[str, int] = {}
+
+    def run(self) -> None:
+        logger.info(f"Job worker {self.worker_id} started (queue={self.queue}, concurrency={self.concurrency})")
+        in_flight: Set[Future] = set()
+        last_maintenance = 0.0
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="job") as pool:
+            while not self.stopping.is_set():
+                if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL_SECONDS:
+                    self.maintain()
+                    last_maintenance = time.monotonic()
+
+                claimed = self.claim(self.concurrency - len(in_flight)) if len(in_flight) < self.concurrency else []
+                for job in claimed:
+                    in_flight.add(pool.submit(job_queue.execute, job["id"], job["lock_token"]))
+
+                if in_flight:
+                    # Wake as soon as a thread frees up (or to poll again for new jobs)
+                    done, in_flight = wait(in_flight, timeout=self.poll_seconds, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._record(future)
+                elif not claimed:
+                    self.stopping.wait(self.poll_seconds)
+
+            if in_flight:
+                logger.info(f"Waiting for {len(in_flight)} running jobs to finish")
+            for future in wait(in_flight).done:
+                self._record(future)
+        logger.info(f"Job worker stopped: {self.results}")
+
+    def claim(self, limit: int):
+        db = SessionLocal()
+        try:
+            claimed = job_queue.claim(db, self.worker_id, limit, self.queue)
+            self.consecutive_errors = 0
+            self.last_claim_at = time.time()
+            return claimed
+        except Exception as e:
+            db.rollback()
+            self.consecutive_errors += 1
+            logger.error(f"Claiming jobs failed ({self.consecutive_errors} in a row): {e}")
+            return []
+        finally:
+            db.close()
+
+    def maintain(self) -> None:
+        db = SessionLocal()
+        try:
+            stats = job_queue.maintain(db)
+            if any(stats.values()):
+                logger.info(f"Job queue maintenance: {stats}")
+            if self.queue == "default":
+                for job_type, every_seconds in PERIODIC_JOBS:
+                    job_queue.schedule_periodic(db, job_type, every_seconds)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Job queue maintenance failed: {e}")
+        finally:
+            db.close()
+
+    def _record(self, future: Future) -> None:
+        try:
+            result = future.result()
+        except Exception as e:
+            # execute() handles handler errors; this is a failure to even record the outcome
+            logger.error(f"Job execution error: {e}")
+            result = "error"
+        self.results[result] = self.results.get(result, 0) + 1
+
+    def stop(self, signum=None, frame=None) -> None:
+        if not self.stopping.is_set():
+            logger.info("Shutdown requested - finishing running jobs")
+        self.stopping.set()
+
+    def health(self) -> Dict:
+        reference = self.last_claim_at or self.started_at
+        return {
+            "status": "healthy" if time.time() - reference < self.stale_after else "unhealthy",
+            "worker_id": self.worker_id,
+            "last_claim_at": self.last_claim_at,
+            "consecutive_errors": self.consecutive_errors,
+            "results": self.results
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY,
+                        help="Jobs run at once by this process")
+    parser.add_argument("--queue", default="default")
+    parser.add_argument("--poll", type=float, default=settings.JOB_POLL_SECONDS,
+                        help="Seconds to wait between claims when the queue is empty")
+    # Cloud Run expects the container to listen on $PORT
+    parser.add_argument("--health-port", type=int, default=int(os.getenv("PORT", settings.WORKER_HEALTH_PORT)))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    for module in JOB_HANDLER_MODULES:
+        importlib.import_module(module)
+
+    worker = JobWorker(args.concurrency, args.queue, args.poll)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    health_server = start_health_server(worker, args.health_port)
+    logger.info(f"Health endpoint on :{args.health_port}/health")
+    try:
+        worker.run()
+    finally:
+        health_server.shutdown()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
-from fastapi import Request, HTTPException, status
+from typing import Optional
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
 from starlette.responses import Response
 from app.core.security import verify_token
 from app.db.session import SessionLocal
@@ -11,7 +13,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class OnboardingMiddleware(BaseHTTPMiddleware):
+class OnboardingMiddleware:
     """
     Middleware to enforce onboarding completion for business logic endpoints.
     
@@ -41,23 +43,33 @@ class OnboardingMiddleware(BaseHTTPMiddleware):
         "/redoc"
     )
     
-    async def dispatch(self, request: Request, call_next) -> Response:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Get the request path
-        path = request.url.path
+        path = scope["path"]
         
         # Skip onboarding check for excluded paths
         if self._is_excluded_path(path):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
         # Skip onboarding check for non-API routes
         if not path.startswith("/api/v1/"):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
         # Check if this is a protected route (has Authorization header)
-        auth_header = request.headers.get("Authorization")
+        auth_header = Headers(scope=scope).get("Authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
             # No auth header - let the endpoint handle authentication
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
         # Extract and verify token
         token = auth_header.split(" ")[1]
@@ -65,9 +77,20 @@ class OnboardingMiddleware(BaseHTTPMiddleware):
         
         if not user_id:
             # Invalid token - let the endpoint handle this
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
-        # Check onboarding status
+        # Blocking DB lookups run in the threadpool, like sync endpoints
+        response = await run_in_threadpool(self._onboarding_response, user_id)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        
+        # User is fully onboarded (or unknown - let the endpoint handle it), proceed
+        await self.app(scope, receive, send)
+    
+    def _onboarding_response(self, user_id: str) -> Optional[Response]:
+        """Error response when the user hasn't finished onboarding, else None"""
         db = SessionLocal()
         try:
             user = db.query(User).filter(
@@ -77,7 +100,7 @@ class OnboardingMiddleware(BaseHTTPMiddleware):
             
             if not user:
                 # User not found - let endpoint handle this
-                return await call_next(request)
+                return None
             
             # Check if onboarding is complete (profile + company created together)
             if not user.name:
@@ -110,8 +133,7 @@ class OnboardingMiddleware(BaseHTTPMiddleware):
                     headers={"X-Onboarding-Step": "profile"}
                 )
             
-            # User is fully onboarded, proceed
-            return await call_next(request)
+            return None
             
         except Exception as e:
             logger.error(f"Error in onboarding middleware: {e}")
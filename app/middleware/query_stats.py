@@ -0,0 +1,40 @@
+from starlette.datastructures import MutableHeaders
+from app.core.config import settings
+from app.db.instrumentation import track_queries
+from app.utils.routes import route_template
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the SQL issued while handling each request.
+
+    In development the numbers are returned as X-DB-* response headers;
+    everywhere they are aggregated per route template for metrics, and
+    repeated identical statements (likely N+1) are logged as warnings.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        add_headers = settings.ENVIRONMENT == "development"
+
+        with track_queries(f"{scope['method']} {scope['path']}") as stats:
+            async def send_with_stats(message):
+                if add_headers and message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.query_count)
+                    headers["X-DB-Time-Ms"] = f"{stats.total_time_ms:.1f}"
+                    headers["X-DB-Repeated-Statements"] = str(len(stats.repeated_statements()))
+                    if stats.slowest:
+                        headers["X-DB-Slowest-Ms"] = f"{max(stats.slowest)[0] * 1000:.1f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                stats.label = f"{scope['method']} {route_template(scope['app'], scope)}"
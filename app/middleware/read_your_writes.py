@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+from fastapi import Request
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.user import User
+
+# Header clients can send to force a primary read explicitly
+CONSISTENCY_HEADER = "X-Read-Consistency"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Read-your-writes: after a user writes, their reads stay on the primary for
+# READ_YOUR_WRITES_WINDOW_SECONDS so a dashboard refresh right after creating
+# a lead doesn't read a lagging replica. The deadline lives on the user's row
+# in the primary (users.reads_primary_until), so it holds for Bearer-token
+# clients and whichever worker or instance serves the next request.
+
+
+def pin_to_primary(db: Session, user_id: str) -> None:
+    """Keep the user's reads on the primary for the configured window"""
+    until = datetime.utcnow() + timedelta(seconds=settings.READ_YOUR_WRITES_WINDOW_SECONDS)
+    db.execute(
+        # Not a profile change: leave updated_at alone
+        update(User).where(User.id == user_id)
+        .values(reads_primary_until=until, updated_at=User.updated_at)
+    )
+    # Committed on its own so the endpoint's transaction doesn't hold the user row
+    db.commit()
+
+
+def requires_primary(request: Request, user: User) -> bool:
+    """Check whether this request must read from the primary database"""
+    if request.headers.get(CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+
+    return user.reads_primary_until is not None and datetime.utcnow() < user.reads_primary_until
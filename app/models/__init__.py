@@ -3,7 +3,11 @@ from .company import Company
 from .agent import Agent
 from .lead import Lead
 from .interaction_attempt import InteractionAttempt
+from .interaction_attempt_payload import InteractionAttemptPayload
 from .template import Template
 from .voice import Voice
 from .phone_provider import PhoneProvider
-from .api_key import ApiKey
\ No newline at end of file
+from .api_key import ApiKey
+from .job import Job
+from .archived_lead import ArchivedLead
+from .archived_interaction_attempt import ArchivedInteractionAttempt
\ No newline at end of file
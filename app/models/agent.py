@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, JSON, Integer, Time, CheckConstraint
+from sqlalchemy import Column, String, Text, ForeignKey, JSON, Integer, Time, CheckConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -17,10 +17,19 @@ class Agent(BaseModel):
     functions = Column(JSON, default=[])
     inbound_phone = Column(String(50))
     outbound_phone = Column(String(50))
+    # Caller IDs rotated across outbound calls (company-owned numbers); empty = outbound_phone only
+    outbound_phone_pool = Column(JSON, default=[])
+    caller_id_strategy = Column(String(20), default="lru")
+    # 'predictive' paces dialing from live answer rates (app.services.pacing)
+    pacing_mode = Column(String(20), default="off")
     
     # Call Flow Configuration Fields
     max_attempts = Column(Integer, default=3)
     retry_delay_minutes = Column(Integer, default=30)
+    # Per-outcome retry overrides (app.services.retry_policy); null = defaults
+    retry_policy = Column(JSON)
+    # Custom field filter limiting which of its leads the agent dials; null = all
+    lead_filter = Column(JSON)
     business_hours_start = Column(Time)
     business_hours_end = Column(Time)
     timezone = Column(String(50), default="UTC")
@@ -36,6 +45,10 @@ class Agent(BaseModel):
     # Constraints
     __table_args__ = (
         CheckConstraint("status IN ('active', 'inactive')", name="check_agent_status"),
+        CheckConstraint("caller_id_strategy IN ('lru', 'local_presence')", name="check_agent_caller_id_strategy"),
+        CheckConstraint("pacing_mode IN ('off', 'predictive')", name="check_agent_pacing_mode"),
+        # A company's live agents (tenant scoping on nearly every request)
+        Index("ix_agents_company_id_status_live", "company_id", "status", postgresql_where=text("is_deleted = false")),
     )
     
     # Relationships
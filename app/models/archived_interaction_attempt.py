@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from .base import BaseModel
+
+
+class ArchivedInteractionAttempt(BaseModel):
+    """An archived lead's attempt, with its summary and raw webhook payload folded back in"""
+    __tablename__ = "archived_interaction_attempts"
+    
+    lead_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    agent_id = Column(UUID(as_uuid=True), nullable=False)
+    attempt_number = Column(Integer, nullable=False)
+    status = Column(String(20))
+    outcome = Column(String(20))
+    duration_seconds = Column(Integer)
+    transcript_url = Column(String(500))
+    retell_call_id = Column(String(255))
+    from_number = Column(String(50))
+    summary = Column(Text)
+    raw_webhook_data = Column(JSON)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
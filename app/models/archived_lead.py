@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, ForeignKey, Integer, BigInteger, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+from .base import BaseModel
+
+
+class ArchivedLead(BaseModel):
+    """
+    A lead moved out of `leads` after being done for LEAD_ARCHIVE_AFTER_DAYS
+    (app.services.lead_archive). Keeps the lead's id and timestamps; only
+    read by the archive search endpoints.
+    """
+    __tablename__ = "archived_leads"
+    
+    agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id"), nullable=False)
+    first_name = Column(String(255), nullable=False)
+    phone_e164 = Column(String(50), nullable=False)
+    phone_key = Column(BigInteger, nullable=False)
+    status = Column(String(20), nullable=False)
+    custom_fields = Column(JSONB, default={})
+    schedule_at = Column(DateTime, nullable=False)
+    attempts_count = Column(Integer, default=0)
+    disposition = Column(String(50))
+    created_by = Column(UUID(as_uuid=True))
+    updated_by = Column(UUID(as_uuid=True))
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # Archive search: per agent by phone, or newest archived first
+        Index("ix_archived_leads_agent_id_phone_key", "agent_id", "phone_key"),
+        Index("ix_archived_leads_agent_id_archived_at", "agent_id", "archived_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -16,6 +16,11 @@ class Company(BaseModel):
     settings = Column(JSON, default={})
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     
+    # get_user_company runs on every request
+    __table_args__ = (
+        Index("ix_companies_admin_user_id_live", "admin_user_id", postgresql_where=text("is_deleted = false")),
+    )
+    
     # Relationships
     admin_user = relationship("User", foreign_keys=[admin_user_id], back_populates="companies")
     agents = relationship("Agent", back_populates="company")
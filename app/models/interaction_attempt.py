@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, ForeignKey, Text, Integer, JSON, CheckConstraint
+from sqlalchemy import Column, String, ForeignKey, Integer, DateTime, CheckConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from datetime import datetime
 from .base import BaseModel
 
 
@@ -8,22 +9,49 @@ class InteractionAttempt(BaseModel):
     __tablename__ = "interaction_attempts"
     
     lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id"), nullable=False, index=True)
-    agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id"), nullable=False, index=True)
+    agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id"), nullable=False)
     attempt_number = Column(Integer, nullable=False)
     status = Column(String(20))
     outcome = Column(String(20))
-    summary = Column(Text)
     duration_seconds = Column(Integer)
     transcript_url = Column(String(500))
-    raw_webhook_data = Column(JSON)
     retell_call_id = Column(String(255))
+    from_number = Column(String(50))  # Caller ID the call was placed from
+    # Monthly partition key (app.services.attempt_partitions), so part of the primary key
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
     
     # Constraints
     __table_args__ = (
         CheckConstraint("status IN ('pending', 'in_progress', 'completed', 'failed')", name="check_attempt_status"),
-        CheckConstraint("outcome IN ('answered', 'no_answer', 'failed')", name="check_attempt_outcome"),
+        CheckConstraint("outcome IN ('answered', 'no_answer', 'busy', 'voicemail', 'failed')", name="check_attempt_outcome"),
+        # Call history / metrics per agent by date, and the pacing window
+        Index("ix_interaction_attempts_agent_id_created_at", "agent_id", "created_at"),
+        # Live calls per caller ID, re-read by the dispatcher each cycle
+        Index(
+            "ix_interaction_attempts_in_progress_from_number", "from_number",
+            postgresql_where=text("status = 'in_progress'")
+        ),
+        # Stale in_progress attempts for the reconciler (app.services.call_reconciler)
+        Index(
+            "ix_interaction_attempts_in_progress_created_at", "created_at",
+            postgresql_where=text("status = 'in_progress'")
+        ),
+        # Retell webhook (locked) and reconciler lookups by call ID
+        Index(
+            "ix_interaction_attempts_retell_call_id", "retell_call_id",
+            postgresql_where=text("retell_call_id IS NOT NULL")
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
     
     # Relationships
     lead = relationship("Lead", back_populates="interaction_attempts")
-    agent = relationship("Agent", back_populates="interaction_attempts")
\ No newline at end of file
+    agent = relationship("Agent", back_populates="interaction_attempts")
+    # summary / raw webhook payload, loaded on access only (no FK across the partitioned tables)
+    payload = relationship(
+        "InteractionAttemptPayload",
+        primaryjoin="and_(foreign(InteractionAttemptPayload.id) == InteractionAttempt.id, "
+                    "foreign(InteractionAttemptPayload.created_at) == InteractionAttempt.created_at)",
+        uselist=False,
+        viewonly=True
+    )
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Text, JSON, DateTime
+from datetime import datetime
+from .base import BaseModel
+
+
+class InteractionAttemptPayload(BaseModel):
+    """
+    Bulky per-call data kept out of the hot interaction_attempts row and only
+    read by the call detail endpoint. Shares its attempt's id and created_at,
+    and is partitioned by month the same way (app.services.attempt_partitions).
+    """
+    __tablename__ = "interaction_attempt_payloads"
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
+    summary = Column(Text)
+    raw_webhook_data = Column(JSON)
+    
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
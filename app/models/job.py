@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import Column, String, ForeignKey, JSON, Integer, DateTime, Text, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from .base import BaseModel
+
+
+class Job(BaseModel):
+    """Background job for the Postgres-backed queue (see app.services.job_queue)"""
+    __tablename__ = "jobs"
+
+    queue = Column(String(50), default="default", nullable=False)
+    job_type = Column(String(100), nullable=False)
+    payload = Column(JSON, default={})
+    # Tenant the work belongs to - claims are spread fairly across companies
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"))
+    status = Column(String(20), default="queued", nullable=False)
+    priority = Column(Integer, default=0, nullable=False)  # Higher runs first
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Visibility timeout: a running job whose lock expired is claimable again
+    locked_until = Column(DateTime)
+    locked_by = Column(String(100))
+    last_error = Column(Text)
+    finished_at = Column(DateTime)
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'succeeded', 'dead')", name="check_job_status"),
+        # Only unfinished jobs are ever scanned by claims
+        Index(
+            "ix_jobs_claimable", "queue", "run_at",
+            postgresql_where=text("status IN ('queued', 'running')")
+        ),
+        Index("ix_jobs_finished_at", "finished_at", postgresql_where=text("finished_at IS NOT NULL")),
+    )
\ No newline at end of file
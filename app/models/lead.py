@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, ForeignKey, JSON, Integer, DateTime, CheckConstraint, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, ForeignKey, Integer, BigInteger, DateTime, CheckConstraint, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -9,10 +9,13 @@ class Lead(BaseModel):
     
     agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id"), nullable=False, index=True)
     first_name = Column(String(255), nullable=False)
-    phone_e164 = Column(String(50), nullable=False, index=True)
-    status = Column(String(20), default="new", nullable=False, index=True)
-    custom_fields = Column(JSON, default={})
-    schedule_at = Column(DateTime, nullable=False, index=True)
+    phone_e164 = Column(String(50), nullable=False)
+    # E.164 digits as an integer (phone_service.phone_key); every phone equality lookup uses this
+    phone_key = Column(BigInteger, nullable=False)
+    status = Column(String(20), default="new", nullable=False)
+    # JSONB + GIN index for the custom field filters (app.services.custom_field_filter)
+    custom_fields = Column(JSONB, default={})
+    schedule_at = Column(DateTime, nullable=False)
     attempts_count = Column(Integer, default=0)
     disposition = Column(String(50))
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
@@ -20,9 +23,22 @@ class Lead(BaseModel):
     
     # Constraints
     __table_args__ = (
-        CheckConstraint("status IN ('new', 'in_progress', 'done')", name="check_lead_status"),
+        CheckConstraint("status IN ('new', 'in_progress', 'paused', 'done')", name="check_lead_status"),
         CheckConstraint("disposition IN ('not_interested', 'hung_up', 'completed', 'no_answer')", name="check_lead_disposition"),
-        UniqueConstraint("agent_id", "phone_e164", name="uq_agent_phone"),
+        UniqueConstraint("agent_id", "phone_key", name="uq_agent_phone_key"),
+        # Caller lookup by number across agents
+        Index("ix_leads_phone_key", "phone_key"),
+        Index("ix_leads_custom_fields", "custom_fields", postgresql_using="gin"),
+        # Leads still to dial, for the scheduler's due scan and the dispatch wheel refill
+        Index(
+            "ix_leads_due", "schedule_at", "agent_id",
+            postgresql_where=text("is_deleted = false AND status IN ('new', 'in_progress')")
+        ),
+        # Lead list / bulk filters and exports, per agent; soft-deleted rows left out
+        Index("ix_leads_agent_id_status_live", "agent_id", "status", postgresql_where=text("is_deleted = false")),
+        Index("ix_leads_agent_id_created_at_live", "agent_id", "created_at", postgresql_where=text("is_deleted = false")),
+        # Done leads by last change, for the archiver (app.services.lead_archive)
+        Index("ix_leads_done_updated_at", "updated_at", postgresql_where=text("status = 'done'")),
     )
     
     # Relationships
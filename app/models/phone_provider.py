@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, JSON, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, String, ForeignKey, JSON, CheckConstraint, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -16,6 +16,7 @@ class PhoneProvider(BaseModel):
     __table_args__ = (
         CheckConstraint("provider IN ('twilio', 'plivo')", name="check_provider_type"),
         UniqueConstraint("company_id", "provider", name="uq_company_provider"),
+        Index("ix_phone_providers_company_id_live", "company_id", postgresql_where=text("is_deleted = false")),
     )
     
     # Relationships
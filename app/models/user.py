@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, DateTime, String
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -10,6 +10,8 @@ class User(BaseModel):
     name = Column(String(255), nullable=True)  # Allow null for onboarding flow
     phone = Column(String(50), nullable=True)
     google_id = Column(String(255), unique=True, nullable=False, index=True)
+    # Reads stay on the primary until then after the user writes (read-your-writes)
+    reads_primary_until = Column(DateTime, nullable=True)
     
     # Relationships
     companies = relationship("Company", foreign_keys="Company.admin_user_id", back_populates="admin_user")
@@ -1,9 +1,28 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any, Union
 from datetime import time, datetime
+from app.services.custom_field_filter import parse_custom_field_filter
 import uuid
 
 
+class RetryRule(BaseModel):
+    """Retry schedule for one call outcome (see app.services.retry_policy)"""
+    retry: Optional[bool] = None
+    delay_minutes: Optional[int] = Field(None, ge=1, le=10080)
+    backoff: Optional[str] = Field(None, pattern="^(fixed|linear|exponential)$")
+    factor: Optional[float] = Field(None, ge=1, le=10)
+    max_delay_minutes: Optional[int] = Field(None, ge=1, le=10080)
+    jitter: Optional[float] = Field(None, ge=0, le=1)
+
+
+class RetryPolicy(BaseModel):
+    no_answer: Optional[RetryRule] = None
+    busy: Optional[RetryRule] = None
+    voicemail: Optional[RetryRule] = None
+    failed: Optional[RetryRule] = None
+    max_attempts_per_day: Optional[int] = Field(None, ge=0, le=20)
+
+
 class AgentCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
     prompt: str = Field(..., min_length=1)
@@ -13,12 +32,24 @@ class AgentCreate(BaseModel):
     functions: Optional[List[str]] = []
     inbound_phone: Optional[str] = None
     outbound_phone: Optional[str] = None
+    outbound_phone_pool: Optional[List[str]] = Field(None, max_length=100)
+    caller_id_strategy: Optional[str] = Field("lru", pattern="^(lru|local_presence)$")
+    pacing_mode: Optional[str] = Field("off", pattern="^(off|predictive)$")
     max_attempts: Optional[int] = Field(3, ge=1, le=10)
     retry_delay_minutes: Optional[int] = Field(30, ge=15, le=720)
+    retry_policy: Optional[RetryPolicy] = None
+    lead_filter: Optional[Dict[str, Any]] = None  # Custom field filter on the leads this agent dials
     business_hours_start: Optional[time] = None
     business_hours_end: Optional[time] = None
     timezone: Optional[str] = "UTC"
     max_call_duration_minutes: Optional[int] = Field(20, ge=5, le=60)
+    
+    @field_validator('lead_filter')
+    @classmethod
+    def validate_lead_filter(cls, v):
+        if v is not None:
+            parse_custom_field_filter(v)
+        return v
 
 
 class AgentUpdate(BaseModel):
@@ -31,12 +62,24 @@ class AgentUpdate(BaseModel):
     functions: Optional[List[str]] = None
     inbound_phone: Optional[str] = None
     outbound_phone: Optional[str] = None
+    outbound_phone_pool: Optional[List[str]] = Field(None, max_length=100)
+    caller_id_strategy: Optional[str] = Field(None, pattern="^(lru|local_presence)$")
+    pacing_mode: Optional[str] = Field(None, pattern="^(off|predictive)$")
     max_attempts: Optional[int] = Field(None, ge=1, le=10)
     retry_delay_minutes: Optional[int] = Field(None, ge=15, le=720)
+    retry_policy: Optional[RetryPolicy] = None
+    lead_filter: Optional[Dict[str, Any]] = None  # Custom field filter on the leads this agent dials
     business_hours_start: Optional[time] = None
     business_hours_end: Optional[time] = None
     timezone: Optional[str] = None
     max_call_duration_minutes: Optional[int] = Field(None, ge=5, le=60)
+    
+    @field_validator('lead_filter')
+    @classmethod
+    def validate_lead_filter(cls, v):
+        if v is not None:
+            parse_custom_field_filter(v)
+        return v
 
 
 class AgentResponse(BaseModel):
@@ -51,8 +94,13 @@ class AgentResponse(BaseModel):
     functions: List[str]
     inbound_phone: Optional[str]
     outbound_phone: Optional[str]
+    outbound_phone_pool: Optional[List[str]] = None
+    caller_id_strategy: Optional[str] = None
+    pacing_mode: Optional[str] = None
     max_attempts: int
     retry_delay_minutes: int
+    retry_policy: Optional[Dict[str, Any]] = None
+    lead_filter: Optional[Dict[str, Any]] = None
     business_hours_start: Optional[time]
     business_hours_end: Optional[time]
     timezone: str
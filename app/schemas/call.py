@@ -11,7 +11,6 @@ class InteractionAttemptResponse(BaseModel):
     attempt_number: int
     status: Optional[str]
     outcome: Optional[str]
-    summary: Optional[str]
     duration_seconds: Optional[int]
     transcript_url: Optional[str]
     retell_call_id: Optional[str]
@@ -41,6 +40,13 @@ class InteractionAttemptResponse(BaseModel):
         from_attributes = True
 
 
+class CallDetailResponse(InteractionAttemptResponse):
+    """One call with the data kept out of the history list (GET /calls/{id})"""
+    from_number: Optional[str] = None
+    summary: Optional[str] = None
+    raw_webhook_data: Optional[Dict[str, Any]] = None
+
+
 class CallHistoryResponse(BaseModel):
     calls: List[InteractionAttemptResponse]
     total: int
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator, field_validator
 from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
+from app.services.custom_field_filter import parse_custom_field_filter
 import re
 import uuid
 
@@ -23,7 +24,7 @@ class LeadCreate(BaseModel):
 class LeadUpdate(BaseModel):
     first_name: Optional[str] = Field(None, min_length=1, max_length=255)
     phone_e164: Optional[str] = Field(None, min_length=1, max_length=50)
-    status: Optional[str] = Field(None, pattern="^(new|in_progress|done)$")
+    status: Optional[str] = Field(None, pattern="^(new|in_progress|paused|done)$")
     custom_fields: Optional[Dict[str, Any]] = None
     schedule_at: Optional[datetime] = None
     disposition: Optional[str] = Field(None, pattern="^(not_interested|hung_up|completed|no_answer)$")
@@ -73,6 +74,115 @@ class LeadListResponse(BaseModel):
     per_page: int
 
 
+class LeadBatchItem(BaseModel):
+    agent_id: Optional[str] = None  # Defaults to the batch's agent_id
+    first_name: str = Field(..., min_length=1, max_length=255)
+    phone_e164: str = Field(..., min_length=1, max_length=50)  # Normalized server-side
+    custom_fields: Optional[Dict[str, Any]] = None
+    schedule_at: Optional[datetime] = None
+
+
+class LeadBatchItemResult(BaseModel):
+    index: int
+    status: str  # inserted, updated, skipped, duplicate, error
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class LeadBatchResponse(BaseModel):
+    inserted: int
+    updated: int
+    skipped: int
+    error_count: int
+    results: List[LeadBatchItemResult]
+
+
+class LeadFilter(BaseModel):
+    """Selection for bulk operations: the GET /leads filters and/or explicit IDs"""
+    agent_id: Optional[str] = None
+    status: Optional[str] = Field(None, pattern="^(new|in_progress|paused|done)$")
+    search: Optional[str] = None
+    custom_fields: Optional[Dict[str, Any]] = None  # Filter DSL (app.services.custom_field_filter)
+    lead_ids: Optional[List[str]] = Field(None, max_length=10000)
+    
+    @field_validator('custom_fields')
+    @classmethod
+    def validate_custom_fields(cls, v):
+        if v is not None:
+            parse_custom_field_filter(v)
+        return v
+
+
+class LeadBulkRequest(BaseModel):
+    action: str = Field(..., pattern="^(pause|resume|reschedule|reassign|delete)$")
+    filters: LeadFilter = LeadFilter()
+    match_all: bool = False  # Required to act on every lead when no filter is given
+    schedule_at: Optional[datetime] = None  # reschedule
+    target_agent_id: Optional[str] = None  # reassign
+    run_async: bool = False  # Queue as a background job instead of updating in the request
+
+
+class LeadBulkResponse(BaseModel):
+    action: str
+    status: str  # completed, or queued / running / succeeded / dead for jobs
+    affected: Optional[int] = None
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ArchivedLeadResponse(LeadResponse):
+    archived_at: Union[str, datetime]
+    
+    @field_validator('archived_at', mode='before')
+    @classmethod
+    def convert_archived_at_to_str(cls, v):
+        if isinstance(v, datetime):
+            return v.isoformat()
+        return v
+
+
+class ArchivedLeadListResponse(BaseModel):
+    leads: List[ArchivedLeadResponse]
+    total: int
+    page: int
+    per_page: int
+
+
+class ArchivedAttemptResponse(BaseModel):
+    id: Union[str, uuid.UUID]
+    attempt_number: int
+    status: Optional[str]
+    outcome: Optional[str]
+    duration_seconds: Optional[int]
+    transcript_url: Optional[str]
+    retell_call_id: Optional[str]
+    from_number: Optional[str]
+    summary: Optional[str]
+    raw_webhook_data: Optional[Dict[str, Any]]
+    created_at: Union[str, datetime]
+    
+    @field_validator('id', mode='before')
+    @classmethod
+    def convert_uuid_to_str(cls, v):
+        if isinstance(v, uuid.UUID):
+            return str(v)
+        return v
+    
+    @field_validator('created_at', mode='before')
+    @classmethod
+    def convert_datetime_to_str(cls, v):
+        if isinstance(v, datetime):
+            return v.isoformat()
+        return v
+    
+    class Config:
+        from_attributes = True
+
+
+class ArchivedLeadDetailResponse(ArchivedLeadResponse):
+    attempts: List[ArchivedAttemptResponse]
+
+
 class CSVImportRequest(BaseModel):
     agent_id: str
     column_mapping: Dict[str, str]  # CSV column -> field mapping
@@ -0,0 +1,180 @@
+"""
+Monthly partitions of interaction_attempts: creation ahead of time and retention.
+
+interaction_attempts is RANGE-partitioned on created_at, one partition per
+month named interaction_attempts_yYYYYmMM. Queries bounded by created_at
+(history, metrics, pacing, the daily retry cap) only touch the matching
+months. The maintain_attempt_partitions job (scheduled by the job workers
+every ATTEMPT_PARTITION_MAINTENANCE_SECONDS) does two things:
+- creates the partitions for the next ATTEMPT_PARTITIONS_AHEAD months
+- applies retention: partitions entirely older than ATTEMPT_RETENTION_MONTHS
+  are detached and moved to the ATTEMPT_ARCHIVE_SCHEMA schema (or dropped
+  when that is empty). This is a catalog change, not a slow DELETE.
+
+A DEFAULT partition catches rows outside every month so a dial never fails
+on a missing partition; maintenance warns when it isn't empty. Postgres
+refuses to create a month whose rows sit in the default, so those rows are
+moved into the new partition as it is created.
+
+interaction_attempt_payloads (summaries and raw webhooks, keyed by the
+attempt's id and created_at) is partitioned the same way and its partitions
+are created and retired together with the attempts'.
+"""
+from typing import List, Optional, Tuple
+from datetime import date, datetime
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.job import Job
+from app.services.job_queue import job_queue
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+PARENT = "interaction_attempts"
+PAYLOADS = "interaction_attempt_payloads"
+# Retention detaches in this order: payloads first, nothing references them
+PARTITIONED_TABLES = (PAYLOADS, PARENT)
+DEFAULT_SUFFIX = "_default"
+DEFAULT_PARTITION = f"{PARENT}{DEFAULT_SUFFIX}"
+PARTITION_NAME = re.compile(r"^(\w+)_y(\d{4})m(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date, parent: str = PARENT) -> str:
+    return f"{parent}_y{month.year:04d}m{month.month:02d}"
+
+
+class AttemptPartitionManager:
+    def attached_partitions(self, db: Session, parent: str = PARENT) -> List[Tuple[str, date]]:
+        """Monthly partitions of `parent` currently attached, oldest first"""
+        names = db.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = CAST(:parent AS regclass)
+        """), {"parent": parent}).scalars().all()
+        partitions = []
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match and match.group(1) == parent:
+                partitions.append((name, date(int(match.group(2)), int(match.group(3)), 1)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    def ensure_partitions(self, db: Session, since: Optional[datetime] = None,
+                          now: Optional[datetime] = None) -> List[str]:
+        """
+        Create any missing monthly partitions of both tables from `since`
+        (default: this month) through ATTEMPT_PARTITIONS_AHEAD months ahead;
+        returns the names created.
+        """
+        now = now or datetime.utcnow()
+        first = (since or now).date().replace(day=1)
+        last = _add_months(now.date().replace(day=1), settings.ATTEMPT_PARTITIONS_AHEAD)
+
+        created = []
+        for parent in PARTITIONED_TABLES:
+            existing = {name for name, _ in self.attached_partitions(db, parent)}
+            month = first
+            while month <= last:
+                name = partition_name(month, parent)
+                if name not in existing:
+                    # Partition DDL locks the parent; give up rather than stall the dialer
+                    db.execute(text(f"SET LOCAL lock_timeout = '{settings.ATTEMPT_PARTITION_LOCK_TIMEOUT_MS}ms'"))
+                    self._create_partition(db, parent, name, month)
+                    created.append(name)
+                month = _add_months(month, 1)
+        return created
+
+    def _create_partition(self, db: Session, parent: str, name: str, month: date) -> None:
+        """
+        Create one monthly partition. Rows of that month in the default
+        partition would make CREATE ... PARTITION OF fail, so the default is
+        detached, the month created, its rows moved over and the default
+        reattached - all in the caller's transaction.
+        """
+        bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        default = f"{parent}{DEFAULT_SUFFIX}"
+        in_month = f"created_at >= '{month.isoformat()}' AND created_at < '{_add_months(month, 1).isoformat()}'"
+        stranded = db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_month})")).scalar()
+        if not stranded:
+            db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} {bounds}"))
+            return
+
+        logger.warning(f"Moving {month:%Y-%m} rows out of {default} into new partition {name}")
+        db.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {default}"))
+        db.execute(text(f"CREATE TABLE {name} PARTITION OF {parent} {bounds}"))
+        db.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_month}"))
+        db.execute(text(f"DELETE FROM {default} WHERE {in_month}"))
+        db.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {default} DEFAULT"))
+
+    def apply_retention(self, db: Session, now: Optional[datetime] = None) -> List[str]:
+        """Detach and archive (or drop) partitions past retention; returns their names"""
+        if settings.ATTEMPT_RETENTION_MONTHS <= 0:
+            return []
+        now = now or datetime.utcnow()
+        cutoff = _add_months(now.date().replace(day=1), -settings.ATTEMPT_RETENTION_MONTHS)
+        expired = [
+            (parent, name)
+            for parent in PARTITIONED_TABLES
+            for name, month in self.attached_partitions(db, parent)
+            if _add_months(month, 1) <= cutoff
+        ]
+
+        archive_schema = settings.ATTEMPT_ARCHIVE_SCHEMA
+        if expired and archive_schema:
+            db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+        for parent, name in expired:
+            db.execute(text(f"SET LOCAL lock_timeout = '{settings.ATTEMPT_PARTITION_LOCK_TIMEOUT_MS}ms'"))
+            db.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {name}"))
+            if not archive_schema:
+                db.execute(text(f"DROP TABLE {name}"))
+                continue
+            # Archived history shouldn't pin leads: drop its foreign keys
+            constraints = db.execute(text(
+                "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+            ), {"table": name}).scalars().all()
+            for constraint in constraints:
+                db.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+            db.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+        return [name for _, name in expired]
+
+    def default_partition_rows(self, db: Session) -> bool:
+        return bool(db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION})")).scalar())
+
+
+attempt_partition_manager = AttemptPartitionManager()
+
+
+@job_queue.handler("maintain_attempt_partitions")
+def maintain_attempt_partitions(db: Session, job: Job) -> None:
+    lock_token = job.locked_by
+    created = []
+    ensure_error = None
+    try:
+        created = attempt_partition_manager.ensure_partitions(db)
+        # Committed separately: a lock timeout during retention keeps the new partitions
+        db.commit()
+    except Exception as e:
+        # Retention still runs; the job fails afterwards so the error isn't lost
+        db.rollback()
+        logger.error(f"Creating attempt partitions failed: {e}")
+        ensure_error = e
+    job_queue.extend_lease(job, lock_token)
+    archived = attempt_partition_manager.apply_retention(db)
+    db.commit()
+
+    if created:
+        logger.info(f"Created attempt partitions: {', '.join(created)}")
+    if archived:
+        target = f"moved to schema {settings.ATTEMPT_ARCHIVE_SCHEMA}" if settings.ATTEMPT_ARCHIVE_SCHEMA else "dropped"
+        logger.info(f"Detached attempt partitions ({target}): {', '.join(archived)}")
+    if attempt_partition_manager.default_partition_rows(db):
+        logger.warning(f"{DEFAULT_PARTITION} holds rows outside every monthly partition")
+    if ensure_error is not None:
+        raise ensure_error
@@ -0,0 +1,117 @@
+"""
+Reconciles attempts whose call_ended webhook never arrived.
+
+An attempt still in_progress RECONCILE_SLACK_MINUTES past its agent's
+max_call_duration_minutes is stale: it keeps holding one of the company's
+concurrent-call slots. The reconcile_calls job (scheduled by the job workers
+every RECONCILE_INTERVAL_SECONDS) looks up a batch of stale calls in Retell,
+RECONCILE_CONCURRENCY at a time, and completes the ended ones through
+apply_call_result - the same transitions the webhook makes. Calls Retell
+still can't account for after RECONCILE_ABANDON_HOURS are failed so their
+slot is released.
+"""
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import calls_reconciled
+from app.models.agent import Agent
+from app.models.interaction_attempt import InteractionAttempt
+from app.models.job import Job
+from app.services.call_results import apply_call_result
+from app.services.job_queue import job_queue
+from app.services.retell_service import retell_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Retell call_status values for calls that are over ("completed" is the mock client's)
+ENDED_STATUSES = ("ended", "error", "completed")
+
+
+class CallReconciler:
+    def reconcile(self, db: Session, limit: Optional[int] = None) -> Dict[str, int]:
+        """Check one batch of stale attempts against Retell. Doesn't commit."""
+        now = datetime.utcnow()
+        stale = self._stale_attempts(db, now, limit or settings.RECONCILE_BATCH_SIZE)
+        stats = {"checked": len(stale), "completed": 0, "active": 0, "lookup_failed": 0, "abandoned": 0}
+        if not stale:
+            return stats
+
+        # No locks are held while Retell is queried...
+        calls = self._fetch_calls([call_id for _, call_id in stale])
+
+        # ...so re-read the attempts under lock, skipping any a webhook is finishing right now
+        attempts = db.query(InteractionAttempt).filter(
+            InteractionAttempt.id.in_([attempt_id for attempt_id, _ in stale]),
+            InteractionAttempt.status == "in_progress"
+        ).with_for_update(skip_locked=True).all()
+
+        abandon_before = now - timedelta(hours=settings.RECONCILE_ABANDON_HOURS)
+        for attempt in attempts:
+            call = calls.get(attempt.retell_call_id)
+            if call and call.get("call_status") in ENDED_STATUSES:
+                apply_call_result(db, attempt, self._result_payload(call), now)
+                result = "completed"
+            elif attempt.created_at < abandon_before:
+                apply_call_result(db, attempt, {
+                    "call_id": attempt.retell_call_id,
+                    "outcome": "failed",
+                    "reconciled": "abandoned"
+                }, now)
+                result = "abandoned"
+            else:
+                result = "active" if call else "lookup_failed"
+            stats[result] += 1
+            calls_reconciled.inc(result)
+        return stats
+
+    def _stale_attempts(self, db: Session, now: datetime, limit: int) -> List:
+        """(id, retell_call_id) of the oldest stale in_progress attempts"""
+        return db.query(InteractionAttempt.id, InteractionAttempt.retell_call_id).join(
+            Agent, InteractionAttempt.agent_id == Agent.id
+        ).filter(
+            InteractionAttempt.status == "in_progress",
+            InteractionAttempt.retell_call_id.isnot(None),
+            # Plain bound for the partial created_at index; the per-agent cutoff refines it
+            InteractionAttempt.created_at < now - timedelta(minutes=settings.RECONCILE_SLACK_MINUTES),
+            InteractionAttempt.created_at < now - (
+                func.coalesce(Agent.max_call_duration_minutes, 20) + settings.RECONCILE_SLACK_MINUTES
+            ) * literal_column("interval '1 minute'")
+        ).order_by(InteractionAttempt.created_at).limit(limit).all()
+
+    def _fetch_calls(self, call_ids: List[str]) -> Dict[str, Dict]:
+        """Retell call objects by call ID; failed lookups are left out"""
+        workers = max(1, min(settings.RECONCILE_CONCURRENCY, len(call_ids)))
+        with ThreadPoolExecutor(workers, thread_name_prefix="reconcile") as pool:
+            calls = pool.map(retell_service.get_call, call_ids)
+            return {call_id: call for call_id, call in zip(call_ids, calls) if call}
+
+    @staticmethod
+    def _result_payload(call: Dict) -> Dict:
+        """A Retell call object in the shape of the call_ended webhook payload"""
+        analysis = call.get("call_analysis") or {}
+        duration_ms = call.get("duration_ms")
+        return {
+            "event": "call_ended",
+            "call": call,
+            "call_id": call.get("call_id"),
+            "outcome": call.get("outcome"),
+            "duration_seconds": duration_ms // 1000 if duration_ms is not None else None,
+            "recording_url": call.get("recording_url"),
+            "summary": analysis.get("call_summary"),
+            "end_timestamp": call.get("end_timestamp"),
+            "reconciled": "completed"
+        }
+
+
+call_reconciler = CallReconciler()
+
+
+@job_queue.handler("reconcile_calls")
+def reconcile_calls(db: Session, job: Job) -> None:
+    stats = call_reconciler.reconcile(db)
+    if stats["checked"]:
+        logger.info(f"Reconciled stale calls: {stats}")
@@ -0,0 +1,99 @@
+"""
+Applies a finished call's result to its attempt and lead.
+
+Shared by the Retell webhook and anything else that learns how a call ended,
+so every path makes the same transitions.
+"""
+from typing import Any, Dict, Optional
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.metrics import retry_decisions
+from app.models.interaction_attempt import InteractionAttempt
+from app.models.interaction_attempt_payload import InteractionAttemptPayload
+from app.models.lead import Lead
+from app.services.retry_policy import RetryDecision, retry_policy_engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ("answered", "no_answer", "busy", "voicemail", "failed")
+
+# Retell disconnection_reason -> attempt outcome
+_DISCONNECTION_OUTCOMES = {
+    "user_hangup": "answered",
+    "agent_hangup": "answered",
+    "call_transfer": "answered",
+    "inactivity": "answered",
+    "max_duration_reached": "answered",
+    "dial_no_answer": "no_answer",
+    "dial_busy": "busy",
+    "voicemail_reached": "voicemail",
+    "dial_failed": "failed",
+}
+
+
+def classify_outcome(call_data: Dict[str, Any]) -> str:
+    """Attempt outcome from a webhook payload or Retell call object"""
+    outcome = call_data.get("outcome")
+    if outcome in OUTCOMES:
+        return outcome
+
+    call = call_data.get("call") if isinstance(call_data.get("call"), dict) else call_data
+    analysis = call.get("call_analysis") or {}
+    if analysis.get("in_voicemail"):
+        return "voicemail"
+    return _DISCONNECTION_OUTCOMES.get(call.get("disconnection_reason"), "failed")
+
+
+def save_call_payload(db: Session, attempt: InteractionAttempt, call_data: Dict[str, Any]) -> None:
+    """Upsert the attempt's summary and raw webhook data into its side-table row"""
+    now = datetime.utcnow()
+    statement = pg_insert(InteractionAttemptPayload).values(
+        id=attempt.id,
+        created_at=attempt.created_at,
+        updated_at=now,
+        is_deleted=False,
+        summary=call_data.get("summary"),
+        raw_webhook_data=call_data
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["id", "created_at"],
+        set_={
+            "summary": statement.excluded.summary,
+            "raw_webhook_data": statement.excluded.raw_webhook_data,
+            "updated_at": now
+        }
+    ))
+
+
+def apply_call_result(db: Session, attempt: InteractionAttempt, call_data: Dict[str, Any],
+                      now: Optional[datetime] = None) -> Optional[RetryDecision]:
+    """
+    Complete the attempt from call_data and move its lead on: done, or
+    rescheduled for the retry policy's next dial time. Doesn't commit.
+    The caller must hold the attempt's row lock (SELECT ... FOR UPDATE), so
+    two completions of one call can't both see it in progress.
+    """
+    outcome = classify_outcome(call_data)
+    # A redelivered webhook (or one arriving after the reconciler) refreshes the
+    # attempt but mustn't move the lead a second time
+    already_completed = attempt.status == "completed"
+    attempt.status = "completed"
+    attempt.outcome = outcome
+    attempt.duration_seconds = call_data.get("duration_seconds")
+    attempt.transcript_url = call_data.get("recording_url")
+    save_call_payload(db, attempt, call_data)
+
+    lead = db.query(Lead).filter(Lead.id == attempt.lead_id).first()
+    if already_completed or not lead or lead.status == "done":
+        return None
+
+    decision = retry_policy_engine.decide(db, lead.agent, lead, outcome, now)
+    if decision.done:
+        lead.status = "done"
+        lead.disposition = decision.disposition
+    else:
+        lead.schedule_at = decision.next_attempt_at
+    retry_decisions.inc(outcome, "done" if decision.done else "retry")
+    return decision
@@ -1,98 +1,216 @@
-from typing import List, Optional, Dict
-from datetime import datetime, time, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from typing import List, Optional, Dict, Tuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import and_, case, func, or_, select, update
+from app.core.config import settings
 from app.db.session import SessionLocal
+from app.db.instrumentation import track_queries
+from app.core.metrics import (
+    scheduler_company_dispatches, scheduler_cycle_duration, scheduler_stage_duration, scheduler_leads
+)
 from app.models.lead import Lead
 from app.models.agent import Agent
 from app.models.company import Company
 from app.models.interaction_attempt import InteractionAttempt
+from app.services.caller_id_pool import caller_id_pool
+from app.services.custom_field_filter import custom_field_clauses
+from app.services.pacing import pacing_engine
 from app.services.retell_service import retell_service
+from app.services.retry_policy import retry_policy_engine
+from app.utils.fair_queue import FairQueue
 import logging
+import time
 import pytz
 
 logger = logging.getLogger(__name__)
 
 
 class CallScheduler:
-    def __init__(self):
-        self.db = SessionLocal()
+    """
+    Dispatches due leads. Stateless between cycles: each cycle uses its own session.
     
-    def run_schedule_cycle(self) -> Dict[str, int]:
-        """Run a complete scheduling cycle"""
+    Several dispatchers may run at once (worker replicas, POST /calls/run-scheduler).
+    Each lead is claimed with a conditional UPDATE committed before its dial, and
+    each dial's attempt is committed on its own, so a lead is dialed only once.
+    """
+    
+    def run_schedule_cycle(self, db: Optional[Session] = None, lead_ids: Optional[List] = None) -> Dict[str, int]:
+        """
+        Run a complete scheduling cycle (in a new session unless one is given).
+        With lead_ids, only those leads are considered - used for leads fired
+        from the dispatcher's timing wheel.
+        """
+        cycle_start = time.perf_counter()
+        owns_session = db is None
+        if owns_session:
+            # Committed once per dial; keep the loaded leads/agents instead of re-reading them each time
+            db = SessionLocal(expire_on_commit=False)
+        try:
+            with track_queries("scheduler_cycle" if lead_ids is None else "scheduler_due_leads") as query_stats:
+                stats = self._run_schedule_cycle(db, lead_ids)
+        finally:
+            if owns_session:
+                db.close()
+        scheduler_cycle_duration.observe(time.perf_counter() - cycle_start)
+        
+        stats["db_queries"] = query_stats.query_count
+        stats["db_time_ms"] = int(query_stats.total_time_ms)
+        return stats
+    
+    def _run_schedule_cycle(self, db: Session, lead_ids: Optional[List] = None) -> Dict[str, int]:
         try:
             stats = {
                 "eligible_leads": 0,
                 "calls_initiated": 0,
                 "calls_failed": 0,
-                "calls_skipped": 0
+                "calls_skipped": 0,
+                "calls_paced": 0
             }
             
+            # Calls that ended since last cycle free their caller IDs
+            if lead_ids is None:
+                caller_id_pool.sync_active_calls(db)
+            
             # Get eligible leads
-            eligible_leads = self._get_eligible_leads()
+            with self._stage("eligible_leads"):
+                eligible_leads = self._get_eligible_leads(db, lead_ids)
+                capacity, weights = self._remaining_capacity(db, eligible_leads)
+                pacing_engine.refresh(db, {lead.agent for lead in eligible_leads}, weights)
             stats["eligible_leads"] = len(eligible_leads)
             
-            # Process each lead
-            for lead in eligible_leads:
-                result = self._process_lead(lead)
-                stats[result] += 1
+            # Dispatch in weighted fair order across companies, then agents
+            dispatched_by_company: Dict[str, int] = {}
+            with self._stage("dispatch"):
+                queue = self._fair_queue(eligible_leads, capacity, weights)
+                for company_id, (_, lead) in queue:
+                    # Predictive agents dial no faster than their answer rate calls for
+                    if not pacing_engine.admit(lead.agent):
+                        result = "calls_paced"
+                    else:
+                        result = self._process_lead(db, lead)
+                        if result != "calls_initiated":
+                            pacing_engine.refund(lead.agent)
+                    stats[result] += 1
+                    scheduler_leads.inc(result)
+                    if result == "calls_initiated":
+                        tenant = str(company_id)
+                        dispatched_by_company[tenant] = dispatched_by_company.get(tenant, 0) + 1
+                        scheduler_company_dispatches.inc(tenant)
+                        capacity[company_id] -= 1
+                        if capacity[company_id] <= 0:
+                            queue.remove(company_id)
             
-            self.db.commit()
+            # Leads of companies already at their concurrency limit
+            unprocessed = stats["eligible_leads"] - sum(
+                stats[result] for result in ("calls_initiated", "calls_failed", "calls_skipped", "calls_paced")
+            )
+            stats["calls_skipped"] += unprocessed
+            scheduler_leads.inc("calls_skipped", amount=unprocessed)
+            stats["dispatched_by_company"] = dispatched_by_company
+            
+            with self._stage("commit"):
+                db.commit()
             return stats
             
         except Exception as e:
             logger.error(f"Error in schedule cycle: {e}")
-            self.db.rollback()
+            db.rollback()
             return {"error": str(e)}
+    
+    @contextmanager
+    def _stage(self, name: str):
+        """Time one stage of the scheduling cycle"""
+        start = time.perf_counter()
+        try:
+            yield
         finally:
-            self.db.close()
+            scheduler_stage_duration.observe(time.perf_counter() - start, name)
     
-    def _get_eligible_leads(self) -> List[Lead]:
-        """Get leads eligible for calling right now"""
+    def _get_eligible_leads(self, db: Session, lead_ids: Optional[List] = None) -> List[Lead]:
+        """
+        Get leads eligible for calling right now (optionally only among lead_ids).
+        
+        Candidates are taken round-robin across each company's agents (new leads
+        first, then by schedule time) and capped at the company's
+        max_concurrent_calls, so one tenant's backlog can't crowd the batch.
+        Agents with a lead_filter only get leads matching it.
+        """
         now = datetime.utcnow()
+        new_first = case((Lead.status == "new", 0), else_=1)
         
-        # Query for eligible leads
-        eligible_leads = self.db.query(Lead).join(Agent).join(Company).filter(
-            and_(
-                Lead.is_deleted == False,
-                Agent.is_deleted == False,
-                Agent.status == "active",
-                Company.is_deleted == False,
-                Lead.status.in_(["new", "in_progress"]),
-                Lead.schedule_at <= now,
-                # Haven't exceeded max attempts
-                Lead.attempts_count < Agent.max_attempts,
-                # Check if enough time has passed since last attempt
-                self._retry_delay_check(Lead.id, Agent.retry_delay_minutes)
-            )
-        ).all()
+        due = select(
+            Lead.id,
+            Agent.company_id,
+            Company.max_concurrent_calls,
+            new_first.label("new_first"),
+            Lead.schedule_at,
+            func.row_number().over(
+                partition_by=Lead.agent_id,
+                order_by=(new_first, Lead.schedule_at)
+            ).label("agent_turn")
+        ).join(Agent, Lead.agent_id == Agent.id).join(Company, Agent.company_id == Company.id).where(
+            Lead.is_deleted == False,
+            Agent.is_deleted == False,
+            Agent.status == "active",
+            Company.is_deleted == False,
+            Lead.status.in_(["new", "in_progress"]),
+            Lead.schedule_at <= now,
+            # Haven't exceeded max attempts (retry delays are already folded into schedule_at)
+            Lead.attempts_count < Agent.max_attempts
+        )
+        if lead_ids is not None:
+            due = due.where(Lead.id.in_(lead_ids))
+        targeting = self._lead_filter_clause(db)
+        if targeting is not None:
+            due = due.where(targeting)
+        due = due.subquery()
         
-        # Filter by business hours and concurrent limits
-        filtered_leads = []
-        for lead in eligible_leads:
-            if (self._is_within_business_hours(lead.agent) and 
-                self._check_concurrent_limit(lead.agent.company_id)):
-                filtered_leads.append(lead)
+        ranked = select(
+            due.c.id,
+            due.c.max_concurrent_calls,
+            func.row_number().over(
+                partition_by=due.c.company_id,
+                order_by=(due.c.agent_turn, due.c.new_first, due.c.schedule_at)
+            ).label("company_turn")
+        ).subquery()
         
-        # Sort by priority (new leads first, then by schedule time)
-        filtered_leads.sort(key=lambda x: (
-            0 if x.status == "new" else 1,
-            x.schedule_at
-        ))
+        eligible_leads = db.query(Lead).join(Agent).join(Company).join(
+            ranked, ranked.c.id == Lead.id
+        ).options(
+            contains_eager(Lead.agent)
+        ).filter(
+            ranked.c.company_turn <= ranked.c.max_concurrent_calls
+        ).order_by(
+            # Batch truncation keeps each company's share proportional to its limit
+            ranked.c.company_turn * 1.0 / ranked.c.max_concurrent_calls,
+            Lead.schedule_at
+        ).limit(settings.SCHEDULER_BATCH_SIZE).all()
         
-        return filtered_leads
+        # Filter by business hours
+        return [lead for lead in eligible_leads if self._is_within_business_hours(lead.agent)]
     
-    def _retry_delay_check(self, lead_id: str, retry_delay_minutes: int):
-        """Check if enough time has passed since last attempt"""
-        last_attempt = self.db.query(InteractionAttempt).filter(
-            InteractionAttempt.lead_id == lead_id
-        ).order_by(InteractionAttempt.created_at.desc()).first()
-        
-        if not last_attempt:
-            return True  # No previous attempts
+    def _lead_filter_clause(self, db: Session):
+        """Restrict agents that have a lead_filter to their matching leads; None when no agent has one"""
+        targeted = [
+            (agent_id, lead_filter) for agent_id, lead_filter in db.query(Agent.id, Agent.lead_filter).filter(
+                Agent.lead_filter.isnot(None),
+                Agent.is_deleted == False,
+                Agent.status == "active"
+            ).all() if lead_filter
+        ]
+        if not targeted:
+            return None
         
-        retry_after = last_attempt.created_at + timedelta(minutes=retry_delay_minutes)
-        return datetime.utcnow() >= retry_after
+        branches = [Lead.agent_id.notin_([agent_id for agent_id, _ in targeted])]
+        for agent_id, lead_filter in targeted:
+            try:
+                branches.append(and_(Lead.agent_id == agent_id, *custom_field_clauses(lead_filter)))
+            except ValueError as e:
+                # Saved filters are validated, so this only guards against hand-edited rows
+                logger.error(f"Ignoring leads of agent {agent_id}: invalid lead_filter ({e})")
+        return or_(*branches)
     
     def _is_within_business_hours(self, agent: Agent) -> bool:
         """Check if current time is within agent's business hours"""
@@ -105,36 +223,96 @@ class CallScheduler:
         
         return agent.business_hours_start <= now_local <= agent.business_hours_end
     
-    def _check_concurrent_limit(self, company_id: str) -> bool:
-        """Check if company is within concurrent call limits"""
-        active_calls = self.db.query(InteractionAttempt).join(Agent).filter(
-            and_(
-                Agent.company_id == company_id,
-                InteractionAttempt.status == "in_progress"
-            )
-        ).count()
+    def _remaining_capacity(self, db: Session, leads: List[Lead]) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Concurrent call slots left and max_concurrent_calls per company, in one grouped query"""
+        company_ids = {lead.agent.company_id for lead in leads}
+        if not company_ids:
+            return {}, {}
+        
+        active_calls = dict(db.query(Agent.company_id, func.count(InteractionAttempt.id)).join(
+            InteractionAttempt, InteractionAttempt.agent_id == Agent.id
+        ).filter(
+            Agent.company_id.in_(company_ids),
+            InteractionAttempt.status == "in_progress"
+        ).group_by(Agent.company_id).all())
         
-        company = self.db.query(Company).filter(Company.id == company_id).first()
-        return active_calls < company.max_concurrent_calls
+        limits = dict(db.query(Company.id, Company.max_concurrent_calls).filter(Company.id.in_(company_ids)).all())
+        capacity = {
+            company_id: (max_concurrent_calls or 0) - active_calls.get(company_id, 0)
+            for company_id, max_concurrent_calls in limits.items()
+        }
+        return capacity, limits
     
-    def _process_lead(self, lead: Lead) -> str:
-        """Process a single lead and initiate call"""
+    def _fair_queue(self, leads: List[Lead], capacity: Dict[str, int], weights: Dict[str, int]) -> FairQueue:
+        """
+        Leads of companies with free capacity, served weighted by each company's
+        max_concurrent_calls and round-robin across agents within a company
+        """
+        by_company: Dict[str, Dict[str, List[Lead]]] = {}
+        for lead in leads:
+            by_company.setdefault(lead.agent.company_id, {}).setdefault(lead.agent_id, []).append(lead)
+        
+        queue = FairQueue()
+        for company_id, by_agent in by_company.items():
+            if capacity.get(company_id, 0) <= 0:
+                continue
+            agents = FairQueue()
+            for agent_id, agent_leads in by_agent.items():
+                agents.add(agent_id, agent_leads)
+            queue.add(company_id, agents, weights[company_id])
+        return queue
+    
+    def _claim(self, db: Session, lead: Lead, hold_until: datetime) -> bool:
+        """
+        Take the lead for this dispatcher: move schedule_at from the value this
+        cycle read to hold_until, and commit. Fails when another dispatcher (or
+        an edit) changed the lead since it was read.
+        """
+        claimed = db.execute(
+            update(Lead).where(
+                Lead.id == lead.id,
+                Lead.schedule_at == lead.schedule_at,
+                Lead.status.in_(["new", "in_progress"]),
+                Lead.is_deleted == False
+            ).values(schedule_at=hold_until).returning(Lead.id).execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+        if claimed:
+            set_committed_value(lead, "schedule_at", hold_until)
+        return claimed is not None
+    
+    def _process_lead(self, db: Session, lead: Lead) -> str:
+        """Claim a single lead and initiate its call; the attempt is committed before returning"""
+        from_number = caller_id_pool.acquire(lead.agent, lead.phone_e164)
+        if from_number is None:
+            # Every number in the agent's pool is at its concurrency/per-minute cap
+            return "calls_skipped"
+        
+        # Hold the lead until the call's webhook sets the real next dial time
+        hold_until = datetime.utcnow() + timedelta(
+            minutes=(lead.agent.max_call_duration_minutes or 20) + settings.RETRY_RESULT_GRACE_MINUTES
+        )
+        if not self._claim(db, lead, hold_until):
+            caller_id_pool.release(from_number)
+            return "calls_skipped"
+        
         try:
             # Create interaction attempt record
             attempt = InteractionAttempt(
                 lead_id=lead.id,
                 agent_id=lead.agent_id,
                 attempt_number=lead.attempts_count + 1,
-                status="pending"
+                status="pending",
+                from_number=from_number
             )
-            self.db.add(attempt)
-            self.db.flush()  # Get the ID
+            db.add(attempt)
+            db.flush()  # Get the ID
             
             # Prepare call data
             call_data = {
-                "from_number": lead.agent.outbound_phone,
+                "from_number": from_number,
                 "to_number": lead.phone_e164,
-                "agent_id": lead.agent.retell_agent_id,
+                "retell_agent_id": lead.agent.retell_agent_id,
                 "metadata": {
                     "lead_id": str(lead.id),
                     "attempt_id": str(attempt.id),
@@ -153,32 +331,47 @@ class CallScheduler:
                 # Update lead status and attempt count
                 lead.status = "in_progress"
                 lead.attempts_count += 1
+                db.commit()
                 
                 return "calls_initiated"
             else:
                 # Mark attempt as failed
                 attempt.status = "failed"
                 attempt.outcome = "failed"
+                lead.schedule_at = datetime.utcnow() + retry_policy_engine.retry_delay(
+                    lead.agent, "failed", lead.attempts_count + 1
+                )
+                db.commit()
+                caller_id_pool.release(from_number)
                 return "calls_failed"
                 
         except Exception as e:
             logger.error(f"Error processing lead {lead.id}: {e}")
+            db.rollback()
+            # The claim is committed, so the lead stays held until this retry time
+            db.execute(update(Lead).where(Lead.id == lead.id).values(
+                schedule_at=datetime.utcnow() + retry_policy_engine.retry_delay(
+                    lead.agent, "failed", lead.attempts_count + 1
+                )
+            ).execution_options(synchronize_session=False))
+            db.commit()
+            caller_id_pool.release(from_number)
             return "calls_failed"
     
-    def schedule_lead_now(self, lead_id: str) -> bool:
+    def schedule_lead_now(self, db: Session, lead_id: str) -> bool:
         """Schedule a specific lead for immediate calling"""
         try:
-            lead = self.db.query(Lead).filter(Lead.id == lead_id).first()
+            lead = db.query(Lead).filter(Lead.id == lead_id).first()
             if not lead:
                 return False
             
             lead.schedule_at = datetime.utcnow()
-            self.db.commit()
+            db.commit()
             return True
             
         except Exception as e:
             logger.error(f"Error scheduling lead {lead_id}: {e}")
-            self.db.rollback()
+            db.rollback()
             return False
 
 
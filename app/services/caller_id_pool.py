@@ -0,0 +1,138 @@
+"""
+Picks the caller ID for each outbound call from the agent's number pool.
+
+Each number is capped at CALLER_ID_MAX_CONCURRENT_CALLS live calls and
+CALLER_ID_MAX_CALLS_PER_MINUTE call starts, tracked in this process's memory.
+Live-call counts are re-read from in_progress attempts at the start of every
+full scheduling cycle (call_scheduler), which picks up calls that ended.
+
+Strategies (Agent.caller_id_strategy):
+- lru: the least recently used number with headroom
+- local_presence: prefer numbers in the callee's area code, LRU among them
+"""
+from typing import Dict, List, Optional
+from collections import deque
+from functools import lru_cache
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import caller_id_selections
+from app.models.agent import Agent
+from app.models.interaction_attempt import InteractionAttempt
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=65536)
+def area_prefix(phone_e164: str) -> str:
+    """E.164 prefix identifying the number's geographic area ('+1415'), or country code if non-geographic"""
+    import phonenumbers
+
+    try:
+        parsed = phonenumbers.parse(phone_e164, None)
+    except phonenumbers.NumberParseException:
+        return phone_e164[:2]
+    national = str(parsed.national_number)
+    area_length = phonenumbers.length_of_geographical_area_code(parsed)
+    return f"+{parsed.country_code}{national[:area_length]}"
+
+
+class _NumberState:
+    __slots__ = ("active", "recent_starts", "last_used")
+
+    def __init__(self):
+        self.active = 0
+        self.recent_starts = deque()  # monotonic start times within the last minute
+        self.last_used = 0.0
+
+
+class CallerIdPool:
+    def __init__(self):
+        self._numbers: Dict[str, _NumberState] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, agent: Agent, to_number: str) -> Optional[str]:
+        """Caller ID for a call to `to_number`, or None if every pool number is at a cap"""
+        pool = agent.outbound_phone_pool
+        if not pool:
+            # No pool configured: the agent's single number, uncapped as before
+            return agent.outbound_phone
+
+        now = time.monotonic()
+        with self._lock:
+            candidates = [number for number in pool if self._has_headroom(number, now)]
+            if not candidates:
+                caller_id_selections.inc("exhausted")
+                return None
+
+            result = "lru"
+            if agent.caller_id_strategy == "local_presence":
+                area = area_prefix(to_number)
+                local = [number for number in candidates if area_prefix(number) == area]
+                if local:
+                    candidates = local
+                    result = "local"
+                else:
+                    result = "nonlocal"
+
+            number = min(candidates, key=lambda n: self._numbers[n].last_used)
+            state = self._numbers[number]
+            state.active += 1
+            state.recent_starts.append(now)
+            state.last_used = now
+
+        caller_id_selections.inc(result)
+        return number
+
+    def release(self, number: Optional[str]) -> None:
+        """Return a number whose call never started"""
+        with self._lock:
+            state = self._numbers.get(number)
+            if state is not None and state.active > 0:
+                state.active -= 1
+
+    def sync_active_calls(self, db: Session) -> None:
+        """Reset live-call counts for tracked numbers from in_progress attempts"""
+        with self._lock:
+            numbers = list(self._numbers)
+        if not numbers:
+            return
+
+        active = dict(db.query(InteractionAttempt.from_number, func.count(InteractionAttempt.id)).filter(
+            InteractionAttempt.status == "in_progress",
+            InteractionAttempt.from_number.in_(numbers)
+        ).group_by(InteractionAttempt.from_number).all())
+
+        with self._lock:
+            for number, state in self._numbers.items():
+                state.active = active.get(number, 0)
+
+    def snapshot(self) -> List[Dict]:
+        """Per-number live calls and starts in the last minute"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "number": number,
+                    "active_calls": state.active,
+                    "calls_last_minute": sum(1 for started in state.recent_starts if now - started < 60)
+                }
+                for number, state in self._numbers.items()
+            ]
+
+    def _has_headroom(self, number: str, now: float) -> bool:
+        state = self._numbers.get(number)
+        if state is None:
+            state = self._numbers[number] = _NumberState()
+        while state.recent_starts and now - state.recent_starts[0] >= 60:
+            state.recent_starts.popleft()
+        return (
+            state.active < settings.CALLER_ID_MAX_CONCURRENT_CALLS
+            and len(state.recent_starts) < settings.CALLER_ID_MAX_CALLS_PER_MINUTE
+        )
+
+
+caller_id_pool = CallerIdPool()
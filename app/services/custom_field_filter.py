@@ -0,0 +1,102 @@
+"""
+Filter DSL over Lead.custom_fields.
+
+A filter maps field names to a condition:
+
+    {"city": "Austin"}                       equals (short for {"eq": "Austin"})
+    {"source": {"in": ["web", "referral"]}}  any of the values
+    {"email": {"exists": true}}              key present (false: key absent)
+    {"budget": {"gte": 1000, "lt": 5000}}    numeric range (numeric strings count)
+
+Conditions are ANDed. Each compiles to a JSONB operator that the GIN index on
+leads.custom_fields can serve: @> for equals/in, ? for exists, and a jsonpath
+@? for ranges. Field names and values travel as bound parameters and are
+never spliced into SQL.
+"""
+from typing import Any, Dict, List
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.sql import cast
+from app.models.lead import Lead
+import json
+import math
+
+MAX_FILTER_FIELDS = 20
+MAX_IN_VALUES = 100
+RANGE_OPERATORS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _check_field(field: Any) -> None:
+    if not isinstance(field, str) or not field or len(field) > 255:
+        raise ValueError("Custom field names must be non-empty strings of at most 255 characters")
+
+
+def _check_scalar(field: str, value: Any) -> None:
+    if not isinstance(value, SCALAR_TYPES):
+        raise ValueError(f"Custom field '{field}' can only be compared with strings, numbers, booleans or null")
+
+
+def _check_number(field: str, value: Any) -> None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"Range bounds for custom field '{field}' must be numbers")
+
+
+def parse_custom_field_filter(spec: Any) -> Dict[str, Dict[str, Any]]:
+    """Validate a filter and normalize it to {field: {operator: operand}}; raises ValueError"""
+    if not isinstance(spec, dict):
+        raise ValueError("custom_fields filter must be an object")
+    if len(spec) > MAX_FILTER_FIELDS:
+        raise ValueError(f"custom_fields filter is limited to {MAX_FILTER_FIELDS} fields")
+
+    normalized = {}
+    for field, condition in spec.items():
+        _check_field(field)
+        if not isinstance(condition, dict):
+            condition = {"eq": condition}
+        if not condition:
+            raise ValueError(f"Empty condition for custom field '{field}'")
+        for operator, operand in condition.items():
+            if operator == "eq":
+                _check_scalar(field, operand)
+            elif operator == "in":
+                if not isinstance(operand, list) or not 0 < len(operand) <= MAX_IN_VALUES:
+                    raise ValueError(f"'in' for custom field '{field}' takes a list of 1 to {MAX_IN_VALUES} values")
+                for value in operand:
+                    _check_scalar(field, value)
+            elif operator == "exists":
+                if not isinstance(operand, bool):
+                    raise ValueError(f"'exists' for custom field '{field}' takes true or false")
+            elif operator in RANGE_OPERATORS:
+                _check_number(field, operand)
+            else:
+                raise ValueError(f"Unknown operator '{operator}' for custom field '{field}'")
+        normalized[field] = dict(condition)
+    return normalized
+
+
+def _range_path(field: str, bounds: List) -> str:
+    # json.dumps quotes and escapes the key the way jsonpath string literals expect
+    tests = " && ".join(f"@.double() {RANGE_OPERATORS[operator]} {json.dumps(bound)}" for operator, bound in bounds)
+    return f"$.{json.dumps(field)} ? ({tests})"
+
+
+def custom_field_clauses(spec: Any) -> List:
+    """WHERE clauses for a custom_fields filter (see module docstring); raises ValueError"""
+    clauses = []
+    for field, condition in parse_custom_field_filter(spec).items():
+        bounds = []
+        for operator, operand in condition.items():
+            if operator == "eq":
+                clauses.append(Lead.custom_fields.contains({field: operand}))
+            elif operator == "in":
+                clauses.append(or_(*[Lead.custom_fields.contains({field: value}) for value in operand]))
+            elif operator == "exists":
+                present = Lead.custom_fields.has_key(field)
+                clauses.append(present if operand else ~present)
+            else:
+                bounds.append((operator, operand))
+        if bounds:
+            # One jsonpath per field, so both bounds apply to the same value
+            clauses.append(Lead.custom_fields.path_exists(cast(_range_path(field, bounds), JSONPATH)))
+    return clauses
@@ -0,0 +1,144 @@
+"""
+Dispatcher-side timing wheel of leads coming due in the next few minutes.
+
+The wheel is filled two ways:
+- incrementally from the leads.schedule_at index, one window ahead at a time
+  (only the newly uncovered slice of the horizon is queried on each refill)
+- from lead create/update notifications (app.services.lead_events), which
+  cover leads scheduled inside an already-loaded window, e.g. "call now"
+
+The dispatcher polls it every wheel tick and dispatches whatever came due, so
+a lead fires within about a second of schedule_at while the table itself is
+only scanned once per full scheduling cycle.
+"""
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.core.metrics import dispatch_wheel_delay, dispatch_wheel_leads
+from app.db.session import SessionLocal, engine
+from app.models.lead import Lead
+from app.services.lead_events import LEAD_SCHEDULE_CHANNEL, to_epoch
+from app.utils.timing_wheel import TimingWheel
+import json
+import logging
+import select
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduleListener:
+    """LISTENs for lead schedule notifications on a dedicated autocommit connection"""
+
+    def __init__(self):
+        self._connection = None
+
+    def connect(self) -> bool:
+        """Open the LISTEN connection if needed; True when a new one was opened"""
+        if self._connection is not None:
+            return False
+        raw = engine.raw_connection()
+        # Held for the worker's lifetime - keep it out of the pool
+        raw.detach()
+        connection = raw.driver_connection
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {LEAD_SCHEDULE_CHANNEL}")
+        self._connection = connection
+        return True
+
+    def poll(self, timeout: float) -> List[Tuple[str, float]]:
+        """Wait up to `timeout` seconds for notifications; returns (lead_id, due epoch) pairs"""
+        if self._connection is None:
+            time.sleep(timeout)
+            return []
+        try:
+            if select.select([self._connection], [], [], timeout)[0]:
+                self._connection.poll()
+            events = []
+            while self._connection.notifies:
+                notification = self._connection.notifies.pop(0)
+                events.extend((lead_id, due) for lead_id, due in json.loads(notification.payload))
+            return events
+        except Exception as e:
+            logger.error(f"Lead schedule listener failed, reconnecting: {e}")
+            self.close()
+            return []
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class DispatchWheel:
+    def __init__(self, horizon_seconds: float = None, resolution: float = None, refill_seconds: float = None):
+        self.horizon_seconds = horizon_seconds or settings.DISPATCH_WHEEL_HORIZON_SECONDS
+        self.refill_seconds = refill_seconds or settings.DISPATCH_WHEEL_REFILL_SECONDS
+        self.wheel = TimingWheel(time.time(), resolution or settings.DISPATCH_WHEEL_RESOLUTION_SECONDS)
+        # NOTIFY exists only on Postgres; elsewhere the wheel runs on refills alone
+        self.listener = ScheduleListener() if engine.dialect.name == "postgresql" else None
+        # schedule_at up to which the wheel has been loaded from the table
+        self.loaded_until: Optional[datetime] = None
+        self.next_refill = 0.0
+        self.next_connect = 0.0
+
+    def poll(self, timeout: float) -> List[Tuple[str, float]]:
+        """Wait up to `timeout` for events, then return the (lead_id, due epoch) pairs now due"""
+        if self.listener is not None and time.monotonic() >= self.next_connect:
+            try:
+                if self.listener.connect():
+                    # Notifications sent while disconnected are lost - reload the whole horizon
+                    self.loaded_until = None
+                    self.next_refill = 0.0
+            except Exception as e:
+                logger.error(f"Could not open lead schedule listener: {e}")
+                self.next_connect = time.monotonic() + self.refill_seconds
+
+        if time.monotonic() >= self.next_refill:
+            self.refill()
+
+        if self.listener is not None:
+            for lead_id, due in self.listener.poll(timeout):
+                self.wheel.add(lead_id, due)
+        else:
+            time.sleep(timeout)
+
+        now = time.time()
+        due = self.wheel.advance(now)
+        for _, due_at in due:
+            dispatch_wheel_delay.observe(max(0.0, now - due_at))
+        dispatch_wheel_leads.set(len(self.wheel))
+        return due
+
+    def refill(self) -> None:
+        """Load leads whose schedule_at falls in the not-yet-loaded part of the horizon"""
+        now = datetime.utcnow()
+        until = now + timedelta(seconds=min(self.horizon_seconds, self.wheel.horizon - 1))
+        after = self.loaded_until or now
+        # Retry a failed refill on the next interval too, not every tick
+        self.next_refill = time.monotonic() + self.refill_seconds
+        db = SessionLocal()
+        try:
+            rows = db.query(Lead.id, Lead.schedule_at).filter(
+                Lead.is_deleted == False,
+                Lead.status.in_(["new", "in_progress"]),
+                Lead.schedule_at > after,
+                Lead.schedule_at <= until
+            ).all()
+        except Exception as e:
+            logger.error(f"Dispatch wheel refill failed: {e}")
+            return
+        finally:
+            db.close()
+
+        for lead_id, schedule_at in rows:
+            self.wheel.add(str(lead_id), to_epoch(schedule_at))
+        self.loaded_until = until
+
+    def close(self) -> None:
+        if self.listener is not None:
+            self.listener.close()
@@ -1,6 +1,4 @@
 from typing import Dict, Any, Optional
-from google.auth.transport import requests
-from google.oauth2 import id_token
 from app.core.config import settings
 import logging
 
@@ -13,6 +11,10 @@ class GoogleAuthService:
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify Google ID token and return user info"""
+        # Imported here so the google-auth stack only loads on first sign-in
+        from google.auth.transport import requests
+        from google.oauth2 import id_token
+        
         try:
             idinfo = id_token.verify_oauth2_token(
                 token, requests.Request(), self.client_id
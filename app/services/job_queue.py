@@ -0,0 +1,286 @@
+"""
+Durable background jobs stored in Postgres - no external broker.
+
+Enqueue from any endpoint or service with the request's session; the job
+becomes visible when that transaction commits, so work is never queued for a
+change that was rolled back:
+
+    job_queue.enqueue(db, "bulk_lead_update", {"lead_ids": [...]}, company_id=company.id)
+    db.commit()
+
+Handlers register by job type and receive the worker's session and the job:
+
+    @job_queue.handler("bulk_lead_update")
+    def bulk_lead_update(db: Session, job: Job) -> None:
+        ...
+
+Whatever a handler leaves uncommitted is committed in the same transaction
+that marks the job succeeded. Long handlers commit in batches instead, and
+those commits stand even if the job later fails. Such handlers take the lock
+token when they start and renew the visibility timeout between batches:
+
+    lock_token = job.locked_by
+    for batch in ...:
+        ...
+        db.commit()
+        job_queue.extend_lease(job, lock_token)
+
+Raising marks the attempt failed: the job is retried with exponential backoff
+until max_attempts, then kept as 'dead' for inspection. Handlers must be
+idempotent - a job whose worker dies is re-run once its visibility timeout
+passes. Workers: `python -m app.job_worker`.
+"""
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import job_duration, job_queue_lag, jobs_processed
+from app.db.session import SessionLocal
+from app.models.job import Job
+import logging
+import random
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Session, Job], None]
+
+
+class JobQueue:
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+
+    def handler(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering the handler for a job type"""
+        def register(func: JobHandler) -> JobHandler:
+            if job_type in self._handlers:
+                raise ValueError(f"Handler already registered for job type '{job_type}'")
+            self._handlers[job_type] = func
+            return func
+        return register
+
+    def enqueue(self, db: Session, job_type: str, payload: Optional[Dict[str, Any]] = None, *,
+                company_id: Optional[uuid.UUID] = None, queue: str = "default", priority: int = 0,
+                run_at: Optional[datetime] = None, delay_seconds: float = 0,
+                max_attempts: Optional[int] = None) -> Job:
+        """Add a job to the caller's transaction (not committed here)"""
+        if run_at is None:
+            run_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+        job = Job(
+            queue=queue,
+            job_type=job_type,
+            payload=payload or {},
+            company_id=company_id,
+            status="queued",
+            priority=priority,
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_at=run_at
+        )
+        db.add(job)
+        return job
+
+    def schedule_periodic(self, db: Session, job_type: str, every_seconds: float, queue: str = "default") -> bool:
+        """
+        Enqueue a system job unless one is already pending; the next run is
+        every_seconds after the last one finished. Commits. True if enqueued.
+        """
+        if db.bind.dialect.name == "postgresql":
+            # Serialize workers checking the same job type so only one enqueues
+            db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"periodic:{job_type}"))))
+        latest = db.query(Job).filter(
+            Job.job_type == job_type,
+            Job.queue == queue
+        ).order_by(Job.created_at.desc()).first()
+        if latest is not None and latest.status in ("queued", "running"):
+            db.commit()
+            return False
+
+        run_at = datetime.utcnow()
+        if latest is not None and latest.finished_at is not None:
+            run_at = max(run_at, latest.finished_at + timedelta(seconds=every_seconds))
+        self.enqueue(db, job_type, queue=queue, run_at=run_at, max_attempts=1)
+        db.commit()
+        return True
+
+    def claim(self, db: Session, worker_id: str, limit: int, queue: str = "default") -> List[Dict[str, Any]]:
+        """
+        Lock up to `limit` runnable jobs for this worker and commit.
+
+        Within a priority level, companies take turns (each company's oldest job,
+        then each one's second oldest, ...) so one tenant's backlog can't starve
+        the others. Rows another worker is claiming are skipped, not waited on.
+        """
+        now = datetime.utcnow()
+        claimable = and_(
+            Job.queue == queue,
+            Job.run_at <= now,
+            Job.attempts < Job.max_attempts,
+            or_(
+                Job.status == "queued",
+                # Visibility timeout passed - the worker that held it is gone or stuck
+                and_(Job.status == "running", Job.locked_until < now)
+            )
+        )
+
+        ranked = select(
+            Job.id,
+            Job.priority,
+            Job.run_at,
+            func.row_number().over(
+                partition_by=Job.company_id,
+                order_by=(Job.priority.desc(), Job.run_at)
+            ).label("turn")
+        ).where(claimable).subquery()
+        picked = (
+            select(ranked.c.id)
+            .where(ranked.c.turn <= limit)
+            .order_by(ranked.c.priority.desc(), ranked.c.turn, ranked.c.run_at)
+            .limit(limit)
+        )
+        # Re-check claimability under the row lock: the window above isn't locked
+        lockable = select(Job.id).where(Job.id.in_(picked), claimable).with_for_update(skip_locked=True)
+
+        lock_token = f"{worker_id}/{uuid.uuid4().hex[:12]}"
+        rows = db.execute(
+            update(Job)
+            .where(Job.id.in_(lockable.scalar_subquery()))
+            .values(
+                status="running",
+                attempts=Job.attempts + 1,
+                locked_by=lock_token,
+                locked_until=now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS),
+                updated_at=now
+            )
+            .returning(Job.id, Job.job_type, Job.run_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+
+        for row in rows:
+            job_queue_lag.observe(max(0.0, (now - row.run_at).total_seconds()))
+        return [{"id": row.id, "job_type": row.job_type, "lock_token": lock_token} for row in rows]
+
+    def extend_lease(self, job: Job, lock_token: str) -> None:
+        """
+        Push a running job's visibility timeout JOB_VISIBILITY_TIMEOUT_SECONDS
+        out again (in its own session and transaction). Raises LookupError if
+        the job was already re-claimed under another token, so the handler
+        stops instead of racing the new run.
+        """
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            extended = db.execute(
+                update(Job)
+                .where(Job.id == job.id, Job.locked_by == lock_token, Job.status == "running")
+                .values(
+                    locked_until=now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS),
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if extended == 0:
+            raise LookupError(f"Job {job.id} lock lost; it was re-claimed by another worker")
+
+    def execute(self, job_id: uuid.UUID, lock_token: str) -> str:
+        """Run one claimed job in its own session; returns the result label"""
+        db = SessionLocal()
+        try:
+            job = db.get(Job, job_id)
+            if job is None or job.locked_by != lock_token:
+                return "lost_lock"
+            job_type = job.job_type
+
+            start = time.perf_counter()
+            try:
+                handler = self._handlers.get(job_type)
+                if handler is None:
+                    raise LookupError(f"No handler registered for job type '{job_type}'")
+                handler(db, job)
+                result = self._finish(db, job_id, lock_token, {
+                    "status": "succeeded",
+                    "last_error": None,
+                    "finished_at": datetime.utcnow()
+                }, "succeeded")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Job {job_id} ({job_type}) failed: {e}")
+                result = self._fail(db, job_id, lock_token, e)
+
+            job_duration.observe(time.perf_counter() - start, job_type)
+            jobs_processed.inc(job_type, result)
+            return result
+        finally:
+            db.close()
+
+    def _fail(self, db: Session, job_id: uuid.UUID, lock_token: str, error: Exception) -> str:
+        job = db.get(Job, job_id)
+        now = datetime.utcnow()
+        values = {"last_error": f"{type(error).__name__}: {error}"[:2000]}
+        if job is None or job.attempts >= job.max_attempts:
+            values.update(status="dead", finished_at=now)
+            result = "dead"
+        else:
+            values.update(status="queued", run_at=now + timedelta(seconds=self.retry_delay(job.attempts)))
+            result = "retried"
+        return self._finish(db, job_id, lock_token, values, result)
+
+    def _finish(self, db: Session, job_id: uuid.UUID, lock_token: str, values: Dict[str, Any], result: str) -> str:
+        """Apply the final state only if this worker still holds the job, then commit"""
+        finished = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == lock_token, Job.status == "running")
+            .values(locked_by=None, locked_until=None, updated_at=datetime.utcnow(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        if finished.rowcount == 0:
+            # Timed out and re-claimed elsewhere - drop our changes, the other run owns it
+            db.rollback()
+            logger.warning(f"Job {job_id} lock lost before completion; discarding this run")
+            return "lost_lock"
+        db.commit()
+        return result
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Exponential backoff with jitter for the retry after `attempts` tries"""
+        delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+        # Jitter within [delay/2, delay] keeps failed batches from retrying in lockstep
+        return random.uniform(delay / 2, delay)
+
+    def maintain(self, db: Session) -> Dict[str, int]:
+        """Dead-letter timed-out jobs with no attempts left and purge old finished jobs"""
+        now = datetime.utcnow()
+        exhausted = db.execute(
+            update(Job)
+            .where(
+                Job.status == "running",
+                Job.locked_until < now,
+                Job.attempts >= Job.max_attempts
+            )
+            .values(
+                status="dead",
+                last_error="Visibility timeout expired on final attempt",
+                locked_by=None,
+                locked_until=None,
+                finished_at=now,
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        purged = db.execute(
+            delete(Job)
+            .where(Job.finished_at < now - timedelta(days=settings.JOB_RETENTION_DAYS))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return {"dead_lettered": exhausted, "purged": purged}
+
+
+job_queue = JobQueue()
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Archive tier for finished leads.
+
+Leads that have been done (status 'done', untouched since) for more than
+LEAD_ARCHIVE_AFTER_DAYS are moved out of `leads`, together with their
+attempts and attempt payloads, into archived_leads and
+archived_interaction_attempts. The scheduler's scans, the lead list and
+every lead index then only carry leads that can still change.
+
+The archive_done_leads job (scheduled by the job workers every
+LEAD_ARCHIVE_INTERVAL_SECONDS) moves LEAD_ARCHIVE_BATCH_SIZE leads per
+transaction, copy then delete, so a batch is either fully moved or not at
+all. Leads with a call still in progress wait for its result.
+
+Archived leads are read-only and searched through GET /leads/archive - a
+slower path with no custom field index. Attempts already detached by the
+partition retention (app.services.attempt_partitions) stay where they are.
+"""
+from typing import Callable, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, exists, insert, literal, select, tuple_, DateTime
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.archived_interaction_attempt import ArchivedInteractionAttempt
+from app.models.archived_lead import ArchivedLead
+from app.models.interaction_attempt import InteractionAttempt
+from app.models.interaction_attempt_payload import InteractionAttemptPayload
+from app.models.job import Job
+from app.models.lead import Lead
+from app.services.job_queue import job_queue
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Copied column for column; an archive table missing one fails the INSERT loudly
+LEAD_COLUMNS = [column.name for column in Lead.__table__.columns]
+ATTEMPT_COLUMNS = [column.name for column in InteractionAttempt.__table__.columns]
+PAYLOAD_COLUMNS = ["summary", "raw_webhook_data"]
+
+
+class LeadArchiver:
+    def archive_batch(self, db: Session, cutoff: datetime, batch_size: int) -> Tuple[int, int]:
+        """
+        Move up to batch_size leads done before `cutoff` and their attempts
+        to the archive tables; returns (leads, attempts) moved. The caller commits.
+        """
+        lead_ids: List[uuid.UUID] = db.execute(
+            select(Lead.id).where(
+                Lead.status == "done",
+                Lead.updated_at < cutoff,
+                ~exists().where(InteractionAttempt.lead_id == Lead.id, InteractionAttempt.status == "in_progress")
+            ).limit(batch_size).with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not lead_ids:
+            return 0, 0
+
+        archived_at = literal(datetime.utcnow(), DateTime).label("archived_at")
+        lead_attempts = InteractionAttempt.lead_id.in_(lead_ids)
+
+        attempts = db.execute(
+            insert(ArchivedInteractionAttempt).from_select(
+                ATTEMPT_COLUMNS + PAYLOAD_COLUMNS + ["archived_at"],
+                select(
+                    *InteractionAttempt.__table__.columns,
+                    InteractionAttemptPayload.summary,
+                    InteractionAttemptPayload.raw_webhook_data,
+                    archived_at
+                ).outerjoin(
+                    InteractionAttemptPayload, and_(
+                        InteractionAttemptPayload.id == InteractionAttempt.id,
+                        InteractionAttemptPayload.created_at == InteractionAttempt.created_at
+                    )
+                ).where(lead_attempts)
+            )
+        ).rowcount
+        db.execute(
+            delete(InteractionAttemptPayload).where(
+                tuple_(InteractionAttemptPayload.id, InteractionAttemptPayload.created_at).in_(
+                    select(InteractionAttempt.id, InteractionAttempt.created_at).where(lead_attempts)
+                )
+            )
+        )
+        db.execute(delete(InteractionAttempt).where(lead_attempts))
+
+        db.execute(
+            insert(ArchivedLead).from_select(
+                LEAD_COLUMNS + ["archived_at"],
+                select(*Lead.__table__.columns, archived_at).where(Lead.id.in_(lead_ids))
+            )
+        )
+        db.execute(delete(Lead).where(Lead.id.in_(lead_ids)))
+        return len(lead_ids), attempts
+
+    def archive_due(self, db: Session, now: Optional[datetime] = None,
+                    after_batch: Optional[Callable[[], None]] = None) -> Tuple[int, int]:
+        """
+        Archive due leads batch by batch, committing each (then calling
+        after_batch), for at most LEAD_ARCHIVE_MAX_BATCHES batches; the rest
+        waits for the next run.
+        """
+        if settings.LEAD_ARCHIVE_AFTER_DAYS <= 0:
+            return 0, 0
+        cutoff = (now or datetime.utcnow()) - timedelta(days=settings.LEAD_ARCHIVE_AFTER_DAYS)
+        batch_size = settings.LEAD_ARCHIVE_BATCH_SIZE
+
+        leads = attempts = 0
+        for _ in range(settings.LEAD_ARCHIVE_MAX_BATCHES):
+            moved_leads, moved_attempts = self.archive_batch(db, cutoff, batch_size)
+            db.commit()
+            if after_batch is not None:
+                after_batch()
+            leads += moved_leads
+            attempts += moved_attempts
+            if moved_leads < batch_size:
+                break
+        return leads, attempts
+
+
+lead_archiver = LeadArchiver()
+
+
+@job_queue.handler("archive_done_leads")
+def archive_done_leads(db: Session, job: Job) -> None:
+    lock_token = job.locked_by
+    leads, attempts = lead_archiver.archive_due(db, after_batch=lambda: job_queue.extend_lease(job, lock_token))
+    if leads:
+        logger.info(f"Archived {leads} done leads and {attempts} attempts")
@@ -0,0 +1,176 @@
+"""
+Set-based lead operations: pause, resume, reschedule, reassign, delete.
+
+Leads are selected with the same filters as GET /leads (lead_filter_clauses)
+or an ID list, always scoped to the company's live agents. Each operation is
+a single UPDATE. Every action also carries a "not applied yet" condition, so
+counts only include leads that actually changed and re-running an operation
+is harmless. Large selections run as a bulk_lead_update job that updates
+LEAD_BULK_BATCH_SIZE rows per transaction.
+"""
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import exists, select, update
+from sqlalchemy.orm import Session, aliased
+from app.core.config import settings
+from app.models.agent import Agent
+from app.models.job import Job
+from app.models.lead import Lead
+from app.services.custom_field_filter import custom_field_clauses
+from app.services.job_queue import job_queue
+from app.services.lead_events import notify_schedule, to_epoch, wheel_horizon
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+BULK_ACTIONS = ("pause", "resume", "reschedule", "reassign", "delete")
+
+# Wait before retrying a batch that found only rows locked by someone else
+LOCKED_RETRY_SECONDS = 1.0
+
+
+def lead_filter_clauses(agent_id: Optional[str] = None, status: Optional[str] = None,
+                        search: Optional[str] = None, custom_fields: Optional[Dict[str, Any]] = None,
+                        lead_ids: Optional[List[str]] = None) -> List:
+    """WHERE clauses for the lead list filters (tenant scoping is the caller's)"""
+    clauses = []
+    if agent_id:
+        clauses.append(Lead.agent_id == agent_id)
+    if status:
+        clauses.append(Lead.status == status)
+    if search:
+        clauses.append(Lead.first_name.ilike(f"%{search}%") | Lead.phone_e164.ilike(f"%{search}%"))
+    if custom_fields:
+        clauses.extend(custom_field_clauses(custom_fields))
+    if lead_ids is not None:
+        clauses.append(Lead.id.in_(lead_ids))
+    return clauses
+
+
+def company_lead_scope(company_id: uuid.UUID) -> List:
+    """Live leads of the company's live agents, without joining agents"""
+    return [
+        Lead.agent_id.in_(select(Agent.id).where(Agent.company_id == company_id, Agent.is_deleted == False)),
+        Lead.is_deleted == False
+    ]
+
+
+class LeadBulkService:
+    def apply(self, db: Session, company_id: uuid.UUID, user_id: uuid.UUID, action: str,
+              filters: Dict[str, Any], params: Dict[str, Any], batch_size: Optional[int] = None,
+              after_batch: Optional[Callable[[], None]] = None) -> int:
+        """
+        Run one bulk action and return the number of leads changed. Without
+        batch_size it's a single UPDATE left for the caller to commit; with it,
+        batches of that many rows are committed one after another, calling
+        after_batch after each commit.
+        """
+        if params.get("agent_id"):
+            params = {**params, "agent_id": uuid.UUID(str(params["agent_id"]))}
+        selection = company_lead_scope(company_id) + lead_filter_clauses(**filters)
+        where = selection + self._pending(action, params, selection)
+        values = {**self._values(action, params), "updated_by": user_id, "updated_at": datetime.utcnow()}
+
+        if batch_size is None:
+            return self._update(db, update(Lead).where(*where).values(**values))
+
+        total = 0
+        while True:
+            # Rows the dispatcher has locked are skipped this round and picked up by a later batch
+            batch = select(Lead.id).where(*where).limit(batch_size).with_for_update(skip_locked=True)
+            changed = self._update(db, update(Lead).where(Lead.id.in_(batch.scalar_subquery())).values(**values))
+            db.commit()
+            if after_batch is not None:
+                after_batch()
+            total += changed
+            if changed == 0:
+                # Nothing changed: either done, or every remaining row was locked this round
+                if not db.execute(select(exists().where(*where))).scalar():
+                    return total
+                db.rollback()
+                time.sleep(LOCKED_RETRY_SECONDS)
+
+    def _update(self, db: Session, stmt) -> int:
+        """Run one UPDATE of leads and announce the ones it made due soon; returns the row count"""
+        rows = db.execute(
+            stmt.returning(Lead.id, Lead.schedule_at, Lead.status, Lead.is_deleted)
+            .execution_options(synchronize_session=False)
+        ).all()
+        horizon = wheel_horizon()
+        due = [
+            (str(row.id), to_epoch(row.schedule_at))
+            for row in rows
+            if not row.is_deleted and row.status in ("new", "in_progress")
+            and row.schedule_at is not None and row.schedule_at <= horizon
+        ]
+        # Core statements bypass the ORM flush hook that normally tells the dispatcher
+        notify_schedule(db.connection(), due)
+        return len(rows)
+
+    def _values(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if action == "pause":
+            return {"status": "paused"}
+        if action == "resume":
+            return {"status": "new"}
+        if action == "reschedule":
+            return {"schedule_at": params["schedule_at"]}
+        if action == "reassign":
+            return {"agent_id": params["agent_id"]}
+        if action == "delete":
+            return {"is_deleted": True}
+        raise ValueError(f"Unknown bulk action '{action}'")
+
+    def _pending(self, action: str, params: Dict[str, Any], selection: List) -> List:
+        """Leads of the selection the action would still change"""
+        if action == "pause":
+            return [Lead.status.in_(["new", "in_progress"])]
+        if action == "resume":
+            return [Lead.status == "paused"]
+        if action == "reschedule":
+            return [Lead.schedule_at != params["schedule_at"]]
+        if action == "reassign":
+            # uq_agent_phone_key: leads whose number the target agent already has stay where they are
+            existing = aliased(Lead)
+            movable = [
+                Lead.agent_id != params["agent_id"],
+                ~exists().where(existing.agent_id == params["agent_id"], existing.phone_key == Lead.phone_key)
+            ]
+            # Selected leads sharing a number can't all move either: the first per
+            # phone_key does, and the others then fail the NOT EXISTS above
+            first_per_number = (
+                select(Lead.id).where(*selection, *movable)
+                .distinct(Lead.phone_key).order_by(Lead.phone_key, Lead.id)
+            )
+            return movable + [Lead.id.in_(first_per_number.scalar_subquery())]
+        return []
+
+    def enqueue(self, db: Session, company_id: uuid.UUID, user_id: uuid.UUID, action: str,
+                filters: Dict[str, Any], params: Dict[str, Any]) -> Job:
+        """Queue the action as a bulk_lead_update job (committed by the caller)"""
+        return job_queue.enqueue(db, "bulk_lead_update", {
+            "action": action,
+            "filters": filters,
+            "params": {key: value.isoformat() if isinstance(value, datetime) else value for key, value in params.items()},
+            "user_id": str(user_id)
+        }, company_id=company_id)
+
+
+lead_bulk_service = LeadBulkService()
+
+
+@job_queue.handler("bulk_lead_update")
+def bulk_lead_update(db: Session, job: Job) -> None:
+    lock_token = job.locked_by
+    payload = job.payload
+    params = dict(payload["params"])
+    if params.get("schedule_at"):
+        params["schedule_at"] = datetime.fromisoformat(params["schedule_at"])
+    affected = lead_bulk_service.apply(
+        db, job.company_id, uuid.UUID(payload["user_id"]), payload["action"], payload["filters"], params,
+        batch_size=settings.LEAD_BULK_BATCH_SIZE, after_batch=lambda: job_queue.extend_lease(job, lock_token)
+    )
+    # Saved with the job's completion for GET /leads/bulk/{job_id}
+    job.payload = {**payload, "result": {"affected": affected}}
+    logger.info(f"Bulk {payload['action']} for company {job.company_id}: {affected} leads")
@@ -0,0 +1,77 @@
+"""
+Publishes lead schedule changes to the dispatcher worker over Postgres NOTIFY.
+
+Any session flush that creates a lead or changes its schedule_at (or reopens
+it) queues a notification for leads due within the dispatch wheel's horizon;
+Postgres delivers it only if the transaction commits. The dispatcher listens
+on LEAD_SCHEDULE_CHANNEL and fires those leads on time instead of waiting for
+its next full cycle. Importing this module installs the hook.
+"""
+from typing import List, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.lead import Lead
+import calendar
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+LEAD_SCHEDULE_CHANNEL = "lead_schedule"
+# NOTIFY payloads are capped at 8000 bytes; ~60 bytes per lead
+NOTIFY_BATCH_SIZE = 100
+
+
+def to_epoch(value: datetime) -> float:
+    """Naive UTC datetime -> epoch seconds"""
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+
+
+def wheel_horizon() -> datetime:
+    """Leads scheduled later than this aren't announced; the dispatcher's refill picks them up"""
+    return datetime.utcnow() + timedelta(seconds=settings.DISPATCH_WHEEL_HORIZON_SECONDS)
+
+
+def _schedule_changes(session: Session) -> List[Tuple[str, float]]:
+    horizon = wheel_horizon()
+    changes = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Lead) or obj.schedule_at is None:
+            continue
+        if obj.is_deleted or obj.status not in ("new", "in_progress") or obj.schedule_at > horizon:
+            continue
+        state = inspect(obj)
+        if not state.pending:
+            # Rescheduled, restored, or reopened - not just moved to in_progress by a dispatch
+            if not (state.attrs.schedule_at.history.has_changes()
+                    or state.attrs.is_deleted.history.has_changes()
+                    or (state.attrs.status.history.has_changes() and obj.status == "new")):
+                continue
+        changes.append((str(obj.id), to_epoch(obj.schedule_at)))
+    return changes
+
+
+def notify_schedule(connection: Connection, changes: List[Tuple[str, float]]) -> None:
+    """
+    Queue (lead_id, schedule epoch) notifications on the connection's transaction.
+    Bulk Core statements bypass the flush hook and call this directly, passing
+    only open leads due before wheel_horizon().
+    """
+    if not settings.DISPATCH_WHEEL_ENABLED or connection.dialect.name != "postgresql":
+        return
+    for i in range(0, len(changes), NOTIFY_BATCH_SIZE):
+        connection.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": LEAD_SCHEDULE_CHANNEL, "payload": json.dumps(changes[i:i + NOTIFY_BATCH_SIZE])}
+        )
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _notify_schedule_changes(session: Session, flush_context) -> None:
+    if not settings.DISPATCH_WHEEL_ENABLED:
+        return
+    notify_schedule(session.connection(), _schedule_changes(session))
@@ -0,0 +1,165 @@
+"""
+Batch lead upserts for POST /leads/batch.
+
+Items are validated and phone-normalized up front, then written with one
+executemany INSERT ... ON CONFLICT (agent_id, phone_key) ... RETURNING,
+which SQLAlchemy sends as multi-row VALUES pages. No ORM objects are built.
+
+With on_conflict="update", an existing lead gets the item's name and custom
+fields. Its schedule_at changes only if the item gives one. A soft-deleted
+lead is restored as new. With "skip", existing leads are left alone.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import case, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.agent import Agent
+from app.models.lead import Lead
+from app.schemas.lead import LeadBatchItem, LeadBatchItemResult
+from app.services.lead_events import notify_schedule, to_epoch, wheel_horizon
+from app.services.phone_service import phone_service
+from app.utils.ids import uuid7
+from pydantic import ValidationError
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class LeadIngestService:
+    def upsert(self, db: Session, company_id: uuid.UUID, user_id: uuid.UUID, raw_items: List[Any],
+               default_agent_id: Optional[str] = None, on_conflict: str = "update") -> List[LeadBatchItemResult]:
+        """Validate and upsert raw item dicts; one result per item, in order. Doesn't commit."""
+        results: List[Optional[LeadBatchItemResult]] = [None] * len(raw_items)
+
+        items: Dict[int, LeadBatchItem] = {}
+        for index, raw in enumerate(raw_items):
+            if isinstance(raw, LeadBatchItemResult):
+                results[index] = raw  # Unparseable NDJSON line, already reported
+                continue
+            try:
+                items[index] = LeadBatchItem.model_validate(raw)
+            except ValidationError as e:
+                results[index] = self._error(index, "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in e.errors()
+                ))
+
+        # One query for every agent the batch names, scoped to the company
+        agent_ids = {item.agent_id or default_agent_id for item in items.values()} - {None}
+        known_agents = self._company_agents(db, company_id, agent_ids)
+        normalized = phone_service.normalize_phones([item.phone_e164 for item in items.values()])
+
+        now = datetime.utcnow()
+        rows: Dict[Tuple[uuid.UUID, int], Tuple[int, Dict]] = {}
+        for index, item in items.items():
+            agent_id = known_agents.get(item.agent_id or default_agent_id)
+            phone = normalized[item.phone_e164]
+            if agent_id is None:
+                results[index] = self._error(index, "Agent not found" if item.agent_id or default_agent_id else "agent_id is required")
+                continue
+            if phone is None:
+                results[index] = self._error(index, f"Invalid phone number format: {item.phone_e164}")
+                continue
+
+            key = (agent_id, phone_service.phone_key(phone))
+            if key in rows:
+                # ON CONFLICT can't touch a row twice in one statement; the later item wins
+                earlier = rows[key][0]
+                results[earlier] = LeadBatchItemResult(index=earlier, status="duplicate",
+                                                       error=f"Superseded by item {index}")
+            rows[key] = (index, {
+                "id": uuid7(),
+                "agent_id": agent_id,
+                "first_name": item.first_name,
+                "phone_e164": phone,
+                "phone_key": key[1],
+                "status": "new",
+                "custom_fields": item.custom_fields or {},
+                "schedule_at": item.schedule_at or now,
+                "attempts_count": 0,
+                "created_by": user_id,
+                "updated_by": user_id,
+                "created_at": now,
+                "updated_at": now,
+                "is_deleted": False,
+                "_reschedule": item.schedule_at is not None
+            })
+
+        # Items that set schedule_at move existing leads; the rest keep their schedule
+        batches = {True: [], False: []}
+        for index, row in rows.values():
+            batches[row.pop("_reschedule")].append((index, row))
+        for reschedule, batch in batches.items():
+            if batch:
+                self._write(db, batch, results, on_conflict, reschedule)
+
+        return [result or self._error(index, "Not processed") for index, result in enumerate(results)]
+
+    def _company_agents(self, db: Session, company_id: uuid.UUID, agent_ids) -> Dict[str, uuid.UUID]:
+        """Requested agent ID string -> UUID, for the company's live agents"""
+        parsed = {}
+        for agent_id in agent_ids:
+            try:
+                parsed[agent_id] = uuid.UUID(str(agent_id))
+            except ValueError:
+                continue
+        if not parsed:
+            return {}
+        found = {row.id for row in db.query(Agent.id).filter(
+            Agent.id.in_(list(parsed.values())),
+            Agent.company_id == company_id,
+            Agent.is_deleted == False
+        )}
+        return {agent_id: value for agent_id, value in parsed.items() if value in found}
+
+    def _write(self, db: Session, batch: List[Tuple[int, Dict]], results: List, on_conflict: str,
+               reschedule: bool) -> None:
+        by_key = {(row["agent_id"], row["phone_key"]): index for index, row in batch}
+        stmt = pg_insert(Lead)
+        if on_conflict == "skip":
+            stmt = stmt.on_conflict_do_nothing(constraint="uq_agent_phone_key")
+        else:
+            excluded = stmt.excluded
+            # SET expressions read the existing row, so this is its state before the update
+            restored = Lead.is_deleted == True
+            stmt = stmt.on_conflict_do_update(constraint="uq_agent_phone_key", set_={
+                "first_name": excluded.first_name,
+                "custom_fields": excluded.custom_fields,
+                "schedule_at": excluded.schedule_at if reschedule else case(
+                    (restored, excluded.schedule_at), else_=Lead.schedule_at
+                ),
+                "status": case((restored, "new"), else_=Lead.status),
+                "attempts_count": case((restored, 0), else_=Lead.attempts_count),
+                "disposition": case((restored, None), else_=Lead.disposition),
+                "is_deleted": False,
+                "updated_by": excluded.updated_by,
+                "updated_at": excluded.updated_at
+            })
+        stmt = stmt.returning(
+            Lead.id, Lead.agent_id, Lead.phone_key, Lead.status, Lead.schedule_at,
+            # xmax is 0 only for freshly inserted tuples
+            literal_column("(xmax = 0)").label("inserted")
+        )
+
+        horizon = wheel_horizon()
+        due = []
+        # executemany: compiled once, sent as multi-row VALUES pages (insertmanyvalues)
+        for row in db.execute(stmt, [row for _, row in batch]).all():
+            index = by_key.pop((row.agent_id, row.phone_key))
+            results[index] = LeadBatchItemResult(index=index, status="inserted" if row.inserted else "updated",
+                                                 id=str(row.id))
+            if row.status in ("new", "in_progress") and row.schedule_at <= horizon:
+                due.append((str(row.id), to_epoch(row.schedule_at)))
+        for index in by_key.values():
+            # on_conflict="skip" returns nothing for existing leads
+            results[index] = LeadBatchItemResult(index=index, status="skipped")
+        # Core statements bypass the ORM flush hook that normally tells the dispatcher
+        notify_schedule(db.connection(), due)
+
+    @staticmethod
+    def _error(index: int, message: str) -> LeadBatchItemResult:
+        return LeadBatchItemResult(index=index, status="error", error=message)
+
+
+lead_ingest_service = LeadIngestService()
@@ -0,0 +1,154 @@
+"""
+Predictive pacing: per-agent dial rate from live answer rates.
+
+For agents with pacing_mode 'predictive', the engine tracks over the last
+PACING_WINDOW_MINUTES:
+- the answer rate of finished attempts, smoothed toward
+  PACING_PRIOR_ANSWER_RATE until PACING_MIN_SAMPLES calls are in
+- the average handle time (duration_seconds) of answered calls
+
+To keep the company's max_concurrent_calls connected, the agent needs
+concurrency * 60 / AHT connects per minute. That means dialing
+
+    target_cpm = concurrency * 60 / AHT / answer_rate
+
+clamped to [PACING_MIN_CALLS_PER_MINUTE, PACING_MAX_CALLS_PER_MINUTE].
+
+The dispatcher admits a paced agent's calls through a token bucket filled at
+target_cpm. The company concurrency check still applies on top, so pacing
+only ever slows dialing down.
+"""
+from typing import Dict, Iterable, List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.core.metrics import pacing_answer_rate, pacing_target_cpm
+from app.models.agent import Agent
+from app.models.interaction_attempt import InteractionAttempt
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _AgentPace:
+    __slots__ = ("target_cpm", "answer_rate", "handle_seconds", "samples", "tokens", "updated_at", "refreshed_at")
+
+    def __init__(self):
+        self.target_cpm = settings.PACING_MIN_CALLS_PER_MINUTE
+        self.answer_rate = settings.PACING_PRIOR_ANSWER_RATE
+        self.handle_seconds = float(settings.PACING_DEFAULT_HANDLE_SECONDS)
+        self.samples = 0
+        self.tokens = 1.0  # Let the first call through straight away
+        self.updated_at = time.monotonic()
+        self.refreshed_at = 0.0
+
+
+class PacingEngine:
+    def __init__(self):
+        self._agents: Dict[str, _AgentPace] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session, agents: Iterable[Agent], company_limits: Dict) -> None:
+        """
+        Recompute targets for predictive agents whose stats are older than
+        PACING_REFRESH_SECONDS; company_limits maps company_id -> max_concurrent_calls
+        """
+        now = time.monotonic()
+        due = {}
+        for agent in agents:
+            if agent.pacing_mode != "predictive":
+                continue
+            pace = self._agents.get(agent.id)
+            if pace is None or now - pace.refreshed_at >= settings.PACING_REFRESH_SECONDS:
+                due[agent.id] = agent
+        if not due:
+            return
+
+        answered = InteractionAttempt.outcome == "answered"
+        rows = db.query(
+            InteractionAttempt.agent_id,
+            func.count(InteractionAttempt.id).filter(InteractionAttempt.outcome.isnot(None)),
+            func.count(InteractionAttempt.id).filter(answered),
+            func.avg(InteractionAttempt.duration_seconds).filter(answered)
+        ).filter(
+            InteractionAttempt.agent_id.in_(list(due)),
+            InteractionAttempt.status.in_(["completed", "failed"]),
+            InteractionAttempt.created_at > datetime.utcnow() - timedelta(minutes=settings.PACING_WINDOW_MINUTES)
+        ).group_by(InteractionAttempt.agent_id).all()
+        stats = {agent_id: (finished, answered_count, avg_duration) for agent_id, finished, answered_count, avg_duration in rows}
+
+        with self._lock:
+            for agent_id, agent in due.items():
+                finished, answered_count, avg_duration = stats.get(agent_id, (0, 0, None))
+                pace = self._agents.get(agent_id)
+                is_new = pace is None
+                if is_new:
+                    pace = self._agents[agent_id] = _AgentPace()
+                concurrency = company_limits.get(agent.company_id) or 1
+                self._update(pace, concurrency, finished, answered_count, avg_duration)
+                if is_new:
+                    # Start with a full bucket rather than ramping up from one call
+                    pace.tokens = self._bucket_size(pace)
+                pace.refreshed_at = now
+                pacing_target_cpm.set(pace.target_cpm, str(agent_id))
+                pacing_answer_rate.set(pace.answer_rate, str(agent_id))
+
+    def _update(self, pace: _AgentPace, concurrency: int, finished: int, answered: int, avg_duration) -> None:
+        prior_weight = settings.PACING_MIN_SAMPLES
+        pace.samples = finished
+        # Bayesian-style smoothing keeps a handful of early no-answers from spiking the dial rate
+        pace.answer_rate = max(
+            0.01,
+            (answered + settings.PACING_PRIOR_ANSWER_RATE * prior_weight) / (finished + prior_weight)
+        )
+        if avg_duration:
+            pace.handle_seconds = max(10.0, float(avg_duration))
+        target = max(1, concurrency) * 60.0 / pace.handle_seconds / pace.answer_rate
+        pace.target_cpm = min(settings.PACING_MAX_CALLS_PER_MINUTE, max(settings.PACING_MIN_CALLS_PER_MINUTE, target))
+
+    def admit(self, agent: Agent) -> bool:
+        """Take a dial token for a paced agent; always True for unpaced agents"""
+        if agent.pacing_mode != "predictive":
+            return True
+        now = time.monotonic()
+        with self._lock:
+            pace = self._agents.setdefault(agent.id, _AgentPace())
+            pace.tokens = min(self._bucket_size(pace), pace.tokens + (now - pace.updated_at) * pace.target_cpm / 60.0)
+            pace.updated_at = now
+            if pace.tokens < 1.0:
+                return False
+            pace.tokens -= 1.0
+            return True
+
+    @staticmethod
+    def _bucket_size(pace: _AgentPace) -> float:
+        # Up to PACING_BURST_SECONDS worth of calls at the target rate
+        return max(1.0, pace.target_cpm * settings.PACING_BURST_SECONDS / 60.0)
+
+    def refund(self, agent: Agent) -> None:
+        """Give back a token when an admitted call was never placed"""
+        if agent.pacing_mode != "predictive":
+            return
+        with self._lock:
+            pace = self._agents.get(agent.id)
+            if pace is not None:
+                pace.tokens += 1.0
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {
+                    "agent_id": str(agent_id),
+                    "target_calls_per_minute": round(pace.target_cpm, 2),
+                    "answer_rate": round(pace.answer_rate, 3),
+                    "avg_handle_seconds": round(pace.handle_seconds, 1),
+                    "samples": pace.samples
+                }
+                for agent_id, pace in self._agents.items()
+            ]
+
+
+pacing_engine = PacingEngine()
@@ -1,13 +1,20 @@
 import re
-import phonenumbers
-from phonenumbers import PhoneNumberFormat
-from typing import Optional
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from app.core.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
 
 
 class PhoneService:
     @staticmethod
     def normalize_phone(phone: str, country_code: str = "US") -> Optional[str]:
         """Normalize phone number to E.164 format"""
+        # Deferred: phonenumbers loads its metadata tables on import
+        import phonenumbers
+        from phonenumbers import PhoneNumberFormat
+        
         try:
             # Parse the phone number
             parsed = phonenumbers.parse(phone, country_code)
@@ -21,10 +28,74 @@ class PhoneService:
         except phonenumbers.NumberParseException:
             return None
     
+    @staticmethod
+    def normalize_phones(phones: List[str], country_code: str = "US") -> Dict[str, Optional[str]]:
+        """Normalize many numbers at once; each distinct input is parsed once, then cached"""
+        before = _normalize_cached.cache_info()
+        normalized = {phone: _normalize_cached(phone, country_code) for phone in set(phones)}
+        # From the cache's own counters (approximate while other batches run concurrently)
+        after = _normalize_cached.cache_info()
+        record_cache_lookup("phone_normalize", True, after.hits - before.hits)
+        record_cache_lookup("phone_normalize", False, after.misses - before.misses)
+        return normalized
+    
+    @staticmethod
+    def phone_key(phone_e164: str) -> Optional[int]:
+        """
+        Compact lookup key for a normalized number: its E.164 digits (country
+        code + national number) as one integer. E.164 digits never start with
+        0 and are at most 15 long, so the key is unique and fits a BIGINT.
+        """
+        if not PhoneService.is_valid_e164(phone_e164):
+            return None
+        return int(phone_e164[1:])
+    
     @staticmethod
     def is_valid_e164(phone: str) -> bool:
         """Check if phone number is in valid E.164 format"""
         return bool(re.match(r'^\+[1-9]\d{1,14}$', phone))
+    
+    @staticmethod
+    def list_owned_numbers(providers: List[Any], raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """
+        Numbers owned across the given PhoneProvider records, each tagged with
+        its provider. A provider whose listing fails is skipped, unless
+        raise_errors is set - then its error propagates (callers checking
+        ownership can't tell "not owned" from "provider down" otherwise).
+        """
+        from app.services.twilio_service import twilio_service
+        from app.services.plivo_service import plivo_service
+        
+        all_numbers = []
+        for provider_record in providers:
+            try:
+                if provider_record.provider == "twilio":
+                    numbers = twilio_service.list_owned_numbers(provider_record.credentials)
+                elif provider_record.provider == "plivo":
+                    numbers = plivo_service.list_owned_numbers(provider_record.credentials)
+                else:
+                    continue
+                
+                # Add provider info to each number
+                for number in numbers:
+                    number["provider"] = provider_record.provider
+                
+                all_numbers.extend(numbers)
+                
+            except Exception as e:
+                logger.error(f"Error fetching owned numbers from {provider_record.provider}: {e}")
+                if raise_errors:
+                    raise
+                # Continue with other providers if one fails
+                continue
+        
+        return all_numbers
+
+
+@lru_cache(maxsize=100000)
+def _normalize_cached(phone: str, country_code: str) -> Optional[str]:
+    # Batch syncs resend mostly the same numbers; parsing is ~50us each
+    return PhoneService.normalize_phone(phone, country_code)
 
 
 phone_service = PhoneService()
\ No newline at end of file
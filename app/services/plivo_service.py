@@ -1,5 +1,6 @@
 from typing import Dict, List, Any, Optional
 import logging
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,23 @@ class PlivoService:
         required_fields = ['auth_id', 'auth_token']
         return all(field in credentials for field in required_fields)
     
+    def _client(self, credentials: Dict[str, str]):
+        """Plivo REST client, routed to PLIVO_API_BASE_URL when configured"""
+        import plivo
+        
+        client = plivo.RestClient(credentials['auth_id'], credentials['auth_token'])
+        if settings.PLIVO_API_BASE_URL:
+            # The SDK resets base_uri to the production host before every request
+            create_request = client.create_request
+            base_uri = settings.PLIVO_API_BASE_URL.rstrip("/") + "/v1/Account"
+            
+            def create_request_with_base(*args, **kwargs):
+                client.base_uri = base_uri
+                return create_request(*args, **kwargs)
+            
+            client.create_request = create_request_with_base
+        return client
+    
     def list_available_numbers(self, credentials: Dict[str, str], 
                              country_code: str = "US", 
                              area_code: Optional[str] = None,
@@ -24,9 +42,7 @@ class PlivoService:
             return self._mock_available_numbers()
         
         try:
-            import plivo
-            
-            client = plivo.RestClient(credentials['auth_id'], credentials['auth_token'])
+            client = self._client(credentials)
             
             # Search for available numbers
             search_params = {
@@ -38,7 +54,7 @@ class PlivoService:
             if area_code:
                 search_params['region'] = area_code
             
-            response = client.phone_numbers.search(**search_params)
+            response = _as_dict(client.numbers.search(**search_params))
             
             return [
                 {
@@ -53,7 +69,7 @@ class PlivoService:
                     },
                     'monthly_cost': float(number.get('monthly_rental_rate', 0.80))
                 }
-                for number in response.get('objects', [])
+                for number in map(_as_dict, response.get('objects', []))
             ]
             
         except Exception as e:
@@ -68,12 +84,10 @@ class PlivoService:
             return self._mock_purchase_result(phone_number)
         
         try:
-            import plivo
-            
-            client = plivo.RestClient(credentials['auth_id'], credentials['auth_token'])
+            client = self._client(credentials)
             
             # Purchase the number
-            response = client.phone_numbers.buy(number=phone_number)
+            response = _as_dict(client.numbers.buy(number=phone_number))
             
             return {
                 'number_id': response.get('number'),
@@ -93,11 +107,9 @@ class PlivoService:
             return self._mock_owned_numbers()
         
         try:
-            import plivo
+            client = self._client(credentials)
             
-            client = plivo.RestClient(credentials['auth_id'], credentials['auth_token'])
-            
-            response = client.phone_numbers.list()
+            response = _as_dict(client.numbers.list())
             
             return [
                 {
@@ -113,7 +125,7 @@ class PlivoService:
                     'monthly_cost': float(number.get('monthly_rental_rate', 0.80)),
                     'number_type': number.get('type', 'local')
                 }
-                for number in response.get('objects', [])
+                for number in map(_as_dict, response.get('objects', []))
             ]
             
         except Exception as e:
@@ -126,14 +138,13 @@ class PlivoService:
             return True  # Mock success
         
         try:
-            import plivo
-            
-            client = plivo.RestClient(credentials['auth_id'], credentials['auth_token'])
+            client = self._client(credentials)
             
             # Release the number
-            response = client.phone_numbers.delete(number=phone_number)
+            # The SDK returns nothing for a 204 and raises on errors
+            client.numbers.delete(number=phone_number)
             
-            return response.get('status_code') == 204
+            return True
                 
         except Exception as e:
             logger.error(f"Error releasing Plivo number {phone_number}: {e}")
@@ -185,4 +196,9 @@ class PlivoService:
         }
 
 
+def _as_dict(response: Any) -> Dict[str, Any]:
+    """Plivo SDK response objects keep their fields as attributes"""
+    return response if isinstance(response, dict) else vars(response)
+
+
 plivo_service = PlivoService()
\ No newline at end of file
@@ -1,12 +1,14 @@
 from typing import Dict, Any, Optional, List
-from retell import Retell
 from app.core.config import settings
 from app.core.retell_template import (
     MASTER_AGENT_CONFIG, 
     build_dynamic_variables, 
     get_voice_id_for_agent
 )
+from app.core.metrics import retell_call_create_duration, retell_call_create_errors
 import logging
+import threading
+import time
 from datetime import datetime
 import asyncio
 
@@ -16,29 +18,50 @@ logger = logging.getLogger(__name__)
 class RetellService:
     def __init__(self):
         self.api_key = getattr(settings, 'RETELL_API_KEY', None)
-        self.master_agent_id = None  # Will be set after creating master template
+        # The SDK client and master template agent are set up on first use, keeping
+        # the SDK import and the agent lookup off the boot path
+        self._client = None
+        self._master_agent_id = None
+        self._master_agent_checked = False
+        self._init_lock = threading.RLock()
         
         if self.api_key and self.api_key != "your-retell-api-key-here":
             self.enabled = True
-            self.client = Retell(api_key=self.api_key)
-            # Initialize master template agent on first use
-            self._initialize_master_agent()
         else:
             logger.warning("Retell API key not configured - running in mock mode")
             self.enabled = False
-            self.client = None
+    
+    @property
+    def client(self):
+        """Retell SDK client, created on first use"""
+        if self._client is None and self.enabled:
+            with self._init_lock:
+                if self._client is None:
+                    from retell import Retell
+                    self._client = Retell(api_key=self.api_key, base_url=settings.RETELL_BASE_URL or None)
+        return self._client
+    
+    @property
+    def master_agent_id(self) -> Optional[str]:
+        """Master template agent ID, looked up (or created) on first use"""
+        if not self._master_agent_checked and self.enabled:
+            with self._init_lock:
+                if not self._master_agent_checked:
+                    self._initialize_master_agent()
+                    self._master_agent_checked = True
+        return self._master_agent_id
     
     def _initialize_master_agent(self):
         """Initialize the master template agent if it doesn't exist"""
         try:
             # Check if we have the master agent ID stored somewhere
             # For now, we'll create one if it doesn't exist
-            if not self.master_agent_id:
-                self.master_agent_id = self._create_or_get_master_agent()
+            if not self._master_agent_id:
+                self._master_agent_id = self._create_or_get_master_agent()
         except Exception as e:
             logger.error(f"Failed to initialize master agent: {e}")
             # Fall back to legacy mode if template creation fails
-            self.master_agent_id = None
+            self._master_agent_id = None
     
     def _create_or_get_master_agent(self) -> str:
         """Create or retrieve the master template agent"""
@@ -144,6 +167,7 @@ class RetellService:
             logger.error("Master template agent not initialized")
             return None
         
+        start = time.perf_counter()
         try:
             # Build dynamic variables for this specific call
             dynamic_vars = build_dynamic_variables(agent_config, lead_data, call_context)
@@ -153,7 +177,7 @@ class RetellService:
             
             # Create call with template agent and dynamic variables
             response = self.client.call.create_phone_call(
-                retell_agent_id=self.master_agent_id,
+                override_agent_id=self.master_agent_id,
                 from_number=agent_config.get("outbound_phone"),
                 to_number=lead_data["phone"],
                 retell_llm_dynamic_variables=dynamic_vars,
@@ -175,7 +199,10 @@ class RetellService:
             logger.error(f"Error creating template call: {e}")
             if hasattr(e, 'response'):
                 logger.error(f"Response details: {getattr(e.response, 'text', 'No response text')}")
+            retell_call_create_errors.inc()
             return None
+        finally:
+            retell_call_create_duration.observe(time.perf_counter() - start)
     
     async def create_concurrent_calls(self, agent_config: dict, leads: List[dict], call_context: dict = None) -> List[str]:
         """Create multiple concurrent calls using the template approach"""
@@ -221,6 +248,7 @@ class RetellService:
         if not self.enabled:
             return f"mock_call_{call_data.get('to_number', 'unknown')[-4:]}"
         
+        start = time.perf_counter()
         try:
             # Use SDK to create phone call
             response = self.client.call.create_phone_call(
@@ -236,7 +264,10 @@ class RetellService:
             
         except Exception as e:
             logger.error(f"Error creating phone call via SDK: {e}")
+            retell_call_create_errors.inc()
             return None
+        finally:
+            retell_call_create_duration.observe(time.perf_counter() - start)
     
     def get_call(self, call_id: str) -> Optional[Dict]:
         """Get call details from Retell"""
@@ -250,6 +281,7 @@ class RetellService:
         
         try:
             call = self.client.call.retrieve(call_id=call_id)
+            analysis = getattr(call, "call_analysis", None)
             # Convert to dict
             return {
                 "call_id": call.call_id,
@@ -257,7 +289,12 @@ class RetellService:
                 "call_status": call.call_status,
                 "from_number": call.from_number,
                 "to_number": call.to_number,
-                "metadata": call.metadata
+                "metadata": call.metadata,
+                "end_timestamp": getattr(call, "end_timestamp", None),
+                "duration_ms": getattr(call, "duration_ms", None),
+                "disconnection_reason": getattr(call, "disconnection_reason", None),
+                "recording_url": getattr(call, "recording_url", None),
+                "call_analysis": analysis.model_dump() if hasattr(analysis, "model_dump") else analysis
             }
         except Exception as e:
             logger.error(f"Error getting call via SDK: {e}")
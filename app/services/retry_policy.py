@@ -0,0 +1,129 @@
+"""
+Per-outcome retry policies, evaluated once when a call result arrives.
+
+Each non-answered outcome has a rule:
+    {"retry": true, "delay_minutes": 30, "backoff": "exponential",
+     "factor": 2.0, "max_delay_minutes": 1440, "jitter": 0.2}
+
+- backoff "fixed" waits delay_minutes every time, "linear" waits
+  delay_minutes * n, and "exponential" waits delay_minutes * factor^(n-1),
+  where n is the number of attempts made so far. The wait is capped at
+  max_delay_minutes.
+- jitter spreads each delay by +/- that fraction, so leads that failed
+  together don't all retry in the same second.
+- max_attempts_per_day defers further attempts to the next day in the
+  agent's timezone.
+
+An agent's retry_policy JSON overrides DEFAULT_RETRY_POLICY rule by rule. The
+no_answer delay defaults to the agent's retry_delay_minutes. The resulting
+next dial time is written to lead.schedule_at, so the scheduler only compares
+timestamps.
+"""
+from typing import Any, Dict, NamedTuple, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.agent import Agent
+from app.models.interaction_attempt import InteractionAttempt
+from app.models.lead import Lead
+import logging
+import random
+import pytz
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_POLICY: Dict[str, Any] = {
+    # delay_minutes omitted: falls back to Agent.retry_delay_minutes
+    "no_answer": {"retry": True, "backoff": "exponential", "factor": 2.0, "max_delay_minutes": 1440, "jitter": 0.2},
+    "busy": {"retry": True, "delay_minutes": 10, "backoff": "fixed", "jitter": 0.3},
+    "voicemail": {"retry": True, "delay_minutes": 240, "backoff": "linear", "max_delay_minutes": 1440, "jitter": 0.1},
+    "failed": {"retry": True, "delay_minutes": 15, "backoff": "exponential", "factor": 2.0, "max_delay_minutes": 240, "jitter": 0.2},
+}
+
+
+class RetryDecision(NamedTuple):
+    done: bool
+    disposition: Optional[str]
+    next_attempt_at: Optional[datetime]
+
+
+class RetryPolicyEngine:
+    def policy_for(self, agent: Agent) -> Dict[str, Any]:
+        """Defaults merged with the agent's overrides"""
+        overrides = agent.retry_policy or {}
+        policy = {
+            outcome: {**rule, **{k: v for k, v in (overrides.get(outcome) or {}).items() if v is not None}}
+            for outcome, rule in DEFAULT_RETRY_POLICY.items()
+        }
+        daily_cap = overrides.get("max_attempts_per_day")
+        policy["max_attempts_per_day"] = settings.RETRY_MAX_ATTEMPTS_PER_DAY if daily_cap is None else daily_cap
+        return policy
+
+    def retry_delay(self, agent: Agent, outcome: str, attempts: int, policy: Optional[Dict] = None) -> timedelta:
+        """Jittered wait before the next attempt after `attempts` tries ending in `outcome`"""
+        policy = policy or self.policy_for(agent)
+        rule = policy.get(outcome) or policy["failed"]
+        base = rule.get("delay_minutes") or agent.retry_delay_minutes or 30
+        n = max(1, attempts)
+
+        backoff = rule.get("backoff", "fixed")
+        if backoff == "exponential":
+            minutes = base * rule.get("factor", 2.0) ** (n - 1)
+        elif backoff == "linear":
+            minutes = base * n
+        else:
+            minutes = base
+        if rule.get("max_delay_minutes"):
+            minutes = min(minutes, rule["max_delay_minutes"])
+
+        jitter = rule.get("jitter", 0)
+        if jitter:
+            minutes *= random.uniform(1 - jitter, 1 + jitter)
+        return timedelta(minutes=minutes)
+
+    def decide(self, db: Session, agent: Agent, lead: Lead, outcome: str,
+               now: Optional[datetime] = None) -> RetryDecision:
+        """Whether the lead is finished and, if not, when to dial it next"""
+        now = now or datetime.utcnow()
+        if outcome == "answered":
+            return RetryDecision(True, "completed", None)
+
+        policy = self.policy_for(agent)
+        rule = policy.get(outcome) or policy["failed"]
+        if not rule.get("retry", True) or lead.attempts_count >= (agent.max_attempts or 1):
+            # Out of attempts (or the outcome isn't worth retrying)
+            return RetryDecision(True, "no_answer", None)
+
+        next_attempt_at = now + self.retry_delay(agent, outcome, lead.attempts_count, policy)
+
+        daily_cap = policy["max_attempts_per_day"]
+        if daily_cap:
+            day_start, next_day_start = self._local_day_bounds(agent, now)
+            if self._attempts_since(db, lead, day_start) >= daily_cap and next_attempt_at < next_day_start:
+                # Spread the next-day retries over the first half hour instead of all at midnight
+                next_attempt_at = next_day_start + timedelta(minutes=random.uniform(0, 30))
+
+        return RetryDecision(False, None, next_attempt_at)
+
+    def _local_day_bounds(self, agent: Agent, now: datetime):
+        """Start of today and tomorrow in the agent's timezone, as naive UTC"""
+        try:
+            tz = pytz.timezone(agent.timezone or "UTC")
+        except pytz.UnknownTimeZoneError:
+            tz = pytz.utc
+        local_now = pytz.utc.localize(now).astimezone(tz)
+        local_midnight = tz.localize(datetime(local_now.year, local_now.month, local_now.day))
+        day_start = local_midnight.astimezone(pytz.utc).replace(tzinfo=None)
+        next_day = tz.normalize(local_midnight + timedelta(days=1))
+        next_day = tz.localize(datetime(next_day.year, next_day.month, next_day.day))
+        return day_start, next_day.astimezone(pytz.utc).replace(tzinfo=None)
+
+    def _attempts_since(self, db: Session, lead: Lead, since: datetime) -> int:
+        return db.query(func.count(InteractionAttempt.id)).filter(
+            InteractionAttempt.lead_id == lead.id,
+            InteractionAttempt.created_at >= since
+        ).scalar() or 0
+
+
+retry_policy_engine = RetryPolicyEngine()
@@ -1,5 +1,6 @@
 from typing import Dict, List, Any, Optional
 import logging
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,23 @@ class TwilioService:
         required_fields = ['account_sid', 'auth_token']
         return all(field in credentials for field in required_fields)
     
+    def _client(self, credentials: Dict[str, str]):
+        """Twilio REST client, routed to TWILIO_API_BASE_URL when configured"""
+        from twilio.rest import Client
+        
+        http_client = None
+        if settings.TWILIO_API_BASE_URL:
+            from twilio.http.http_client import TwilioHttpClient
+            
+            class RedirectingHttpClient(TwilioHttpClient):
+                def request(self, method, url, *args, **kwargs):
+                    url = url.replace("https://api.twilio.com", settings.TWILIO_API_BASE_URL.rstrip("/"), 1)
+                    return super().request(method, url, *args, **kwargs)
+            
+            http_client = RedirectingHttpClient()
+        
+        return Client(credentials['account_sid'], credentials['auth_token'], http_client=http_client)
+    
     def list_available_numbers(self, credentials: Dict[str, str], 
                              country_code: str = "US", 
                              area_code: Optional[str] = None,
@@ -24,13 +42,10 @@ class TwilioService:
             return self._mock_available_numbers()
         
         try:
-            from twilio.rest import Client
-            
-            client = Client(credentials['account_sid'], credentials['auth_token'])
+            client = self._client(credentials)
             
             # Search for available local numbers
             search_params = {
-                'country_code': country_code,
                 'limit': limit
             }
             
@@ -67,9 +82,7 @@ class TwilioService:
             return self._mock_purchase_result(phone_number)
         
         try:
-            from twilio.rest import Client
-            
-            client = Client(credentials['account_sid'], credentials['auth_token'])
+            client = self._client(credentials)
             
             # Purchase the number
             purchased_number = client.incoming_phone_numbers.create(
@@ -94,9 +107,7 @@ class TwilioService:
             return self._mock_owned_numbers()
         
         try:
-            from twilio.rest import Client
-            
-            client = Client(credentials['account_sid'], credentials['auth_token'])
+            client = self._client(credentials)
             
             incoming_numbers = client.incoming_phone_numbers.list()
             
@@ -126,9 +137,7 @@ class TwilioService:
             return True  # Mock success
         
         try:
-            from twilio.rest import Client
-            
-            client = Client(credentials['account_sid'], credentials['auth_token'])
+            client = self._client(credentials)
             
             # Find the number by phone number
             incoming_numbers = client.incoming_phone_numbers.list(phone_number=phone_number)
@@ -0,0 +1,31 @@
+from typing import Any, Dict
+from starlette.routing import BaseRoute
+from app.core.metrics import record_cache_lookup
+
+# Label used for requests that didn't match any route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+_route_paths: Dict[Any, str] = {}
+
+
+def route_template(app, scope: Dict[str, Any]) -> str:
+    """
+    Route template (e.g. /api/v1/leads/{lead_id}) for a request that has been
+    routed, derived from the endpoint the router stored in the scope
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+
+    path = _route_paths.get(endpoint)
+    record_cache_lookup("route_template", path is not None)
+    if path is None:
+        for route in app.routes:
+            if isinstance(route, BaseRoute) and getattr(route, "endpoint", None) is endpoint:
+                path = route.path
+                break
+        else:
+            path = UNMATCHED_ROUTE
+        _route_paths[endpoint] = path
+
+    return path
@@ -0,0 +1,114 @@
+"""Hierarchical timing wheel for keyed, reschedulable timers"""
+import math
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+
+class TimingWheel:
+    """
+    Timers bucketed by due time; add/remove are O(1) and advancing costs
+    O(ticks elapsed + timers fired).
+
+    Level 0 has `slots[0]` buckets of `resolution` seconds; each higher level's
+    bucket spans a whole lower level. Timers are placed on the finest level that
+    covers them and cascade down as their bucket comes round. With the defaults
+    (0.25s x 240, then 60s x 60) timers up to an hour ahead are tracked and
+    fire within `resolution` of their due time.
+
+    Each key has at most one live timer: adding it again reschedules it, and
+    superseded entries are skipped lazily when their bucket is reached.
+    """
+
+    def __init__(self, now: float, resolution: float = 0.25, slots: Sequence[int] = (240, 60)):
+        self.resolution = resolution
+        self.current_tick = int(now / resolution)
+        # (ticks per bucket, buckets) per level
+        self.levels: List[Tuple[int, List[List[Tuple[int, Hashable]]]]] = []
+        span = 1
+        for count in slots:
+            self.levels.append((span, [[] for _ in range(count)]))
+            span *= count
+        self.horizon_ticks = span
+        self._due: Dict[Hashable, int] = {}
+        self._ready: List[Tuple[int, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._due
+
+    @property
+    def horizon(self) -> float:
+        """Seconds ahead of the current time that timers can be added"""
+        return self.horizon_ticks * self.resolution
+
+    def add(self, key: Hashable, due: float) -> bool:
+        """Schedule (or reschedule) `key` at epoch time `due`; False if past the horizon"""
+        # Round up so a timer never fires before its due time
+        tick = math.ceil(due / self.resolution)
+        if tick - self.current_tick >= self.horizon_ticks:
+            return False
+        self._due[key] = tick
+        self._place(tick, key)
+        return True
+
+    def remove(self, key: Hashable) -> None:
+        self._due.pop(key, None)
+
+    def advance(self, now: float) -> List[Tuple[Hashable, float]]:
+        """Move to `now`, returning (key, due time) for every timer that came due"""
+        target = int(now / self.resolution)
+        fired = []
+        if target - self.current_tick >= self.horizon_ticks:
+            # Slept past the whole wheel - cheaper to re-bucket than to walk every tick
+            pending = list(self._due.items())
+            for _, buckets in self.levels:
+                for bucket in buckets:
+                    bucket.clear()
+            self.current_tick = target
+            for key, tick in pending:
+                self._place(tick, key)
+            return self._drain_ready(fired)
+
+        while self.current_tick < target:
+            self.current_tick += 1
+            tick = self.current_tick
+            # Cascade coarse buckets starting at this tick, top level first
+            for span, buckets in reversed(self.levels[1:]):
+                if tick % span == 0:
+                    bucket = buckets[(tick // span) % len(buckets)]
+                    entries, bucket[:] = bucket[:], []
+                    for due_tick, key in entries:
+                        if self._due.get(key) == due_tick:
+                            self._place(due_tick, key)
+            bucket = self.levels[0][1][tick % len(self.levels[0][1])]
+            entries, bucket[:] = bucket[:], []
+            for due_tick, key in entries:
+                if due_tick <= tick:
+                    self._fire(due_tick, key, fired)
+                else:
+                    bucket.append((due_tick, key))
+        return self._drain_ready(fired)
+
+    def _drain_ready(self, fired: List[Tuple[Hashable, float]]) -> List[Tuple[Hashable, float]]:
+        # Timers added at/behind the current tick, or cascaded exactly onto it
+        ready, self._ready = self._ready, []
+        for tick, key in ready:
+            self._fire(tick, key, fired)
+        return fired
+
+    def _place(self, tick: int, key: Hashable) -> None:
+        delta = tick - self.current_tick
+        if delta <= 0:
+            self._ready.append((tick, key))
+            return
+        for span, buckets in self.levels:
+            if delta < span * len(buckets):
+                buckets[(tick // span) % len(buckets)].append((tick, key))
+                return
+
+    def _fire(self, tick: int, key: Hashable, fired: List[Tuple[Hashable, float]]) -> None:
+        # Skip entries superseded by a reschedule/removal (or already fired)
+        if self._due.get(key) == tick:
+            del self._due[key]
+            fired.append((key, tick * self.resolution))
@@ -0,0 +1,173 @@
+"""
+Dispatcher worker: runs the call scheduler in a loop, separately from the API.
+
+    python -m app.worker
+    python -m app.worker --tick 2 --health-port 8081
+
+Each tick runs one scheduling cycle in its own database session. Between
+ticks, leads coming due are fired from a timing wheel (DISPATCH_WHEEL_*), so
+they are dispatched within about a second of schedule_at. A small HTTP server
+reports /health (503 once cycles stop succeeding) and /metrics. SIGTERM/SIGINT
+let the current cycle finish, then exit.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry as metrics_registry, scheduler_last_cycle, scrape_denied
+from app.db.session import engine
+from app.services.call_scheduler import call_scheduler
+from app.services.dispatch_wheel import DispatchWheel
+
+logger = logging.getLogger(__name__)
+
+
+class DispatcherWorker:
+    def __init__(self, tick_seconds: float, wheel: Optional[DispatchWheel] = None):
+        self.tick_seconds = tick_seconds
+        self.wheel = wheel
+        # Unhealthy when no cycle has succeeded for this long
+        self.stale_after = max(60.0, tick_seconds * 5)
+        self.stopping = threading.Event()
+        self.started_at = time.time()
+        self.last_success_at: Optional[float] = None
+        self.last_stats: Dict = {}
+        self.consecutive_errors = 0
+        self.cycles = 0
+        self.wheel_dispatched = 0
+
+    def run(self) -> None:
+        logger.info(f"Dispatcher started (tick={self.tick_seconds}s, wheel={'on' if self.wheel else 'off'})")
+        while not self.stopping.is_set():
+            next_cycle = time.monotonic() + self.tick_seconds
+            self.run_cycle()
+            # Until the next tick, fire leads from the wheel as they come due
+            # (or just sleep), waking immediately on shutdown
+            while not self.stopping.is_set() and time.monotonic() < next_cycle:
+                remaining = next_cycle - time.monotonic()
+                if self.wheel:
+                    self.run_due(min(self.wheel.wheel.resolution, remaining))
+                else:
+                    self.stopping.wait(remaining)
+        if self.wheel:
+            self.wheel.close()
+        logger.info(f"Dispatcher stopped after {self.cycles} cycles")
+
+    def run_due(self, timeout: float) -> None:
+        try:
+            due = self.wheel.poll(max(0.0, timeout))
+            if not due:
+                return
+            stats = call_scheduler.run_schedule_cycle(lead_ids=[uuid.UUID(lead_id) for lead_id, _ in due])
+        except Exception as e:
+            stats = {"error": str(e)}
+        if "error" in stats:
+            logger.error(f"Dispatching due leads failed: {stats['error']}")
+        else:
+            self.wheel_dispatched += stats["calls_initiated"]
+            logger.info(f"Dispatched due leads: {stats}")
+
+    def run_cycle(self) -> None:
+        try:
+            stats = call_scheduler.run_schedule_cycle()
+        except Exception as e:
+            stats = {"error": str(e)}
+
+        self.cycles += 1
+        self.last_stats = stats
+        if "error" in stats:
+            self.consecutive_errors += 1
+            scheduler_last_cycle.set(time.time(), "error")
+            logger.error(f"Scheduling cycle failed ({self.consecutive_errors} in a row): {stats['error']}")
+        else:
+            self.consecutive_errors = 0
+            self.last_success_at = time.time()
+            scheduler_last_cycle.set(self.last_success_at, "ok")
+            if stats["eligible_leads"]:
+                logger.info(f"Scheduling cycle: {stats}")
+
+    def stop(self, signum=None, frame=None) -> None:
+        if not self.stopping.is_set():
+            logger.info("Shutdown requested - finishing current cycle")
+        self.stopping.set()
+
+    def health(self) -> Dict:
+        reference = self.last_success_at or self.started_at
+        return {
+            "status": "healthy" if time.time() - reference < self.stale_after else "unhealthy",
+            "cycles": self.cycles,
+            "last_success_at": self.last_success_at,
+            "consecutive_errors": self.consecutive_errors,
+            "last_stats": self.last_stats,
+            "wheel_leads": len(self.wheel.wheel) if self.wheel else None,
+            "wheel_dispatched": self.wheel_dispatched
+        }
+
+
+def start_health_server(worker, port: int) -> ThreadingHTTPServer:
+    """Serve /health from worker.health() and /metrics on a background thread"""
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/health":
+                health = worker.health()
+                self._respond(200 if health["status"] == "healthy" else 503,
+                              json.dumps(health, default=str), "application/json")
+            elif self.path == "/metrics":
+                denied = scrape_denied(self.headers.get("Authorization"), settings.METRICS_AUTH_TOKEN,
+                                       settings.ENVIRONMENT == "development")
+                if denied:
+                    self._respond(denied, "Not found" if denied == 404 else "Unauthorized", "text/plain")
+                else:
+                    self._respond(200, metrics_registry.render(), "text/plain; version=0.0.4")
+            else:
+                self._respond(404, "Not found", "text/plain")
+
+        def _respond(self, status_code: int, body: str, content_type: str):
+            payload = body.encode()
+            self.send_response(status_code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass  # Probes every few seconds would drown the logs
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), HealthHandler)
+    threading.Thread(target=server.serve_forever, name="health-server", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tick", type=float, default=settings.SCHEDULER_TICK_SECONDS,
+                        help="Seconds between scheduling cycles")
+    # Cloud Run expects the container to listen on $PORT
+    parser.add_argument("--health-port", type=int, default=int(os.getenv("PORT", settings.WORKER_HEALTH_PORT)))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    worker = DispatcherWorker(args.tick, DispatchWheel() if settings.DISPATCH_WHEEL_ENABLED else None)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    health_server = start_health_server(worker, args.health_port)
+    logger.info(f"Health endpoint on :{args.health_port}/health")
+    try:
+        worker.run()
+    finally:
+        health_server.shutdown()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
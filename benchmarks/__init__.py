@@ -0,0 +1 @@
+"""Performance benchmarks. Run individual modules with `python -m benchmarks.<name>`."""
@@ -0,0 +1,20 @@
+"""
+Points the application at the benchmark database.
+
+Must run before any `app` module is imported: the engine and settings are
+created at import time.
+"""
+import os
+import sys
+
+
+def configure() -> None:
+    database_url = os.environ.get("BENCH_DATABASE_URL")
+    if not database_url:
+        sys.exit("Set BENCH_DATABASE_URL to a local Postgres database dedicated to benchmarks")
+
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.pop("DATABASE_READ_URL", None)
+    # Never dial real numbers from a benchmark: force Retell mock mode
+    os.environ["RETELL_API_KEY"] = ""
+    os.environ.setdefault("ENVIRONMENT", "benchmark")
@@ -0,0 +1,199 @@
+"""
+Benchmark cases.
+
+Each case receives the shared BenchContext, performs any untimed setup and
+returns the timed callable, which returns the number of operations it
+performed (per-operation time is what gets reported). Every iteration runs
+inside a savepoint that is rolled back afterwards, so cases never change
+the generated dataset.
+"""
+import asyncio
+import io
+import random
+import uuid
+from typing import Callable, Dict
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from app.db.deps import get_current_user, get_db, get_read_db
+from app.db.session import engine
+from app.models.agent import Agent
+from app.models.company import Company
+from app.models.interaction_attempt import InteractionAttempt
+from app.models.lead import Lead
+from app.models.user import User
+from app.middleware.metrics import MetricsMiddleware
+from app.services.call_scheduler import CallScheduler
+from benchmarks import metrics_overhead
+from main import app
+
+API = "/api/v1"
+
+
+class BenchContext:
+    """One connection whose outer transaction is always rolled back"""
+
+    def __init__(self):
+        self.connection = engine.connect()
+        self.transaction = self.connection.begin()
+        self.session_factory = sessionmaker(
+            bind=self.connection,
+            autoflush=False,
+            join_transaction_mode="create_savepoint"
+        )
+        self.rng = random.Random(7)
+
+        session = self.session_factory()
+        try:
+            # Benchmark as the admin of the largest tenant
+            largest = session.query(Agent.company_id, func.count(Lead.id).label("lead_count")).join(
+                Lead, Lead.agent_id == Agent.id
+            ).group_by(Agent.company_id).order_by(func.count(Lead.id).desc()).first()
+            if not largest:
+                raise SystemExit("Benchmark database is empty - run `python -m benchmarks.datagen` first")
+
+            self.company = session.query(Company).filter(Company.id == largest.company_id).one()
+            self.user = session.query(User).filter(User.id == self.company.admin_user_id).one()
+            self.agent = session.query(Agent).filter(
+                Agent.company_id == self.company.id,
+                Agent.is_deleted == False
+            ).first()
+            session.expunge_all()
+        finally:
+            session.close()
+
+        app.dependency_overrides[get_db] = self._session
+        app.dependency_overrides[get_read_db] = self._session
+        app.dependency_overrides[get_current_user] = lambda: self.user
+        self.client = TestClient(app)
+
+    def _session(self):
+        db = self.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def get(self, path: str, **params):
+        response = self.client.get(f"{API}{path}", params=params)
+        response.raise_for_status()
+        return response
+
+    def close(self) -> None:
+        app.dependency_overrides.clear()
+        self.transaction.rollback()
+        self.connection.close()
+
+
+def schedule_cycle(ctx: BenchContext) -> Callable[[], int]:
+    def run() -> int:
+        db = ctx.session_factory()
+        try:
+            stats = CallScheduler().run_schedule_cycle(db)
+        finally:
+            db.close()
+        return 1 if "error" not in stats else 0
+    return run
+
+
+def _get(path: str, **params) -> Callable[[BenchContext], Callable[[], int]]:
+    """Case issuing a single GET request"""
+    def case(ctx: BenchContext) -> Callable[[], int]:
+        def run() -> int:
+            ctx.get(path, **params)
+            return 1
+        return run
+    return case
+
+
+def csv_import(ctx: BenchContext, rows: int = 1000) -> Callable[[], int]:
+    lines = ["first_name,phone,city,source"]
+    for index in range(rows):
+        lines.append(f"Bench{index},+1{ctx.rng.choice(('212', '415', '512'))}"
+                     f"{ctx.rng.randint(200, 999)}{ctx.rng.randint(0, 9999):04d},Austin,csv")
+    content = "\n".join(lines).encode()
+
+    def run() -> int:
+        response = ctx.client.post(
+            f"{API}/leads/csv-import",
+            params={"agent_id": str(ctx.agent.id)},
+            files={"file": ("leads.csv", io.BytesIO(content), "text/csv")}
+        )
+        response.raise_for_status()
+        return rows
+    return run
+
+
+def lead_batch(ctx: BenchContext, items: int = 1000) -> Callable[[], int]:
+    leads = [
+        {
+            "first_name": f"Batch{index}",
+            "phone_e164": f"+1{ctx.rng.choice(('212', '415', '512'))}"
+                          f"{ctx.rng.randint(200, 999)}{ctx.rng.randint(0, 9999):04d}",
+            "custom_fields": {"city": "Austin", "source": "batch"}
+        }
+        for index in range(items)
+    ]
+
+    def run() -> int:
+        response = ctx.client.post(f"{API}/leads/batch", params={"agent_id": str(ctx.agent.id)}, json=leads)
+        response.raise_for_status()
+        return items
+    return run
+
+
+def webhook_throughput(ctx: BenchContext, calls: int = 500) -> Callable[[], int]:
+    # Untimed setup: in-flight attempts the webhooks will complete
+    session = ctx.session_factory()
+    leads = session.query(Lead).filter(Lead.agent_id == ctx.agent.id).limit(calls).all()
+    call_ids = []
+    for lead in leads:
+        call_id = f"bench_webhook_{uuid.uuid4().hex}"
+        session.add(InteractionAttempt(
+            lead_id=lead.id,
+            agent_id=lead.agent_id,
+            attempt_number=lead.attempts_count + 1,
+            status="in_progress",
+            retell_call_id=call_id
+        ))
+        call_ids.append(call_id)
+    session.commit()
+    session.close()
+
+    def run() -> int:
+        for call_id in call_ids:
+            response = ctx.client.post(f"{API}/calls/webhook", json={
+                "event": "call_ended",
+                "call_id": call_id,
+                "outcome": ctx.rng.choice(("answered", "no_answer", "failed")),
+                "duration_seconds": ctx.rng.randint(0, 300),
+                "summary": "Benchmark call"
+            })
+            response.raise_for_status()
+        return len(call_ids)
+    return run
+
+
+def metrics_middleware(ctx: BenchContext, requests: int = 20_000) -> Callable[[], int]:
+    app_with_metrics = MetricsMiddleware(metrics_overhead.noop_app)
+
+    def run() -> int:
+        asyncio.run(metrics_overhead.drive(app_with_metrics, requests))
+        return requests
+    return run
+
+
+CASES: Dict[str, Callable[[BenchContext], Callable[[], int]]] = {
+    "schedule_cycle": schedule_cycle,
+    "call_history": _get("/calls/history", page=1, per_page=25),
+    "call_history_deep_page": _get("/calls/history", page=200, per_page=25),
+    "call_history_search": _get("/calls/history", search="Mar", outcome="answered"),
+    "call_metrics": _get("/calls/metrics"),
+    "list_leads_search": _get("/leads/", search="415", per_page=50),
+    "csv_import": csv_import,
+    "lead_batch": lead_batch,
+    "webhook_throughput": webhook_throughput,
+    "metrics_middleware": metrics_middleware,
+}
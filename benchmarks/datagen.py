@@ -0,0 +1,362 @@
+"""
+Synthetic multi-tenant dataset generator for benchmarks.
+
+Creates companies (with admin users), agents, leads and interaction attempts
+(with their payload rows) in a local Postgres database using COPY. Distributions are skewed the way
+production data is: a few large tenants own most leads (Pareto), attempts
+per lead are geometric, outcomes are dominated by no-answers and activity
+follows a daytime curve over the last --days days.
+
+    BENCH_DATABASE_URL=postgresql://localhost/voiceai_bench \\
+        python -m benchmarks.datagen --companies 50 --leads 1000000 --attempts 10000000
+
+The same --seed always produces the same dataset.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from benchmarks import bench_env
+
+bench_env.configure()
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.db.session import engine  # noqa: E402
+from app.services.attempt_partitions import attempt_partition_manager  # noqa: E402
+from app.services.phone_service import phone_service  # noqa: E402
+from app.utils.ids import uuid7  # noqa: E402
+from benchmarks.schema import create_schema, truncate_all  # noqa: E402
+
+COPY_BATCH_ROWS = 50_000
+
+AREA_CODES = (
+    "212", "213", "305", "312", "415", "404", "469", "512", "602", "617",
+    "646", "702", "713", "718", "720", "786", "818", "832", "917", "972"
+)
+CITIES = ("New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Miami", "Austin", "Seattle", "Denver", "Boston")
+SOURCES = ("facebook", "google_ads", "website", "referral", "webinar", "trade_show")
+FIRST_NAMES = ("James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "Priya", "Rahul", "Wei", "Sofia", "Carlos", "Aisha", "Omar", "Yuki", "Lucas", "Emma")
+TIMEZONES = ("UTC", "America/New_York", "America/Chicago", "America/Los_Angeles", "Asia/Kolkata")
+
+# Outcome mix for completed attempts
+OUTCOME_WEIGHTS = (("answered", 0.22), ("no_answer", 0.6), ("failed", 0.18))
+# Final lead status mix
+LEAD_STATUS_WEIGHTS = (("new", 0.35), ("in_progress", 0.25), ("done", 0.40))
+
+
+def new_id(at: Optional[datetime] = None) -> uuid.UUID:
+    """Time-ordered id; pass the row's created_at so the two agree (GET /calls/{id} relies on it)"""
+    return uuid7(at)
+
+
+def _weighted(rng: random.Random, weights: Sequence) -> str:
+    values, probabilities = zip(*weights)
+    return rng.choices(values, probabilities)[0]
+
+
+def _phone(rng: random.Random) -> str:
+    return f"+1{rng.choice(AREA_CODES)}{rng.randint(200, 999)}{rng.randint(0, 9999):04d}"
+
+
+def _activity_time(rng: random.Random, now: datetime, days: int) -> datetime:
+    """A timestamp in the last `days` days, weighted towards business hours"""
+    day = now - timedelta(days=rng.randint(0, days - 1))
+    hour = min(23, max(0, int(rng.gauss(14, 3))))
+    moment = day.replace(hour=hour, minute=rng.randint(0, 59), second=rng.randint(0, 59), microsecond=0)
+    return min(moment, now)
+
+
+def _copy(table: str, columns: Sequence[str], rows: Iterator[List]) -> int:
+    """Stream rows into a table with COPY in batches"""
+    total = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        batch = 0
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+
+        for row in rows:
+            writer.writerow(["\\N" if value is None else value for value in row])
+            batch += 1
+            if batch >= COPY_BATCH_ROWS:
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                total += batch
+                batch = 0
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+
+        if batch:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            total += batch
+
+        connection.commit()
+        return total
+    finally:
+        connection.close()
+
+
+class DatasetGenerator:
+    def __init__(self, companies: int, agents_per_company: int, leads: int, attempts: int,
+                 days: int, payload_bytes: int, seed: int):
+        self.companies = companies
+        self.agents_per_company = agents_per_company
+        self.leads = leads
+        self.attempts = attempts
+        self.days = days
+        self.payload_bytes = payload_bytes
+        self.rng = random.Random(seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+        self.company_rows: List[Dict] = []
+        self.agent_rows: List[Dict] = []
+        # lead id -> (agent id, created_at, attempts to generate)
+        self.lead_plan: List[tuple] = []
+
+    def generate(self) -> Dict[str, int]:
+        counts = {}
+        counts["users"], counts["companies"] = self._generate_companies()
+        counts["agents"] = self._generate_agents()
+        counts["leads"] = self._generate_leads()
+        counts["interaction_attempts"], counts["interaction_attempt_payloads"] = self._generate_attempts()
+        return counts
+
+    def _generate_companies(self):
+        user_rows = []
+        for index in range(self.companies):
+            user_id = new_id()
+            created_at = self.now - timedelta(days=self.days + self.rng.randint(0, 90))
+            user_rows.append([
+                user_id, created_at, created_at, False,
+                f"bench-admin-{index}@example.com", f"Bench Admin {index}", _phone(self.rng), f"bench-google-{index}"
+            ])
+            self.company_rows.append({
+                "id": new_id(),
+                "admin_user_id": user_id,
+                "created_at": created_at,
+                # Pareto-distributed tenant size: a few companies own most leads
+                "weight": self.rng.paretovariate(1.16),
+                "max_concurrent_calls": self.rng.choice((5, 5, 10, 20, 50))
+            })
+
+        users = _copy(
+            "users",
+            ("id", "created_at", "updated_at", "is_deleted", "email", "name", "phone", "google_id"),
+            iter(user_rows)
+        )
+        companies = _copy(
+            "companies",
+            ("id", "created_at", "updated_at", "is_deleted", "name", "admin_user_id", "max_agents_limit",
+             "max_concurrent_calls", "total_minutes_used", "settings", "created_by"),
+            (
+                [row["id"], row["created_at"], row["created_at"], False, f"Bench Company {index}",
+                 row["admin_user_id"], 100, row["max_concurrent_calls"], 0, "{}", row["admin_user_id"]]
+                for index, row in enumerate(self.company_rows)
+            )
+        )
+        return users, companies
+
+    def _generate_agents(self) -> int:
+        rows = []
+        for company in self.company_rows:
+            agent_count = self.rng.randint(1, self.agents_per_company)
+            for index in range(agent_count):
+                agent = {
+                    "id": new_id(),
+                    "company": company,
+                    "max_attempts": self.rng.choice((3, 3, 4, 5)),
+                    "retry_delay_minutes": self.rng.choice((30, 60, 90)),
+                    "weight": self.rng.random() + 0.2
+                }
+                self.agent_rows.append(agent)
+                has_hours = self.rng.random() < 0.5
+                rows.append([
+                    agent["id"], company["created_at"], company["created_at"], False,
+                    company["id"], f"Bench Agent {index}", "active" if self.rng.random() < 0.9 else "inactive",
+                    "You are a helpful sales assistant.", "{}", "Hello!", None, '["end_call"]',
+                    None, _phone(self.rng), agent["max_attempts"], agent["retry_delay_minutes"],
+                    "09:00:00" if has_hours else None, "18:00:00" if has_hours else None,
+                    self.rng.choice(TIMEZONES), 20, "bench_master_agent", None,
+                    company["admin_user_id"], company["admin_user_id"]
+                ])
+
+        return _copy(
+            "agents",
+            ("id", "created_at", "updated_at", "is_deleted", "company_id", "name", "status", "prompt",
+             "variables", "welcome_message", "voice_id", "functions", "inbound_phone", "outbound_phone",
+             "max_attempts", "retry_delay_minutes", "business_hours_start", "business_hours_end",
+             "timezone", "max_call_duration_minutes", "retell_agent_id", "retell_llm_id",
+             "created_by", "updated_by"),
+            iter(rows)
+        )
+
+    def _generate_leads(self) -> int:
+        agent_weights = [agent["company"]["weight"] * agent["weight"] for agent in self.agent_rows]
+        mean_attempts = self.attempts / max(self.leads, 1)
+        seen_phones = set()
+
+        def rows():
+            for _ in range(self.leads):
+                agent = self.rng.choices(self.agent_rows, agent_weights)[0]
+                phone = _phone(self.rng)
+                while (agent["id"], phone) in seen_phones:
+                    phone = _phone(self.rng)
+                seen_phones.add((agent["id"], phone))
+
+                status = _weighted(self.rng, LEAD_STATUS_WEIGHTS)
+                created_at = _activity_time(self.rng, self.now, self.days)
+                if status == "new":
+                    planned = 0
+                    schedule_at = self.now + timedelta(minutes=self.rng.randint(-2880, 2880))
+                else:
+                    # Geometric number of attempts around the requested mean
+                    planned = 1
+                    while planned < agent["max_attempts"] and self.rng.random() > 1 / max(mean_attempts, 1):
+                        planned += 1
+                    schedule_at = created_at
+
+                disposition = None
+                if status == "done":
+                    disposition = self.rng.choice(("completed", "no_answer", "not_interested", "hung_up"))
+
+                lead_id = new_id()
+                self.lead_plan.append((lead_id, agent["id"], created_at, planned))
+                custom_fields = {
+                    "city": self.rng.choice(CITIES),
+                    "source": self.rng.choice(SOURCES),
+                    "budget": self.rng.choice((5000, 10000, 25000, 50000, 100000))
+                }
+                yield [
+                    lead_id, created_at, created_at, self.rng.random() < 0.02,
+                    agent["id"], self.rng.choice(FIRST_NAMES), phone, phone_service.phone_key(phone), status,
+                    json.dumps(custom_fields), schedule_at, planned, disposition,
+                    agent["company"]["admin_user_id"], agent["company"]["admin_user_id"]
+                ]
+
+        return _copy(
+            "leads",
+            ("id", "created_at", "updated_at", "is_deleted", "agent_id", "first_name", "phone_e164", "phone_key",
+             "status", "custom_fields", "schedule_at", "attempts_count", "disposition", "created_by", "updated_by"),
+            rows()
+        )
+
+    def _generate_attempts(self) -> tuple:
+        filler = "x" * max(self.payload_bytes - 200, 0)
+        remaining = self.attempts
+        # (id, created_at, call_id, outcome, duration) of finished attempts; payload JSON is built on the second COPY
+        finished: List[tuple] = []
+
+        # Monthly partitions back to the oldest lead; the migration only creates them from its own run
+        earliest = min((created_at for _, _, created_at, _ in self.lead_plan), default=self.now)
+        with Session(bind=engine) as db:
+            attempt_partition_manager.ensure_partitions(db, since=earliest, now=self.now)
+            db.commit()
+
+        def rows():
+            nonlocal remaining
+            for lead_id, agent_id, created_at, planned in self.lead_plan:
+                if remaining <= 0:
+                    return
+                attempt_time = created_at
+                for attempt_number in range(1, planned + 1):
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                    attempt_time = min(self.now, attempt_time + timedelta(minutes=self.rng.randint(30, 1440)))
+                    # Recent attempts may still be in flight
+                    if self.now - attempt_time < timedelta(minutes=10) and self.rng.random() < 0.5:
+                        status, outcome, duration = "in_progress", None, None
+                    else:
+                        outcome = _weighted(self.rng, OUTCOME_WEIGHTS)
+                        status = "failed" if outcome == "failed" else "completed"
+                        duration = int(self.rng.lognormvariate(4.5, 0.8)) if outcome == "answered" else 0
+                    call_id = f"bench_{uuid.UUID(int=self.rng.getrandbits(128)).hex}"
+                    attempt_id = new_id(attempt_time)
+                    if status != "in_progress":
+                        finished.append((attempt_id, attempt_time, call_id, outcome, duration))
+                    yield [
+                        attempt_id, attempt_time, attempt_time, False,
+                        lead_id, agent_id, attempt_number, status, outcome,
+                        duration, None, call_id
+                    ]
+
+        def payload_rows():
+            for attempt_id, attempt_time, call_id, outcome, duration in finished:
+                payload = json.dumps({
+                    "event": "call_ended",
+                    "call_id": call_id,
+                    "outcome": outcome,
+                    "duration_seconds": duration,
+                    "transcript": filler
+                })
+                yield [
+                    attempt_id, attempt_time, attempt_time, False,
+                    "Lead was interested and asked for a follow-up." if outcome == "answered" else None,
+                    payload
+                ]
+
+        attempts = _copy(
+            "interaction_attempts",
+            ("id", "created_at", "updated_at", "is_deleted", "lead_id", "agent_id", "attempt_number",
+             "status", "outcome", "duration_seconds", "transcript_url", "retell_call_id"),
+            rows()
+        )
+        payloads = _copy(
+            "interaction_attempt_payloads",
+            ("id", "created_at", "updated_at", "is_deleted", "summary", "raw_webhook_data"),
+            payload_rows()
+        )
+        return attempts, payloads
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--agents-per-company", type=int, default=5)
+    parser.add_argument("--leads", type=int, default=100_000)
+    parser.add_argument("--attempts", type=int, default=300_000, help="Upper bound on interaction attempts")
+    parser.add_argument("--days", type=int, default=180, help="History window for created_at")
+    parser.add_argument("--payload-bytes", type=int, default=512, help="Approximate raw webhook payload size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Append instead of truncating existing data")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    create_schema()
+    if not args.keep:
+        truncate_all()
+
+    generator = DatasetGenerator(
+        companies=args.companies,
+        agents_per_company=args.agents_per_company,
+        leads=args.leads,
+        attempts=args.attempts,
+        days=args.days,
+        payload_bytes=args.payload_bytes,
+        seed=args.seed
+    )
+    counts = generator.generate()
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+
+    for table, count in counts.items():
+        print(f"{table:>22}: {count:,}")
+    print(f"Generated in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""
+Local stand-in for the Retell, Twilio and Plivo APIs, for offline load tests.
+
+Emulates the endpoints the services use (Retell create-phone-call,
+get-call, list-calls and agent listing; Twilio/Plivo number search,
+purchase, listing and release) with configurable latency and 429/5xx
+injection. Created calls "ring" and end after a simulated duration, and a
+call_ended webhook is posted back to the API so the whole dispatch loop can
+be exercised end to end.
+
+    python -m benchmarks.fake_providers --port 9090 \\
+        --latency lognormal:120:0.5 --rate-limit-ratio 0.02 --server-error-ratio 0.01 \\
+        --webhook-url http://localhost:8080/api/v1/calls/webhook --time-scale 0.05
+
+Point the API at it with:
+
+    RETELL_API_KEY=fake RETELL_BASE_URL=http://localhost:9090
+    TWILIO_API_BASE_URL=http://localhost:9090 PLIVO_API_BASE_URL=http://localhost:9090
+
+GET /_fake/stats returns counters; POST /_fake/reset clears state.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+MASTER_AGENT_ID = "fake_master_agent"
+MASTER_AGENT_NAME = "Universal AI Assistant"
+
+# Call outcome mix and the Retell disconnection reason reported for each
+OUTCOMES = (
+    ("answered", 0.25, "agent_hangup"),
+    ("no_answer", 0.55, "dial_no_answer"),
+    ("failed", 0.20, "dial_failed"),
+)
+
+
+class LatencyModel:
+    """Parses "fixed:MS", "uniform:MIN_MS:MAX_MS" or "lognormal:MEDIAN_MS:SIGMA" """
+
+    def __init__(self, spec: str):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(param) for param in params]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        """Latency in seconds"""
+        if self.kind == "fixed":
+            milliseconds = self.params[0]
+        elif self.kind == "uniform":
+            milliseconds = rng.uniform(self.params[0], self.params[1])
+        else:
+            milliseconds = self.params[0] * rng.lognormvariate(0, self.params[1])
+        return milliseconds / 1000
+
+
+class FakeProviders:
+    def __init__(self, latency: LatencyModel, rate_limit_ratio: float, server_error_ratio: float,
+                 webhook_url: Optional[str], time_scale: float, seed: Optional[int]):
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.server_error_ratio = server_error_ratio
+        self.webhook_url = webhook_url
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls: Dict[str, dict] = {}
+        self.owned_numbers: Dict[str, dict] = {}
+        self.stats: Counter = Counter()
+        self.in_flight = 0
+
+    async def simulate_request(self, api: str) -> Optional[Response]:
+        """Apply latency and maybe return an injected error response"""
+        self.stats[f"{api}_requests"] += 1
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency.sample(self.rng))
+        finally:
+            self.in_flight -= 1
+
+        roll = self.rng.random()
+        if roll < self.rate_limit_ratio:
+            self.stats[f"{api}_429"] += 1
+            return JSONResponse({"error_message": "Too many requests"}, status_code=429,
+                                headers={"Retry-After": "1"})
+        if roll < self.rate_limit_ratio + self.server_error_ratio:
+            self.stats[f"{api}_5xx"] += 1
+            return JSONResponse({"error_message": "Internal server error"},
+                                status_code=self.rng.choice((500, 502, 503)))
+        return None
+
+    def new_call(self, payload: dict) -> dict:
+        now_ms = int(time.time() * 1000)
+        call = {
+            "call_id": f"fake_call_{uuid.uuid4().hex[:20]}",
+            "agent_id": payload.get("override_agent_id") or MASTER_AGENT_ID,
+            "agent_version": 0,
+            "call_type": "phone_call",
+            "call_status": "registered",
+            "direction": "outbound",
+            "from_number": payload.get("from_number"),
+            "to_number": payload.get("to_number"),
+            "metadata": payload.get("metadata"),
+            "retell_llm_dynamic_variables": payload.get("retell_llm_dynamic_variables"),
+            "start_timestamp": now_ms
+        }
+        self.calls[call["call_id"]] = call
+        self.stats["calls_created"] += 1
+        return call
+
+    async def run_call(self, call: dict) -> None:
+        """Ring, talk, hang up, then deliver the call_ended webhook"""
+        outcome, _, reason = self.rng.choices(OUTCOMES, [weight for _, weight, _ in OUTCOMES])[0]
+        ring_seconds = self.rng.uniform(5, 30)
+        talk_seconds = self.rng.lognormvariate(4.5, 0.7) if outcome == "answered" else 0
+
+        call["call_status"] = "ongoing"
+        await asyncio.sleep((ring_seconds + talk_seconds) * self.time_scale)
+
+        end_ms = int(time.time() * 1000)
+        call.update({
+            "call_status": "ended" if outcome != "failed" else "error",
+            "end_timestamp": end_ms,
+            "duration_ms": int(talk_seconds * 1000),
+            "disconnection_reason": reason,
+            "recording_url": f"https://fake-recordings.local/{call['call_id']}.wav" if talk_seconds else None,
+            "transcript": "Agent: Hello!\nUser: Hi, tell me more." if talk_seconds else None,
+            "call_analysis": {
+                "call_summary": "The lead asked for a follow-up next week." if talk_seconds else None,
+                "in_voicemail": False,
+                "call_successful": outcome == "answered"
+            }
+        })
+        self.stats[f"calls_{outcome}"] += 1
+        await self.send_webhook(call, outcome)
+
+    async def send_webhook(self, call: dict, outcome: str) -> None:
+        if not self.webhook_url:
+            return
+
+        # Retell's envelope ({"event", "call"}) plus the flat fields /calls/webhook reads
+        payload = {
+            "event": "call_ended",
+            "call": call,
+            "call_id": call["call_id"],
+            "outcome": outcome,
+            "duration_seconds": call["duration_ms"] // 1000,
+            "recording_url": call["recording_url"],
+            "summary": call["call_analysis"]["call_summary"],
+            "end_timestamp": call["end_timestamp"]
+        }
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.post(self.webhook_url, json=payload)
+            self.stats["webhooks_sent" if response.status_code < 400 else "webhooks_rejected"] += 1
+        except httpx.HTTPError:
+            self.stats["webhooks_failed"] += 1
+
+
+def create_app(providers: FakeProviders) -> FastAPI:
+    app = FastAPI(title="Fake telephony providers")
+
+    # Retell
+    @app.post("/v2/create-phone-call", status_code=201)
+    async def create_phone_call(request: Request):
+        error = await providers.simulate_request("retell")
+        if error:
+            return error
+        call = providers.new_call(await request.json())
+        asyncio.create_task(providers.run_call(call))
+        return call
+
+    @app.get("/v2/get-call/{call_id}")
+    async def get_call(call_id: str):
+        error = await providers.simulate_request("retell")
+        if error:
+            return error
+        call = providers.calls.get(call_id)
+        if not call:
+            return JSONResponse({"error_message": "Call not found"}, status_code=404)
+        return call
+
+    @app.post("/v2/list-calls")
+    async def list_calls(request: Request):
+        error = await providers.simulate_request("retell")
+        if error:
+            return error
+        body = await request.json() if await request.body() else {}
+        limit = int(body.get("limit", 1000))
+        return list(providers.calls.values())[-limit:]
+
+    @app.get("/list-agents")
+    async def list_agents():
+        error = await providers.simulate_request("retell")
+        if error:
+            return error
+        return [_fake_agent()]
+
+    @app.get("/get-agent/{agent_id}")
+    async def get_agent(agent_id: str):
+        return _fake_agent(agent_id)
+
+    @app.post("/create-agent", status_code=201)
+    async def create_agent():
+        return _fake_agent()
+
+    # Twilio
+    @app.get("/2010-04-01/Accounts/{account_sid}/AvailablePhoneNumbers/{country}/Local.json")
+    async def twilio_available(account_sid: str, country: str, AreaCode: Optional[str] = None, PageSize: int = 20):
+        error = await providers.simulate_request("twilio")
+        if error:
+            return error
+        area_code = AreaCode or "415"
+        numbers = [_twilio_number(f"+1{area_code}555{providers.rng.randint(0, 9999):04d}", country)
+                   for _ in range(PageSize)]
+        return {"available_phone_numbers": numbers, "uri": "", "end": len(numbers) - 1,
+                "first_page_uri": "", "next_page_uri": None, "page": 0, "page_size": PageSize}
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/IncomingPhoneNumbers.json", status_code=201)
+    async def twilio_purchase(account_sid: str, request: Request):
+        error = await providers.simulate_request("twilio")
+        if error:
+            return error
+        form = await request.form()
+        number = _twilio_number(form["PhoneNumber"], "US")
+        number.update({"sid": f"PN{uuid.uuid4().hex}", "status": "in-use"})
+        providers.owned_numbers[number["phone_number"]] = number
+        return number
+
+    @app.get("/2010-04-01/Accounts/{account_sid}/IncomingPhoneNumbers.json")
+    async def twilio_owned(account_sid: str, PhoneNumber: Optional[str] = None):
+        error = await providers.simulate_request("twilio")
+        if error:
+            return error
+        numbers = [number for number in providers.owned_numbers.values()
+                   if not PhoneNumber or number["phone_number"] == PhoneNumber]
+        return {"incoming_phone_numbers": numbers, "uri": "", "end": max(len(numbers) - 1, 0),
+                "first_page_uri": "", "next_page_uri": None, "page": 0, "page_size": 50}
+
+    @app.delete("/2010-04-01/Accounts/{account_sid}/IncomingPhoneNumbers/{sid}.json", status_code=204)
+    async def twilio_release(account_sid: str, sid: str):
+        for phone_number, number in list(providers.owned_numbers.items()):
+            if number.get("sid") == sid:
+                del providers.owned_numbers[phone_number]
+        return Response(status_code=204)
+
+    # Plivo
+    @app.get("/v1/Account/{auth_id}/PhoneNumber/")
+    async def plivo_search(auth_id: str, country_iso: str = "US", limit: int = 20):
+        error = await providers.simulate_request("plivo")
+        if error:
+            return error
+        objects = [{"number": f"1415556{providers.rng.randint(0, 9999):04d}", "region": "California",
+                    "monthly_rental_rate": "0.80", "type": "local"} for _ in range(limit)]
+        return {"api_id": uuid.uuid4().hex, "meta": {"limit": limit, "offset": 0, "total_count": len(objects)},
+                "objects": objects}
+
+    @app.post("/v1/Account/{auth_id}/PhoneNumber/{number}/", status_code=201)
+    async def plivo_buy(auth_id: str, number: str):
+        error = await providers.simulate_request("plivo")
+        if error:
+            return error
+        providers.owned_numbers[number] = {"number": number, "status": "active", "type": "local",
+                                           "monthly_rental_rate": "0.80", "voice_enabled": True}
+        return {"api_id": uuid.uuid4().hex, "message": "created", "status": "fulfilled",
+                "numbers": [{"number": number, "status": "Success"}]}
+
+    @app.get("/v1/Account/{auth_id}/Number/")
+    async def plivo_owned(auth_id: str):
+        error = await providers.simulate_request("plivo")
+        if error:
+            return error
+        objects = list(providers.owned_numbers.values())
+        return {"api_id": uuid.uuid4().hex, "meta": {"total_count": len(objects)}, "objects": objects}
+
+    @app.delete("/v1/Account/{auth_id}/Number/{number}/", status_code=204)
+    async def plivo_release(auth_id: str, number: str):
+        providers.owned_numbers.pop(number, None)
+        return Response(status_code=204)
+
+    # Control
+    @app.get("/_fake/stats")
+    async def stats():
+        return {"in_flight_requests": providers.in_flight, "calls_tracked": len(providers.calls),
+                **providers.stats}
+
+    @app.post("/_fake/reset")
+    async def reset():
+        providers.reset()
+        return {"status": "reset"}
+
+    return app
+
+
+def _fake_agent(agent_id: str = MASTER_AGENT_ID) -> dict:
+    return {
+        "agent_id": agent_id,
+        "agent_name": MASTER_AGENT_NAME,
+        "voice_id": "11labs-Adrian",
+        "language": "en-US",
+        "response_engine": {"type": "retell-llm", "llm_id": "fake_llm"},
+        "last_modification_timestamp": int(time.time() * 1000)
+    }
+
+
+def _twilio_number(phone_number: str, country: str) -> dict:
+    return {
+        "phone_number": phone_number,
+        "friendly_name": phone_number,
+        "region": "CA",
+        "iso_country": country,
+        "capabilities": {"voice": True, "SMS": True, "MMS": False}
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--latency", default="lognormal:150:0.4",
+                        help="fixed:MS | uniform:MIN:MAX | lognormal:MEDIAN_MS:SIGMA")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--server-error-ratio", type=float, default=0.0, help="Share of requests answered with 5xx")
+    parser.add_argument("--webhook-url", help="Where to POST call_ended webhooks (e.g. the API's /calls/webhook)")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Multiplier for simulated ring/talk time (0.01 = 100x faster)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    providers = FakeProviders(
+        latency=LatencyModel(args.latency),
+        rate_limit_ratio=args.rate_limit_ratio,
+        server_error_ratio=args.server_error_ratio,
+        webhook_url=args.webhook_url,
+        time_scale=args.time_scale,
+        seed=args.seed
+    )
+    uvicorn.run(create_app(providers), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Insert throughput and primary key index size: UUIDv4 vs UUIDv7 keys.
+
+Loads the same number of rows into two scratch tables shaped like `leads`
+(UUID primary key plus a few columns), one keyed with random v4 ids and one
+with time-ordered v7 ids (app.utils.ids), and reports rows per second
+(overall and over the last tenth, once the index no longer fits in cache),
+table and primary key index size and, when the pgstattuple extension is
+available, the index's leaf density and fragmentation.
+
+    BENCH_DATABASE_URL=postgresql://localhost/voiceai_bench python -m benchmarks.id_locality
+    python -m benchmarks.id_locality --rows 10000000 --method insert
+
+Only the scratch tables (bench_ids_v4 / bench_ids_v7) are touched; they are
+dropped afterwards unless --keep is given. Id generation happens outside
+the timed section.
+"""
+import argparse
+import io
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from benchmarks import bench_env
+
+bench_env.configure()
+
+from psycopg2.extras import execute_values  # noqa: E402
+
+from app.db.session import engine  # noqa: E402
+from app.utils.ids import uuid7  # noqa: E402
+
+GENERATORS: Dict[str, Callable[[], uuid.UUID]] = {"v4": uuid.uuid4, "v7": uuid7}
+
+
+def _table(version: str) -> str:
+    return f"bench_ids_{version}"
+
+
+def _create_table(cursor, table: str) -> None:
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(f"""
+        CREATE TABLE {table} (
+            id uuid PRIMARY KEY,
+            agent_id uuid NOT NULL,
+            phone_e164 varchar(50) NOT NULL,
+            status varchar(20) NOT NULL,
+            created_at timestamp NOT NULL
+        )
+    """)
+
+
+def _batch(new_id: Callable[[], uuid.UUID], agent_id: uuid.UUID, start: int, size: int) -> List[tuple]:
+    now = datetime.utcnow()
+    return [(str(new_id()), str(agent_id), f"+1212{start + offset:07d}", "new", now) for offset in range(size)]
+
+
+def _write(cursor, table: str, rows: List[tuple], method: str) -> None:
+    if method == "copy":
+        buffer = io.StringIO("".join(f"{r[0]}\t{r[1]}\t{r[2]}\t{r[3]}\t{r[4].isoformat()}\n" for r in rows))
+        cursor.copy_expert(f"COPY {table} (id, agent_id, phone_e164, status, created_at) FROM STDIN", buffer)
+    else:
+        execute_values(cursor, f"INSERT INTO {table} (id, agent_id, phone_e164, status, created_at) VALUES %s",
+                       rows, page_size=1000)
+
+
+def _index_stats(cursor, table: str) -> Dict[str, float]:
+    cursor.execute(
+        "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+        (table, f"{table}_pkey")
+    )
+    table_bytes, index_bytes = cursor.fetchone()
+    stats = {"table_mb": table_bytes / 2**20, "pkey_mb": index_bytes / 2**20}
+    try:
+        cursor.execute("SAVEPOINT pgstattuple")
+        cursor.execute("SELECT avg_leaf_density, leaf_fragmentation FROM pgstatindex(%s)", (f"{table}_pkey",))
+        stats["leaf_density"], stats["leaf_fragmentation"] = cursor.fetchone()
+    except Exception:
+        # pgstattuple not installed
+        cursor.execute("ROLLBACK TO SAVEPOINT pgstattuple")
+    return stats
+
+
+def load(version: str, rows: int, batch_size: int, method: str) -> Dict[str, float]:
+    table = _table(version)
+    new_id = GENERATORS[version]
+    agent_id = uuid.uuid4()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        _create_table(cursor, table)
+        connection.commit()
+
+        elapsed = 0.0
+        tail_elapsed = 0.0
+        tail_start = rows - rows // 10
+        loaded = 0
+        while loaded < rows:
+            size = min(batch_size, rows - loaded)
+            batch = _batch(new_id, agent_id, loaded, size)
+            start = time.perf_counter()
+            _write(cursor, table, batch, method)
+            connection.commit()
+            took = time.perf_counter() - start
+            elapsed += took
+            if loaded >= tail_start:
+                tail_elapsed += took
+            loaded += size
+            if loaded % (batch_size * 20) == 0:
+                print(f"  {version}: {loaded:,} rows, {loaded / elapsed:,.0f} rows/s", flush=True)
+
+        cursor.execute(f"ANALYZE {table}")
+        stats = _index_stats(cursor, table)
+        connection.commit()
+        stats["rows_per_s"] = rows / elapsed
+        stats["tail_rows_per_s"] = (rows - tail_start) / tail_elapsed if tail_elapsed else 0.0
+        return stats
+    finally:
+        connection.close()
+
+
+def drop(version: str) -> None:
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {_table(version)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch", type=int, default=50_000, help="Rows per transaction")
+    parser.add_argument("--method", choices=("copy", "insert"), default="copy",
+                        help="COPY (bulk import) or multi-row INSERTs (closer to ORM writes)")
+    parser.add_argument("--keep", action="store_true", help="Leave the scratch tables in place")
+    args = parser.parse_args()
+
+    results = {}
+    try:
+        for version in GENERATORS:
+            print(f"Loading {args.rows:,} rows keyed with UUID{version} ({args.method})")
+            results[version] = load(version, args.rows, args.batch, args.method)
+    finally:
+        if not args.keep:
+            for version in GENERATORS:
+                drop(version)
+
+    columns = ("rows_per_s", "tail_rows_per_s", "table_mb", "pkey_mb", "leaf_density", "leaf_fragmentation")
+    print(f"{'':<20}" + "".join(f"{version:>14}" for version in results))
+    for column in columns:
+        values = [result.get(column) for result in results.values()]
+        if all(value is None for value in values):
+            continue
+        print(f"{column:<20}" + "".join(f"{value:>14,.1f}" if value is not None else f"{'-':>14}" for value in values))
+    if "v4" in results and "v7" in results:
+        v4, v7 = results["v4"], results["v7"]
+        print(f"UUIDv7: {v7['rows_per_s'] / v4['rows_per_s']:.2f}x insert throughput, "
+              f"primary key {v7['pkey_mb'] / v4['pkey_mb']:.2f}x the size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
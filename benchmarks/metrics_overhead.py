@@ -0,0 +1,77 @@
+"""
+Measures the per-request cost of MetricsMiddleware.
+
+Drives a no-op ASGI app directly (no server, no network) with and without
+the middleware and reports the difference per request. Exits non-zero when
+the overhead exceeds the budget.
+
+    python -m benchmarks.metrics_overhead [--requests 200000] [--budget-us 50]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from starlette.routing import Route
+from app.middleware.metrics import MetricsMiddleware
+
+
+async def _endpoint(request):
+    return None
+
+
+class _App:
+    """Stand-in for the FastAPI app: just enough for route_template()"""
+    routes = [Route("/api/v1/leads/{lead_id}", _endpoint)]
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/leads/123",
+        "app": _App(),
+        "endpoint": _endpoint
+    }
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, _receive, _send)
+    return time.perf_counter() - start
+
+
+def run(requests: int) -> float:
+    """Overhead per request in microseconds"""
+    wrapped = MetricsMiddleware(noop_app)
+    # Warm up (route template cache, label entries)
+    asyncio.run(drive(wrapped, 1000))
+
+    baseline = min(asyncio.run(drive(noop_app, requests)) for _ in range(3))
+    instrumented = min(asyncio.run(drive(wrapped, requests)) for _ in range(3))
+    return (instrumented - baseline) / requests * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--budget-us", type=float, default=50.0)
+    args = parser.parse_args()
+
+    overhead = run(args.requests)
+    print(f"MetricsMiddleware overhead: {overhead:.2f} us/request (budget {args.budget_us:.0f} us)")
+    return 0 if overhead <= args.budget_us else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
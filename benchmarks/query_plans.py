@@ -0,0 +1,262 @@
+"""
+Query-plan regression check for the hot access paths.
+
+EXPLAINs the queries behind tenant lookups, the lead list and bulk filters,
+the dispatch wheel refill, call history and pacing against the synthetic
+dataset. A query that stops using the index built for it fails the check,
+for example a partial index whose predicate no longer matches the query.
+
+    BENCH_DATABASE_URL=postgresql://localhost/voiceai_bench python -m benchmarks.query_plans
+
+Tiny tables (companies, agents, phone_providers) always seq-scan on a
+benchmark-sized dataset. Those cases run with enable_seqscan off, so they
+check that the index can serve the query, not that the planner prefers it.
+Indexes on partitions count as their parent index, and date-bounded attempt
+queries must also prune down to a few monthly partitions.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+from benchmarks import bench_env
+
+bench_env.configure()
+
+from sqlalchemy import desc, func, select  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.sql.expression import ClauseElement, Executable  # noqa: E402
+
+from app.api.v1.endpoints.calls import call_history_filters  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.models.agent import Agent  # noqa: E402
+from app.models.company import Company  # noqa: E402
+from app.models.interaction_attempt import InteractionAttempt  # noqa: E402
+from app.models.lead import Lead  # noqa: E402
+from app.models.phone_provider import PhoneProvider  # noqa: E402
+from app.services.lead_bulk import company_lead_scope, lead_bulk_service, lead_filter_clauses  # noqa: E402
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+class Tenant(NamedTuple):
+    company_id: object
+    admin_user_id: object
+    agent_id: object
+    agent_ids: List
+
+
+class PlanCase(NamedTuple):
+    build: Callable[[Tenant], object]
+    indexes: Set[str]  # Any of these satisfies the case
+    force_index: bool = False
+    max_partitions: Optional[int] = None  # Attempt partitions the plan may touch
+
+
+def _largest_tenant(connection) -> Tenant:
+    largest = connection.execute(
+        select(Agent.company_id).join(Lead, Lead.agent_id == Agent.id)
+        .group_by(Agent.company_id).order_by(func.count(Lead.id).desc()).limit(1)
+    ).scalar()
+    if largest is None:
+        raise SystemExit("Benchmark database is empty - run `python -m benchmarks.datagen` first")
+    admin_user_id = connection.execute(select(Company.admin_user_id).where(Company.id == largest)).scalar()
+    agent_ids = connection.execute(
+        select(Agent.id).where(Agent.company_id == largest, Agent.is_deleted == False).order_by(Agent.created_at)
+    ).scalars().all()
+    return Tenant(largest, admin_user_id, agent_ids[0], agent_ids)
+
+
+CASES: Dict[str, PlanCase] = {
+    # get_user_company, on every request
+    "company_by_admin": PlanCase(
+        lambda t: select(Company.id).where(Company.admin_user_id == t.admin_user_id, Company.is_deleted == False),
+        {"ix_companies_admin_user_id_live"}, force_index=True
+    ),
+    "company_active_agents": PlanCase(
+        lambda t: select(func.count(Agent.id)).where(
+            Agent.company_id == t.company_id, Agent.status == "active", Agent.is_deleted == False
+        ),
+        {"ix_agents_company_id_status_live"}, force_index=True
+    ),
+    "company_phone_providers": PlanCase(
+        lambda t: select(PhoneProvider.id).where(
+            PhoneProvider.company_id == t.company_id, PhoneProvider.is_deleted == False
+        ),
+        {"ix_phone_providers_company_id_live", "uq_company_provider"}, force_index=True
+    ),
+    # GET /leads?agent_id=...&status_filter=new
+    "lead_list_agent_status": PlanCase(
+        lambda t: select(Lead.id).join(Agent).where(
+            Agent.company_id == t.company_id, Agent.is_deleted == False, Lead.is_deleted == False,
+            *lead_filter_clauses(agent_id=t.agent_id, status="new")
+        ).limit(10),
+        {"ix_leads_agent_id_status_live"}
+    ),
+    # POST /leads/bulk {"action": "resume"} across the company
+    "bulk_resume": PlanCase(
+        lambda t: select(Lead.id).where(
+            *company_lead_scope(t.company_id),
+            *lead_bulk_service._pending("resume", {}, company_lead_scope(t.company_id))
+        ),
+        {"ix_leads_agent_id_status_live"}
+    ),
+    # Duplicate check on create / CSV import
+    "lead_dedup_phone": PlanCase(
+        lambda t: select(Lead.id).where(
+            Lead.agent_id == t.agent_id, Lead.phone_key == 12125550123, Lead.is_deleted == False
+        ),
+        {"uq_agent_phone_key"}
+    ),
+    # GET /leads?custom_fields={"city": "Austin", "source": "webinar"}
+    "lead_list_custom_fields": PlanCase(
+        lambda t: select(Lead.id).where(
+            *company_lead_scope(t.company_id),
+            *lead_filter_clauses(custom_fields={"city": "Austin", "source": "webinar"})
+        ),
+        {"ix_leads_custom_fields"}
+    ),
+    # GET /leads/export?agent_id=... (first batch)
+    "lead_export_agent": PlanCase(
+        lambda t: select(Lead.id).where(Lead.is_deleted == False, *lead_filter_clauses(agent_id=t.agent_id))
+        .order_by(Lead.created_at).limit(settings.EXPORT_BATCH_SIZE),
+        {"ix_leads_agent_id_created_at_live"}
+    ),
+    # DispatchWheel refill: leads coming due within the horizon
+    "dispatch_wheel_refill": PlanCase(
+        lambda t: select(Lead.id, Lead.schedule_at).where(
+            Lead.is_deleted == False,
+            Lead.status.in_(["new", "in_progress"]),
+            Lead.schedule_at > datetime.utcnow(),
+            Lead.schedule_at <= datetime.utcnow() + timedelta(seconds=settings.DISPATCH_WHEEL_HORIZON_SECONDS)
+        ),
+        {"ix_leads_due"}
+    ),
+    # archive_done_leads: the next batch of long-done leads
+    "archive_due_leads": PlanCase(
+        lambda t: select(Lead.id).where(
+            Lead.status == "done",
+            Lead.updated_at < datetime.utcnow() - timedelta(days=settings.LEAD_ARCHIVE_AFTER_DAYS)
+        ).limit(settings.LEAD_ARCHIVE_BATCH_SIZE),
+        {"ix_leads_done_updated_at"}
+    ),
+    # GET /calls/history?agent_id=...&start_date=... (first page)
+    "call_history_agent_week": PlanCase(
+        lambda t: select(InteractionAttempt.id).join(Lead, InteractionAttempt.lead_id == Lead.id)
+        .join(Agent, InteractionAttempt.agent_id == Agent.id).where(
+            *call_history_filters(t.company_id, agent_id=t.agent_id,
+                                  start_date=(datetime.utcnow() - timedelta(days=7)).date())
+        ).order_by(desc(InteractionAttempt.created_at)).limit(10),
+        {"ix_interaction_attempts_agent_id_created_at"}, max_partitions=2
+    ),
+    # PacingEngine: recent finished attempts of the company's agents
+    "pacing_window": PlanCase(
+        lambda t: select(InteractionAttempt.agent_id, func.count()).where(
+            InteractionAttempt.agent_id.in_(t.agent_ids),
+            InteractionAttempt.status.in_(["completed", "failed"]),
+            InteractionAttempt.created_at > datetime.utcnow() - timedelta(minutes=settings.PACING_WINDOW_MINUTES)
+        ).group_by(InteractionAttempt.agent_id),
+        {"ix_interaction_attempts_agent_id_created_at"}, max_partitions=2
+    ),
+    # POST /calls/webhook: the attempt row is locked by its Retell call ID
+    "webhook_call_lookup": PlanCase(
+        lambda t: select(InteractionAttempt.id).where(
+            InteractionAttempt.retell_call_id == "bench_call_lookup"
+        ).with_for_update(),
+        {"ix_interaction_attempts_retell_call_id"}
+    ),
+}
+
+
+def _parent_indexes(connection) -> Dict[str, str]:
+    """Partition index name -> the partitioned index it belongs to"""
+    return dict(connection.exec_driver_sql("""
+        SELECT child.relname, parent.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE child.relkind = 'i'
+    """).all())
+
+
+def _plan_values(node: Dict, key: str) -> Set[str]:
+    found = {node[key]} if key in node else set()
+    for child in node.get("Plans", []):
+        found |= _plan_values(child, key)
+    return found
+
+
+def _plan_lines(node: Dict, depth: int = 0) -> List[str]:
+    line = "  " * depth + "-> " + node["Node Type"]
+    if "Index Name" in node:
+        line += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        line += f" on {node['Relation Name']}"
+    lines = [line]
+    for child in node.get("Plans", []):
+        lines.extend(_plan_lines(child, depth + 1))
+    return lines
+
+
+def check_case(connection, tenant: Tenant, name: str, parent_indexes: Dict[str, str]) -> bool:
+    case = CASES[name]
+    transaction = connection.begin()
+    try:
+        if case.force_index:
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = connection.execute(Explain(case.build(tenant))).scalar()[0]["Plan"]
+    finally:
+        transaction.rollback()
+
+    used = {parent_indexes.get(index, index) for index in _plan_values(plan, "Index Name")}
+    partitions = {relation for relation in _plan_values(plan, "Relation Name")
+                  if relation.startswith(f"{InteractionAttempt.__tablename__}_")}
+
+    problems = []
+    if not used & case.indexes:
+        problems.append(f"expected {' or '.join(sorted(case.indexes))}")
+    if case.max_partitions is not None and len(partitions) > case.max_partitions:
+        problems.append(f"scans {len(partitions)} attempt partitions (max {case.max_partitions})")
+    if not problems:
+        print(f"{name:>28}: ok ({', '.join(sorted(used & case.indexes))})")
+        return True
+    print(f"{name:>28}: FAILED - {'; '.join(problems)}")
+    print("\n".join(" " * 32 + line for line in _plan_lines(plan)))
+    return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", help=f"Comma-separated subset of: {', '.join(CASES)}")
+    args = parser.parse_args()
+
+    names = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+
+    with engine.connect() as connection:
+        tenant = _largest_tenant(connection)
+        parent_indexes = _parent_indexes(connection)
+        connection.rollback()
+        failed = [name for name in names if not check_case(connection, tenant, name, parent_indexes)]
+
+    if failed:
+        print(f"Plan regressions: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
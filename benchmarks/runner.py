@@ -0,0 +1,114 @@
+"""
+Runs the benchmark cases against the generated dataset and compares the
+results with a stored baseline.
+
+    BENCH_DATABASE_URL=postgresql://localhost/voiceai_bench python -m benchmarks.runner
+    python -m benchmarks.runner --cases call_history,call_metrics --repeat 10
+    python -m benchmarks.runner --update-baseline
+
+Exits with status 1 when any case's median is slower than the baseline by
+more than --tolerance.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks import bench_env
+
+bench_env.configure()
+
+from benchmarks.cases import CASES, BenchContext  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def run_case(ctx: BenchContext, name: str, repeat: int, warmup: int) -> Dict[str, float]:
+    """Per-operation timings (milliseconds) for one case"""
+    samples: List[float] = []
+    for iteration in range(warmup + repeat):
+        savepoint = ctx.connection.begin_nested()
+        try:
+            timed = CASES[name](ctx)
+            start = time.perf_counter()
+            operations = timed() or 1
+            elapsed = time.perf_counter() - start
+        finally:
+            savepoint.rollback()
+
+        if iteration >= warmup:
+            samples.append(elapsed / operations * 1000)
+
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+        "samples": len(samples)
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Print a comparison table and return the names of regressed cases"""
+    regressions = []
+    print(f"{'case':<26}{'median ms':>12}{'p95 ms':>12}{'baseline':>12}{'change':>10}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference:
+            change = result["median_ms"] / reference["median_ms"] - 1
+            marker = ""
+            if change > tolerance:
+                regressions.append(name)
+                marker = "  REGRESSION"
+            print(f"{name:<26}{result['median_ms']:>12.3f}{result['p95_ms']:>12.3f}"
+                  f"{reference['median_ms']:>12.3f}{change:>+10.1%}{marker}")
+        else:
+            print(f"{name:<26}{result['median_ms']:>12.3f}{result['p95_ms']:>12.3f}{'-':>12}{'-':>10}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", help=f"Comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    args = parser.parse_args()
+
+    names = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+
+    ctx = BenchContext()
+    try:
+        results = {name: run_case(ctx, name, args.repeat, args.warmup) for name in names}
+    finally:
+        ctx.close()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.update_baseline:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""Schema setup for the benchmark database"""
+from app.db.init_db import run_migrations
+from app.db.session import Base, engine
+from app.models import *  # noqa: F401,F403 - register all tables
+
+
+def create_schema() -> None:
+    run_migrations()
+
+
+def truncate_all() -> None:
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"TRUNCATE {tables} CASCADE")
@@ -9,6 +9,10 @@ ENVIRONMENT=${1:-production}
 PROJECT_ID=${GOOGLE_CLOUD_PROJECT:-"iconic-parsec-456210-h7"}
 REGION=${GOOGLE_CLOUD_REGION:-"us-central1"}
 SERVICE_NAME="voice-ai-admin-api"
+# Same Secret Manager entries as cloud-run.yaml's secretKeyRefs; new jobs/services start with none
+SECRETS="DATABASE_URL=voice-ai-secrets:database-url,SECRET_KEY=voice-ai-secrets:secret-key,\
+GOOGLE_CLIENT_ID=voice-ai-secrets:google-client-id,GOOGLE_CLIENT_SECRET=voice-ai-secrets:google-client-secret,\
+RETELL_API_KEY=voice-ai-secrets:retell-api-key,METRICS_AUTH_TOKEN=voice-ai-secrets:metrics-auth-token"
 
 echo "🚀 Deploying Voice AI Admin Panel API to $ENVIRONMENT"
 
@@ -19,6 +23,18 @@ docker build -t gcr.io/$PROJECT_ID/$SERVICE_NAME:latest .
 echo "🔄 Pushing image to Container Registry..."
 docker push gcr.io/$PROJECT_ID/$SERVICE_NAME:latest
 
+# Apply migrations and seed data before the new revision takes traffic
+echo "🗄️ Running database migrations..."
+gcloud run jobs deploy $SERVICE_NAME-migrate \
+  --image gcr.io/$PROJECT_ID/$SERVICE_NAME:latest \
+  --region $REGION \
+  --command python \
+  --args=-m,app.db.init_db \
+  --set-env-vars ENVIRONMENT=$ENVIRONMENT \
+  --set-secrets "$SECRETS" \
+  --execute-now \
+  --wait
+
 # Deploy to Cloud Run
 echo "☁️ Deploying to Cloud Run..."
 gcloud run deploy $SERVICE_NAME \
@@ -31,19 +47,50 @@ gcloud run deploy $SERVICE_NAME \
   --cpu 2 \
   --max-instances 100 \
   --timeout 300 \
-  --set-env-vars ENVIRONMENT=$ENVIRONMENT
-
-# Setup Cloud Scheduler for call scheduling
-echo "⏰ Setting up Cloud Scheduler..."
-gcloud scheduler jobs create http call-scheduler \
-  --schedule="* * * * *" \
-  --uri="https://$SERVICE_NAME-$PROJECT_ID.a.run.app/api/v1/calls/run-scheduler" \
-  --http-method=POST \
-  --headers="Content-Type=application/json" \
+  --set-env-vars ENVIRONMENT=$ENVIRONMENT,RUN_SCHEDULER_ENDPOINT_ENABLED=false \
+  --set-secrets "$SECRETS"
+
+# Dispatcher worker: the only thing that runs scheduling cycles. One instance,
+# CPU always allocated so the loop keeps running between (health check) requests.
+echo "📞 Deploying dispatcher worker..."
+gcloud run deploy $SERVICE_NAME-dispatcher \
+  --image gcr.io/$PROJECT_ID/$SERVICE_NAME:latest \
+  --platform managed \
+  --region $REGION \
+  --no-allow-unauthenticated \
+  --command python \
+  --args=-m,app.worker \
+  --memory 1Gi \
+  --cpu 1 \
+  --no-cpu-throttling \
+  --min-instances 1 \
+  --max-instances 1 \
+  --set-env-vars ENVIRONMENT=$ENVIRONMENT \
+  --set-secrets "$SECRETS"
+
+# Job worker: bulk updates, imports, reconciliation, partition maintenance and archiving
+echo "🧵 Deploying job worker..."
+gcloud run deploy $SERVICE_NAME-jobs \
+  --image gcr.io/$PROJECT_ID/$SERVICE_NAME:latest \
+  --platform managed \
+  --region $REGION \
+  --no-allow-unauthenticated \
+  --command python \
+  --args=-m,app.job_worker \
+  --memory 1Gi \
+  --cpu 1 \
+  --no-cpu-throttling \
+  --min-instances 1 \
+  --max-instances 4 \
+  --set-env-vars ENVIRONMENT=$ENVIRONMENT \
+  --set-secrets "$SECRETS"
+
+# Cloud Scheduler used to trigger /calls/run-scheduler every minute; alongside
+# the dispatcher worker that only doubles the cycles
+echo "⏰ Removing Cloud Scheduler trigger..."
+gcloud scheduler jobs delete call-scheduler \
   --location=$REGION \
-  --max-retry-attempts=3 \
-  --max-retry-duration=300s \
-  --time-zone="UTC" || echo "Scheduler job already exists"
+  --quiet || echo "Scheduler job not present"
 
 echo "✅ Deployment completed successfully!"
 echo "🌐 Service URL: https://$SERVICE_NAME-$PROJECT_ID.a.run.app"
@@ -0,0 +1,81 @@
+"""
+Production server: gunicorn managing uvicorn worker processes.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Environment overrides: PORT, WEB_CONCURRENCY (worker count), GUNICORN_PRELOAD,
+GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_MAX_REQUESTS,
+GUNICORN_MAX_REQUESTS_JITTER.
+"""
+import gc
+import math
+import os
+
+
+def available_cpus() -> int:
+    """CPUs this container may actually use (affinity mask and cgroup quota)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2 (Cloud Run gen2, Docker --cpus): "<quota> <period>" or "max <period>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return cpus
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# Request handling is mostly I/O-bound, but JSON/pydantic/phone parsing is CPU work,
+# so run one process per usable CPU
+workers = int(os.getenv("WEB_CONCURRENCY", available_cpus()))
+# Each worker opens up to DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW connections per
+# database (primary, and the replica if set). A request uses at most one of each - read
+# endpoints on the primary share the get_db session - so a full pool only queues
+# requests; keep workers x that x max instances under the server's max_connections
+
+# Import the app once in the master; workers share its memory copy-on-write
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+# Cloud Run sends SIGTERM and kills the container 10s later - finish in-flight
+# requests within that window
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "8"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+keepalive = 5
+
+# Recycle workers to bound memory growth; jitter keeps them from restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+
+# Behind Cloud Run's proxy
+forwarded_allow_ips = "*"
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    # Move everything imported so far to the permanent generation so the cyclic
+    # GC in workers doesn't touch (and un-share) those pages
+    gc.freeze()
+    server.log.info(f"Starting {workers} workers (preload={preload_app}, max_requests={max_requests})")
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Pooled connections opened in the master must not be shared across processes
+        from app.db.session import engine, read_engine
+
+        engine.dispose(close=False)
+        if read_engine is not engine:
+            read_engine.dispose(close=False)
@@ -1,15 +1,27 @@
+# Imported first so the startup timing report covers every import below
+from app.core.startup import startup_timer
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
 import uvicorn
 import logging
 
+startup_timer.mark("framework_imports")
+
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.metrics import registry as metrics_registry, scrape_denied
 from app.db.init_db import init_db
 from app.middleware.onboarding import OnboardingMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.db import metrics as db_metrics  # noqa: F401 - registers DB pool / query metrics
+from app.services import lead_events  # noqa: F401 - notifies the dispatcher of lead schedule changes
+
+startup_timer.mark("app_imports")
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +29,11 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    init_db()
+    startup_timer.mark("server_start")
+    if settings.INIT_DB_ON_STARTUP:
+        init_db()
+        startup_timer.mark("init_db")
+    logger.info(startup_timer.report())
     yield
     # Shutdown
 
@@ -41,8 +57,17 @@ app.add_middleware(
 # Onboarding enforcement middleware
 app.add_middleware(OnboardingMiddleware)
 
+# Per-request SQL query counts / N+1 detection (wraps onboarding, so its checks count too)
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Request latency histograms for /metrics (added last: outermost, so it times everything above)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+startup_timer.mark("app_setup")
+
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -58,6 +83,23 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus text-format metrics for this process"""
+    denied = scrape_denied(
+        request.headers.get("Authorization"), settings.METRICS_AUTH_TOKEN, settings.ENVIRONMENT == "development"
+    )
+    if denied == 404:
+        return PlainTextResponse("Not found", status_code=404)
+    if denied:
+        return PlainTextResponse("Unauthorized", status_code=401)
+    
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 if __name__ == "__main__":
     import os
     port = int(os.environ.get("PORT", 8080))